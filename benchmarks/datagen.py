@@ -0,0 +1,571 @@
+"""Seeded synthetic data for the repository benchmarks.
+
+Generates chat sessions with their messages, tool executions, documents
+and funnel events, plus the leads and email logs of converted sessions
+and a few admin users, following the relationships in ``shared.models``.
+Per-session sizes are drawn around the means in ``Scale`` with a skewed
+distribution, funnels drop off step by step, and timestamps lean towards
+the recent end of the range. The same seed, scale and anchor produce the
+same rows.
+
+Rows are written with ``copy_records`` (binary COPY on PostgreSQL,
+multi-row INSERT elsewhere) in chunks of sessions, one transaction per
+chunk. On PostgreSQL the monthly partitions covering the data are created
+first.
+
+Usage:
+    python benchmarks/datagen.py --url sqlite+aiosqlite:///bench.db \\
+        [--sessions 10000] [--seed 42] [--anchor 2024-06-01] [--drop]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from datetime import time as clock
+from datetime import timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import DDL  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from shared.db import DatabaseSettings, build_engine  # noqa: E402
+from shared.models import Base  # noqa: E402
+from shared.models.partitioning import (  # noqa: E402
+    add_months,
+    create_partition_sql,
+    month_start,
+)
+from shared.repositories.copy_load import copy_records  # noqa: E402
+
+# Tables in insertion order (parents first)
+TABLES = (
+    "users",
+    "chat_sessions",
+    "leads",
+    "chat_messages",
+    "tool_executions",
+    "session_documents",
+    "funnel_events",
+    "email_logs",
+)
+
+# Funnel steps and the share of sessions at each step that reach the next
+FUNNEL = (
+    ("page_view", 1.0),
+    ("chat_started", 0.85),
+    ("vehicle_entered", 0.7),
+    ("quote_shown", 0.75),
+    ("lead_created", 0.45),
+    ("email_sent", 0.9),
+)
+
+TOOLS = (
+    ("lookup_postal_code", 0.25, None),
+    ("lookup_vehicle", 0.25, None),
+    ("calculate_premium", 0.3, None),
+    ("generate_premium_pdf", 0.12, "premium_pdf"),
+    ("generate_termination_letter", 0.08, "termination_letter"),
+)
+
+EMAIL_TEMPLATES = (
+    ("premium_summary", "Ihre Prämienübersicht"),
+    ("termination_letter", "Ihr Kündigungsschreiben"),
+    ("reminder", "Ihre Offerte wartet auf Sie"),
+    ("welcome", "Willkommen bei PrimAI"),
+)
+
+CANTONS = ("ZH", "BE", "LU", "AG", "SG", "VD", "GE", "TI", "BS", "FR", "VS", "GR")
+CITIES = ("Zürich", "Bern", "Luzern", "Aarau", "St. Gallen", "Lausanne", "Genève")
+LOCALES = ("de-CH", "de-CH", "de-CH", "fr-CH", "fr-CH", "it-CH", "en")
+SOURCES = ("web", "web", "web", "app", "partner")
+CAR_MODELS = ("VW Golf", "Skoda Octavia", "Tesla Model 3", "BMW 3er", "Toyota Yaris")
+FIRST_NAMES = ("Anna", "Luca", "Marco", "Sara", "Noah", "Lea", "Elias", "Mia")
+LAST_NAMES = ("Müller", "Meier", "Schmid", "Keller", "Weber", "Huber", "Rossi")
+USER_AGENTS = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) Safari/604.1",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) Safari/605.1.15",
+    "Mozilla/5.0 (Linux; Android 14) Chrome/124.0 Mobile Safari/537.36",
+)
+UTM_SOURCES = (None, None, "google", "facebook", "newsletter", "comparis")
+SENTENCES = (
+    "Ich möchte meine Autoversicherung vergleichen.",
+    "Welche Franchise empfehlen Sie für einen Neuwagen?",
+    "Mein Auto ist ein VW Golf, Jahrgang 2019.",
+    "Ich wohne in 8004 Zürich.",
+    "Hatten Sie in den letzten fünf Jahren einen Unfall?",
+    "Hier ist eine Übersicht der günstigsten Angebote für Ihr Fahrzeug.",
+    "Die Vollkasko kostet bei diesem Anbieter CHF 1'240 pro Jahr.",
+    "Mit einer höheren Franchise sinkt die Prämie um etwa 15 Prozent.",
+    "Soll ich Ihnen die Offerte per E-Mail schicken?",
+    "Gerne erstelle ich Ihnen ein Kündigungsschreiben für Ihre aktuelle Police.",
+    "Die Kündigungsfrist beträgt in der Regel drei Monate.",
+    "Vielen Dank, das hilft mir weiter.",
+)
+
+
+@dataclass
+class Scale:
+    """Data volume; per-session counts are means of skewed distributions."""
+
+    sessions: int = 10_000
+    messages_per_session: float = 20.0
+    # Share of assistant replies that call a tool
+    tool_calls_per_reply: float = 0.3
+    # Extra page views per session on top of the funnel steps
+    page_views_per_session: float = 2.0
+    email_logs_per_lead: float = 1.5
+    users: int = 25
+    # Sessions are spread over this many days before the anchor
+    days: int = 365
+
+
+def generate(
+    scale: Scale,
+    seed: int = 0,
+    anchor: Optional[datetime] = None,
+    chunk_sessions: int = 1000,
+) -> Iterator[Dict[str, List[dict]]]:
+    """Generate rows in chunks of sessions.
+
+    Args:
+        scale: Data volume
+        seed: Random seed
+        anchor: Latest possible timestamp (default: midnight UTC today)
+        chunk_sessions: Sessions per chunk
+
+    Yields:
+        Rows keyed by table name, in ``TABLES`` order; every chunk is
+        self-contained (children follow their parents)
+    """
+    generator = RowGenerator(random.Random(seed), scale, anchor or default_anchor())
+    yield {"users": [generator.user(index) for index in range(scale.users)]}
+    for start in range(0, scale.sessions, chunk_sessions):
+        chunk: Dict[str, List[dict]] = {name: [] for name in TABLES[1:]}
+        for _ in range(min(chunk_sessions, scale.sessions - start)):
+            generator.session(chunk)
+        yield chunk
+
+
+def default_anchor() -> datetime:
+    """Midnight UTC today."""
+    return datetime.combine(date.today(), clock(), tzinfo=timezone.utc)
+
+
+async def create_schema(engine: AsyncEngine, drop: bool = False) -> None:
+    """Create the tables (after dropping them if ``drop``)."""
+    async with engine.begin() as connection:
+        if drop:
+            await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+
+async def populate(
+    engine: AsyncEngine,
+    scale: Scale,
+    seed: int = 0,
+    anchor: Optional[datetime] = None,
+    chunk_sessions: int = 1000,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """Write generated data into existing tables.
+
+    Args:
+        engine: Target database
+        scale: Data volume
+        seed: Random seed
+        anchor: Latest possible timestamp (default: midnight UTC today)
+        chunk_sessions: Sessions per chunk and transaction
+        progress: Called with the running row counts after each chunk
+
+    Returns:
+        Rows written per table
+    """
+    anchor = anchor or default_anchor()
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    if engine.dialect.name == "postgresql":
+        async with sessionmaker() as db:
+            await _create_partitions(
+                db, anchor - timedelta(days=scale.days + 1), anchor
+            )
+            await db.commit()
+
+    counts = {name: 0 for name in TABLES}
+    for chunk in generate(scale, seed, anchor, chunk_sessions):
+        async with sessionmaker() as db:
+            for name, rows in chunk.items():
+                if rows:
+                    await copy_records(db, Base.metadata.tables[name], rows)
+                    counts[name] += len(rows)
+            await db.commit()
+        if progress is not None:
+            progress(counts)
+    return counts
+
+
+async def _create_partitions(db: AsyncSession, start: datetime, end: datetime) -> None:
+    """Create the monthly partitions between ``start`` and ``end``.
+
+    The tables' default partitions would otherwise receive all older rows.
+    """
+    first, last = month_start(start.date()), month_start(end.date())
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["postgresql"].get("partition_by"):
+            continue
+        month = first
+        while month <= last:
+            await db.execute(DDL(create_partition_sql(table.name, month)))
+            month = add_months(month, 1)
+
+
+class RowGenerator:
+    """Row factories sharing one random number generator."""
+
+    def __init__(self, rng: random.Random, scale: Scale, anchor: datetime):
+        self.rng = rng
+        self.scale = scale
+        self.anchor = anchor
+        self.tool_weights = [weight for _, weight, _ in TOOLS]
+
+    def id(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def around(self, mean: float) -> int:
+        """Skewed count with the given mean (gamma distributed, shape 2)."""
+        if mean <= 0:
+            return 0
+        return int(self.rng.gammavariate(2.0, mean / 2.0) + 0.5)
+
+    def text(self, sentences: int) -> str:
+        return " ".join(self.rng.choice(SENTENCES) for _ in range(sentences))
+
+    def user(self, index: int) -> Dict[str, Any]:
+        created_at = self.anchor - timedelta(days=self.rng.uniform(30, 3 * 365))
+        return {
+            "id": self.id(),
+            "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+            "email": f"admin{index}@primai.example",
+            "phone": None,
+            "password": f"$2b$12${self.rng.getrandbits(248):062x}",
+            "role": "admin" if index < 5 else "viewer",
+            "is_active": self.rng.random() < 0.9,
+            "last_active": self.anchor - timedelta(hours=self.rng.uniform(0, 500)),
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def session(self, chunk: Dict[str, List[dict]]) -> None:
+        """Append one session and everything belonging to it to ``chunk``."""
+        rng = self.rng
+        # Triangular towards the anchor: traffic grows over time
+        started = self.anchor - timedelta(
+            days=rng.triangular(0, self.scale.days, 0),
+            seconds=rng.uniform(0, 86400),
+        )
+        canton = rng.choice(CANTONS)
+        yob = rng.randint(1950, 2005)
+        session = {
+            "id": self.id(),
+            "source": rng.choice(SOURCES),
+            "user_agent": rng.choice(USER_AGENTS),
+            "ip_hash": f"{rng.getrandbits(256):064x}",
+            "locale": rng.choice(LOCALES),
+            "plz": str(rng.randint(1000, 9658)),
+            "canton": canton,
+            "yob": yob,
+            "age": started.year - yob,
+            "model_pref": rng.choice(CAR_MODELS),
+            "deductible": rng.choice((300, 500, 1000, 1500, 2000)),
+            "accident": rng.random() < 0.15,
+            "household_json": {
+                "adults": rng.randint(1, 2),
+                "children": rng.choice((0, 0, 1, 2, 3)),
+                "drivers": rng.randint(1, 3),
+            },
+            "email": None,
+            "consent": False,
+            "message_count": 0,
+            "document_count": 0,
+            "created_at": started,
+            "updated_at": started,
+        }
+        chunk["chat_sessions"].append(session)
+
+        steps = self.funnel_steps()
+        converted = "lead_created" in steps
+        lead = None
+        if converted:
+            session["email"] = (
+                f"{rng.choice(FIRST_NAMES).lower()}.{rng.getrandbits(32):08x}"
+                f"@example.ch"
+            )
+            session["consent"] = rng.random() < 0.8
+            lead = self.lead(session)
+            chunk["leads"].append(lead)
+            chunk["email_logs"].extend(self.email_logs(lead))
+
+        last = self.conversation(session, chunk)
+        session["updated_at"] = last
+        chunk["funnel_events"].extend(self.funnel_events(session, lead, steps, last))
+
+    def funnel_steps(self) -> List[str]:
+        steps = []
+        for step, rate in FUNNEL:
+            if self.rng.random() >= rate:
+                break
+            steps.append(step)
+        return steps
+
+    def conversation(
+        self, session: Dict[str, Any], chunk: Dict[str, List[dict]]
+    ) -> datetime:
+        """Append messages, tool executions and documents; return the last time."""
+        rng = self.rng
+        at = session["created_at"]
+        for index in range(max(2, self.around(self.scale.messages_per_session))):
+            at += timedelta(seconds=rng.expovariate(1 / 40))
+            reply = index % 2 == 1
+            message = {
+                "id": self.id(),
+                "session_id": session["id"],
+                "role": "assistant" if reply else "user",
+                "content": self.text(rng.randint(2, 8) if reply else rng.randint(1, 2)),
+                "meta": (
+                    {
+                        "model": "gpt-4o",
+                        "tokens": rng.randint(50, 1200),
+                        "latency_ms": rng.randint(300, 9000),
+                    }
+                    if reply
+                    else None
+                ),
+                "created_at": at,
+                "updated_at": at,
+            }
+            chunk["chat_messages"].append(message)
+            session["message_count"] += 1
+            if reply and rng.random() < self.scale.tool_calls_per_reply:
+                self.tool_execution(session, message, chunk)
+        return at
+
+    def tool_execution(
+        self,
+        session: Dict[str, Any],
+        message: Dict[str, Any],
+        chunk: Dict[str, List[dict]],
+    ) -> None:
+        rng = self.rng
+        name, _, document_type = rng.choices(TOOLS, self.tool_weights)[0]
+        at = message["created_at"] + timedelta(milliseconds=rng.randint(5, 3000))
+        succeeded = rng.random() < 0.95
+        execution = {
+            "id": self.id(),
+            "session_id": session["id"],
+            # Some tools run outside a message (e.g. on page load)
+            "message_id": message["id"] if rng.random() < 0.95 else None,
+            "tool_name": name,
+            "tool_arguments": {
+                "plz": session["plz"],
+                "model": session["model_pref"],
+                "deductible": session["deductible"],
+            },
+            "tool_result": (
+                {
+                    "offers": [
+                        {
+                            "insurer": f"Insurer {offer}",
+                            "premium": round(rng.uniform(600, 2400), 2),
+                            "coverage": rng.choice(("liability", "partial", "full")),
+                        }
+                        for offer in range(rng.randint(3, 12))
+                    ],
+                }
+                if succeeded
+                else {"error": "upstream timeout"}
+            ),
+            "status": "success" if succeeded else "error",
+            "created_at": at,
+            "updated_at": at,
+        }
+        chunk["tool_executions"].append(execution)
+        if document_type and succeeded:
+            sent = rng.random() < 0.7
+            document_id = self.id()
+            chunk["session_documents"].append(
+                {
+                    "id": document_id,
+                    "session_id": session["id"],
+                    "tool_execution_id": execution["id"],
+                    "document_type": document_type,
+                    "document_url": f"https://files.primai.example/{document_id}.pdf",
+                    "recipient_email": session["email"] if sent else None,
+                    "status": "sent" if sent else rng.choice(("generated", "failed")),
+                    "error_message": None,
+                    "created_at": at,
+                    "updated_at": at,
+                },
+            )
+            session["document_count"] += 1
+
+    def lead(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        rng = self.rng
+        at = session["created_at"] + timedelta(minutes=rng.uniform(2, 30))
+        summary = self.text(rng.randint(4, 12))
+        return {
+            "id": self.id(),
+            "email": session["email"],
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "phone": f"+41 7{rng.randint(5, 9)} {rng.randint(100, 999)} "
+            f"{rng.randint(10, 99)} {rng.randint(10, 99)}",
+            "locale": session["locale"],
+            "consent": session["consent"],
+            "source": session["source"],
+            "session_id": session["id"],
+            "summary_html": f"<p>{summary}</p>",
+            "summary_text": summary,
+            "annual_switch": rng.random() < 0.3,
+            "created_at": at,
+            "updated_at": at,
+        }
+
+    def email_logs(self, lead: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rng = self.rng
+        logs = []
+        at = lead["created_at"]
+        for _ in range(max(1, self.around(self.scale.email_logs_per_lead))):
+            at += timedelta(minutes=rng.expovariate(1 / 600))
+            template, subject = rng.choice(EMAIL_TEMPLATES)
+            status = rng.choices(("sent", "failed", "pending"), (90, 5, 5))[0]
+            logs.append(
+                {
+                    "id": self.id(),
+                    "to_email": lead["email"],
+                    "cc_email": None,
+                    "subject": subject,
+                    "html_size": rng.randint(8_000, 120_000),
+                    "provider_id": f"msg_{rng.getrandbits(96):024x}",
+                    "template": template,
+                    "payload": {"lead_id": lead["id"], "locale": lead["locale"]},
+                    "status": status,
+                    "error": "mailbox unavailable" if status == "failed" else None,
+                    "lead_id": lead["id"],
+                    "created_at": at,
+                    "updated_at": at,
+                },
+            )
+        return logs
+
+    def funnel_events(
+        self,
+        session: Dict[str, Any],
+        lead: Optional[Dict[str, Any]],
+        steps: List[str],
+        last: datetime,
+    ) -> List[Dict[str, Any]]:
+        rng = self.rng
+        user_agent = session["user_agent"]
+        context = {
+            "session_id": session["id"],
+            "geo_data": {
+                "country": "CH",
+                "region": session["canton"],
+                "city": rng.choice(CITIES),
+                "plz": session["plz"],
+            },
+            "locale": session["locale"],
+            "utm_source": rng.choice(UTM_SOURCES),
+            "utm_medium": None,
+            "utm_campaign": None,
+            "utm_term": None,
+            "utm_content": None,
+            "device_type": "mobile" if "Mobile" in user_agent else "desktop",
+            "browser": "Safari" if "Safari/6" in user_agent else "Chrome",
+            "os": user_agent.split("(")[1].split(";")[0],
+            "user_agent": user_agent,
+            "ip_hash": session["ip_hash"],
+        }
+        if context["utm_source"]:
+            context["utm_medium"] = "cpc"
+            context["utm_campaign"] = f"campaign-{rng.randint(1, 20)}"
+
+        # Page views start before the chat session row exists
+        types = steps + ["page_view"] * self.around(self.scale.page_views_per_session)
+        start = session["created_at"] - timedelta(minutes=rng.uniform(0, 5))
+        span = max((last - start).total_seconds(), 1.0)
+        events = []
+        for position, event_type in enumerate(types):
+            if position < len(steps):
+                at = start + timedelta(seconds=span * position / len(types))
+            else:
+                at = start + timedelta(seconds=rng.uniform(0, span))
+            after_lead = lead is not None and at >= lead["created_at"]
+            events.append(
+                {
+                    "id": self.id(),
+                    "event_type": event_type,
+                    "lead_id": lead["id"] if after_lead else None,
+                    "payload": {"step": position, "path": f"/{event_type}"},
+                    **context,
+                    "created_at": at,
+                    "updated_at": at,
+                },
+            )
+        return events
+
+
+async def _main(args: argparse.Namespace) -> int:
+    engine = build_engine(DatabaseSettings(url=args.url))
+    scale = Scale(sessions=args.sessions)
+    anchor = (
+        datetime.combine(date.fromisoformat(args.anchor), clock(), tzinfo=timezone.utc)
+        if args.anchor
+        else None
+    )
+    started = time.perf_counter()
+    try:
+        await create_schema(engine, drop=args.drop)
+        counts = await populate(
+            engine,
+            scale,
+            seed=args.seed,
+            anchor=anchor,
+            progress=lambda counts: print(
+                f"\r{counts['chat_sessions']:,} / {scale.sessions:,} sessions",
+                end="",
+                file=sys.stderr,
+            ),
+        )
+    finally:
+        await engine.dispose()
+    print(file=sys.stderr)
+    for name, count in counts.items():
+        print(f"{name:20} {count:>12,}")
+    print(f"{time.perf_counter() - started:.1f}s")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True, help="Async database URL")
+    parser.add_argument("--sessions", type=int, default=Scale.sessions)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", help="Latest date of the data (default: today)")
+    parser.add_argument("--drop", action="store_true", help="Drop tables first")
+    return asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
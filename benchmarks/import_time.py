@@ -0,0 +1,163 @@
+"""Import-time benchmark for worker cold starts.
+
+Each case is imported in a fresh interpreter several times. SQLAlchemy
+(which every case needs and we do not control) is imported before the
+clock starts; the median of the remaining time must stay within the case's
+budget, and importing one repository must not import unrelated ones. With
+the models imported beforehand, one repository must also import
+measurably faster than all of them.
+
+Usage:
+    python benchmarks/import_time.py [--runs 7] [--budget-scale 1.5]
+
+Exits with status 1 when a budget or isolation check fails.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BASELINE = "import sqlalchemy.orm, sqlalchemy.ext.asyncio"
+
+# (label, import statement, budget in ms, modules that must not be imported)
+CASES: List[Tuple[str, str, float, List[str]]] = [
+    (
+        "package",
+        "import shared.repositories",
+        25,
+        ["shared.models", "shared.repositories.lead_repository"],
+    ),
+    (
+        "models",
+        "from shared.models import Lead",
+        150,
+        ["shared.repositories.base_repository"],
+    ),
+    (
+        "one repository",
+        "from shared.repositories import LeadRepository",
+        200,
+        [
+            "shared.repositories.chat_message_repository",
+            "shared.repositories.funnel_event_repository",
+            "shared.export",
+        ],
+    ),
+    ("all repositories", "from shared.repositories import *", 350, []),
+]
+
+# (one, all, largest allowed ratio of their times) with the models, which
+# every repository needs, imported before the clock starts
+LAZY_REPOSITORIES = (
+    "from shared.repositories import LeadRepository",
+    "from shared.repositories import *",
+    0.75,
+)
+
+_PROBE = """
+import json, sys, time
+{setup}
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(statement: str, runs: int, setup: str = "") -> Tuple[float, List[str]]:
+    """Median time of ``statement`` in ms and the modules loaded by the last run."""
+    times = []
+    modules: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(setup=setup, statement=statement)],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        times.append(result["ms"])
+        modules = result["modules"]
+    return statistics.median(times), modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, e.g. for slower CI machines",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    baseline, _ = measure(BASELINE, args.runs)
+    results: Dict[str, dict] = {}
+    failed = False
+    for label, statement, budget, forbidden in CASES:
+        budget *= args.budget_scale
+        # SQLAlchemy is imported before timing starts
+        overhead, modules = measure(statement, args.runs, setup=BASELINE)
+        leaked = sorted(set(forbidden).intersection(modules))
+        ok = overhead <= budget and not leaked
+        failed = failed or not ok
+        results[label] = {
+            "statement": statement,
+            "overhead_ms": round(overhead, 1),
+            "budget_ms": budget,
+            "leaked_modules": leaked,
+            "ok": ok,
+        }
+
+    one, every, max_ratio = LAZY_REPOSITORIES
+    setup = f"{BASELINE}; import shared.models"
+    one_ms, _ = measure(one, args.runs, setup=setup)
+    every_ms, _ = measure(every, args.runs, setup=setup)
+    lazy = {
+        "one_ms": round(one_ms, 1),
+        "all_ms": round(every_ms, 1),
+        "max_ratio": max_ratio,
+        "ok": one_ms <= every_ms * max_ratio,
+    }
+    failed = failed or not lazy["ok"]
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "baseline_ms": round(baseline, 1),
+                    "cases": results,
+                    "lazy_repositories": lazy,
+                },
+            ),
+        )
+    else:
+        print(f"SQLAlchemy baseline: {baseline:.1f} ms (excluded)")
+        for label, result in results.items():
+            status = "ok" if result["ok"] else "FAIL"
+            line = (
+                f"{status:4} {label:18} +{result['overhead_ms']:.1f} ms"
+                f" (budget {result['budget_ms']:.0f} ms)"
+            )
+            if result["leaked_modules"]:
+                line += f"  imports {', '.join(result['leaked_modules'])}"
+            print(line)
+        status = "ok" if lazy["ok"] else "FAIL"
+        print(
+            f"{status:4} {'lazy repositories':18} +{lazy['one_ms']:.1f} ms for one,"
+            f" +{lazy['all_ms']:.1f} ms for all (at most {max_ratio:.0%})",
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
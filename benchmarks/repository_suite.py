@@ -0,0 +1,921 @@
+"""Latency and statement-count benchmarks of every public repository method.
+
+Fills the database with seeded synthetic data (see ``datagen.py``) unless
+it already holds sessions, then calls each repository method repeatedly
+with arguments drawn from the data, each call on a new session, going
+through all cases in a few rounds. Reported per case: p50 / p95 / p99
+latency, statements per call and whether an identical SELECT repeated
+within one call (an N+1).
+
+Write methods run inside a unit of work that is flushed and then rolled
+back, so the data stays unchanged; their timings include the flush and
+rollback but no commit.
+
+Results can be saved as JSON and compared against a baseline saved the
+same way, on the same database and scale. A case regresses when it runs
+more statements, newly repeats a SELECT, or its p50 grows by more than
+the tolerance relative to the run as a whole:
+
+    python benchmarks/repository_suite.py --output baseline.json
+    ...change a repository...
+    python benchmarks/repository_suite.py --baseline baseline.json
+
+Usage:
+    python benchmarks/repository_suite.py [--url sqlite+aiosqlite:///bench.db]
+        [--sessions 2000] [--seed 42] [--iterations 30] [--only Lead]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.5]
+
+Exits with status 1 when a case fails or regresses against the baseline,
+or when a public repository method has no case.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, get_origin
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import datagen  # noqa: E402
+import sqlalchemy  # noqa: E402
+from sqlalchemy import ColumnElement, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
+
+from shared.db import DatabaseSettings, build_engine  # noqa: E402
+from shared.models import (  # noqa: E402
+    BaseModel,
+    ChatMessage,
+    ChatSession,
+    EmailLog,
+    FunnelEvent,
+    Lead,
+    SessionDocument,
+    ToolExecution,
+    User,
+)
+from shared.repositories import (  # noqa: E402
+    BaseRepository,
+    ChatMessageRepository,
+    ChatSessionRepository,
+    EmailLogRepository,
+    FunnelEventRepository,
+    LeadRepository,
+    SessionDocumentRepository,
+    StatementCounter,
+    ToolExecutionRepository,
+    UnitOfWork,
+    UserRepository,
+    count_statements,
+)
+
+DEFAULT_URL = "sqlite+aiosqlite:///bench.db"
+DEFAULT_SESSIONS = 2000
+ITERATIONS = 30
+WARMUP = 3
+# The iterations of all cases are interleaved in this many rounds
+ROUNDS = 5
+# Keys of each kind drawn from the data; calls cycle through them
+SAMPLE_SIZE = 50
+# Rows written by the bulk write cases
+BULK_ROWS = 100
+# Relative slowdown of p50 counted as a regression, and the absolute
+# slowdown below which differences are treated as noise
+TOLERANCE = 0.5
+MIN_DELTA_MS = 0.5
+
+Arguments = Tuple[tuple, Dict[str, Any]]
+
+
+def arguments(*args: Any, **kwargs: Any) -> Arguments:
+    return args, kwargs
+
+
+@dataclass
+class Samples:
+    """Keys of existing rows, and the time of the newest session."""
+
+    keys: Dict[str, List[Any]]
+    latest: datetime
+
+    def pick(self, kind: str, index: int) -> Any:
+        values = self.keys[kind]
+        if not values:
+            raise LookupError(f"No {kind} in the data")
+        return values[index % len(values)]
+
+
+@dataclass
+class Case:
+    """One benchmarked call of a repository method."""
+
+    repository: Type[BaseRepository]
+    method: str
+    # Builds the call's arguments from the samples and the iteration number
+    build: Callable[[Samples, int], Arguments] = lambda samples, index: ((), {})
+    variant: Optional[str] = None
+    write: bool = False
+
+    @property
+    def name(self) -> str:
+        name = f"{self.repository.__name__}.{self.method}"
+        return f"{name}[{self.variant}]" if self.variant else name
+
+
+@dataclass
+class Result:
+    """Measurements of one case."""
+
+    iterations: int = 0
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    mean_ms: float = 0.0
+    statements: int = 0
+    n_plus_one: bool = False
+    error: Optional[str] = None
+    timings_ms: List[float] = field(default_factory=list, repr=False)
+    statement_counts: List[int] = field(default_factory=list, repr=False)
+
+    def add(self, elapsed_ms: float, counter: StatementCounter) -> None:
+        self.timings_ms.append(elapsed_ms)
+        self.statement_counts.append(counter.statements)
+        self.n_plus_one = self.n_plus_one or bool(counter.repeated())
+
+    def finish(self) -> None:
+        """Compute the statistics of the measured calls."""
+        if self.error or not self.timings_ms:
+            return
+        timings = self.timings_ms
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        self.iterations = len(timings)
+        self.p50_ms, self.p95_ms, self.p99_ms = cuts[49], cuts[94], cuts[98]
+        self.mean_ms = statistics.fmean(timings)
+        self.statements = statistics.median_low(self.statement_counts)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in vars(self).items()
+            if not isinstance(value, list)
+        }
+
+
+# Model of each benchmarked repository
+REPOSITORIES: Dict[Type[BaseRepository], Type[BaseModel]] = {
+    ChatSessionRepository: ChatSession,
+    ChatMessageRepository: ChatMessage,
+    ToolExecutionRepository: ToolExecution,
+    SessionDocumentRepository: SessionDocument,
+    FunnelEventRepository: FunnelEvent,
+    LeadRepository: Lead,
+    EmailLogRepository: EmailLog,
+    UserRepository: User,
+}
+
+# Values written by the generic update cases
+UPDATES: Dict[Type[BaseModel], Dict[str, Any]] = {
+    ChatSession: {"locale": "fr-CH"},
+    ChatMessage: {"content": "Bearbeitet."},
+    ToolExecution: {"status": "error"},
+    SessionDocument: {"status": "sent"},
+    FunnelEvent: {"utm_source": "benchmark"},
+    Lead: {"consent": True},
+    EmailLog: {"status": "sent"},
+    User: {"is_active": False},
+}
+
+
+def scope(model: Type[BaseModel], samples: Samples, index: int) -> ColumnElement[bool]:
+    """Predicate matching a realistic handful of rows of ``model``."""
+    if model is ChatSession:
+        return ChatSession.id == samples.pick("session_id", index)
+    if model is Lead:
+        return Lead.email == samples.pick("lead_email", index)
+    if model is EmailLog:
+        return EmailLog.lead_id == samples.pick("lead_id", index)
+    if model is User:
+        return User.role == "viewer"
+    return model.session_id == samples.pick("session_id", index)
+
+
+def fresh_rows(
+    model: Type[BaseModel],
+    samples: Samples,
+    count: int,
+    seed: int,
+) -> List[Dict[str, Any]]:
+    """New rows of ``model`` that reference existing parents."""
+    generator = datagen.RowGenerator(
+        random.Random(seed), datagen.Scale(), samples.latest
+    )
+    table = model.__tablename__
+    if model is User:
+        rows = [generator.user(index) for index in range(count)]
+        for index, row in enumerate(rows):
+            row["email"] = f"benchmark-{seed}-{index}@primai.example"
+        return rows
+
+    rows: List[Dict[str, Any]] = []
+    while len(rows) < count:
+        chunk: Dict[str, List[dict]] = {name: [] for name in datagen.TABLES}
+        generator.session(chunk)
+        rows.extend(chunk[table])
+    rows = rows[:count]
+    if model is Lead:
+        # One lead per session: leave new leads unattached
+        for row in rows:
+            row["session_id"] = None
+    elif model is not ChatSession:
+        for index, row in enumerate(rows):
+            if "session_id" in row:
+                row["session_id"] = samples.pick("session_id", seed + index)
+            if row.get("lead_id"):
+                row["lead_id"] = samples.pick("lead_id", seed + index)
+    return rows
+
+
+def generic_cases(
+    repository: Type[BaseRepository],
+    model: Type[BaseModel],
+) -> List[Case]:
+    """Cases of the methods every repository inherits from BaseRepository."""
+    kind = f"{model.__name__}.id"
+    values = UPDATES[model]
+    return [
+        Case(repository, "get_by_id", lambda s, i: arguments(s.pick(kind, i))),
+        Case(repository, "get_by_id_cached", lambda s, i: arguments(s.pick(kind, i))),
+        Case(repository, "get_all", lambda s, i: arguments(limit=100)),
+        Case(repository, "get_all_cursor", lambda s, i: arguments(limit=100)),
+        Case(
+            repository,
+            "stream_where",
+            lambda s, i: arguments(scope(model, s, i)),
+        ),
+        Case(
+            repository,
+            "create",
+            lambda s, i: arguments(**fresh_rows(model, s, 1, i)[0]),
+            write=True,
+        ),
+        Case(
+            repository,
+            "update",
+            lambda s, i: arguments(s.pick(kind, i), **values),
+            write=True,
+        ),
+        Case(
+            repository,
+            "update_by_id",
+            lambda s, i: arguments(s.pick(kind, i), values),
+            write=True,
+        ),
+        Case(
+            repository,
+            "update_where",
+            lambda s, i: arguments(scope(model, s, i), values),
+            write=True,
+        ),
+        Case(repository, "delete", lambda s, i: arguments(s.pick(kind, i)), write=True),
+        Case(
+            repository,
+            "delete_where",
+            lambda s, i: arguments(scope(model, s, i)),
+            write=True,
+        ),
+        *(
+            Case(
+                repository,
+                method,
+                lambda s, i: arguments(fresh_rows(model, s, BULK_ROWS, i)),
+                write=True,
+            )
+            for method in ("bulk_create", "bulk_create_stream", "copy_load")
+        ),
+    ]
+
+
+def partition_cases(repository: Type[BaseRepository]) -> List[Case]:
+    """Cases of the MonthlyPartitionedRepository maintenance methods."""
+    return [
+        Case(repository, "list_partitions"),
+        Case(repository, "create_upcoming_partitions", write=True),
+        Case(
+            repository,
+            "detach_partitions_before",
+            # Older than all data, so nothing is detached
+            lambda s, i: arguments(s.latest - timedelta(days=3 * 365)),
+            write=True,
+        ),
+    ]
+
+
+def specific_cases() -> List[Case]:
+    """Cases of the methods defined by the individual repositories."""
+
+    def days_before(samples: Samples, days: int) -> Tuple[datetime, datetime]:
+        return samples.latest - timedelta(days=days), samples.latest
+
+    return [
+        # Chat sessions
+        Case(ChatSessionRepository, "get_sessions_with_filters"),
+        Case(
+            ChatSessionRepository,
+            "get_sessions_with_filters",
+            lambda s, i: arguments(search=s.pick("search", i), accident=False),
+            variant="search",
+        ),
+        Case(ChatSessionRepository, "get_sessions_with_filters_cursor"),
+        Case(
+            ChatSessionRepository,
+            "get_transcript",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            ChatSessionRepository,
+            "get_transcript",
+            lambda s, i: arguments(
+                s.pick("session_id", i),
+                message_limit=10,
+                include_large_fields=False,
+            ),
+            variant="paged",
+        ),
+        Case(
+            ChatSessionRepository,
+            "adjust_counters",
+            # As after a bulk insert spread over many sessions
+            lambda s, i: arguments(
+                "message_count",
+                {s.pick("session_id", i + offset): 1 for offset in range(SAMPLE_SIZE)},
+            ),
+            write=True,
+        ),
+        Case(
+            ChatSessionRepository,
+            "reconcile_counters",
+            lambda s, i: arguments(
+                [s.pick("session_id", i + offset) for offset in range(20)],
+            ),
+            write=True,
+        ),
+        # Chat messages
+        Case(
+            ChatMessageRepository,
+            "get_by_session_id",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            ChatMessageRepository,
+            "get_messages_by_session_paginated",
+            lambda s, i: arguments(s.pick("session_id", i), limit=20),
+        ),
+        Case(
+            ChatMessageRepository,
+            "get_messages_by_session_cursor",
+            lambda s, i: arguments(s.pick("session_id", i), limit=20),
+        ),
+        # Tool executions
+        Case(
+            ToolExecutionRepository,
+            "get_by_session_id",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            ToolExecutionRepository,
+            "get_by_message_id",
+            lambda s, i: arguments(s.pick("tool_message_id", i)),
+        ),
+        Case(
+            ToolExecutionRepository,
+            "get_by_tool_name",
+            lambda s, i: arguments(*s.pick("session_tool", i)),
+        ),
+        Case(
+            ToolExecutionRepository,
+            "get_tool_executions_by_session_paginated",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            ToolExecutionRepository,
+            "get_tool_executions_by_session_cursor",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        # Session documents
+        Case(
+            SessionDocumentRepository,
+            "get_by_session_id",
+            lambda s, i: arguments(s.pick("document_session_id", i)),
+        ),
+        Case(
+            SessionDocumentRepository,
+            "get_by_tool_execution_id",
+            lambda s, i: arguments(s.pick("document_tool_execution_id", i)),
+        ),
+        Case(
+            SessionDocumentRepository,
+            "get_by_document_type",
+            lambda s, i: arguments(*s.pick("session_document_type", i)),
+        ),
+        Case(
+            SessionDocumentRepository,
+            "get_documents_by_session_paginated",
+            lambda s, i: arguments(s.pick("document_session_id", i)),
+        ),
+        Case(
+            SessionDocumentRepository,
+            "get_documents_by_session_cursor",
+            lambda s, i: arguments(s.pick("document_session_id", i)),
+        ),
+        Case(
+            SessionDocumentRepository,
+            "update_status",
+            lambda s, i: arguments(s.pick("SessionDocument.id", i), "sent"),
+            write=True,
+        ),
+        # Funnel events
+        Case(
+            FunnelEventRepository,
+            "get_by_session_id",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            FunnelEventRepository,
+            "stream_by_session_id",
+            lambda s, i: arguments(s.pick("session_id", i)),
+        ),
+        Case(
+            FunnelEventRepository,
+            "stream_by_date_range",
+            lambda s, i: arguments(*days_before(s, 1)),
+        ),
+        Case(
+            FunnelEventRepository,
+            "get_by_lead_id",
+            lambda s, i: arguments(s.pick("event_lead_id", i)),
+        ),
+        Case(
+            FunnelEventRepository,
+            "get_by_event_type",
+            lambda s, i: arguments("lead_created", limit=100),
+        ),
+        Case(
+            FunnelEventRepository,
+            "get_funnel",
+            lambda s, i: arguments(
+                [step for step, _ in datagen.FUNNEL],
+                *days_before(s, 30),
+            ),
+        ),
+        Case(
+            FunnelEventRepository,
+            "get_funnel",
+            lambda s, i: arguments(
+                [step for step, _ in datagen.FUNNEL],
+                *days_before(s, 30),
+                breakdown="utm_source",
+            ),
+            variant="breakdown",
+        ),
+        Case(
+            FunnelEventRepository,
+            "stream_funnel",
+            lambda s, i: arguments(
+                [step for step, _ in datagen.FUNNEL],
+                *days_before(s, 90),
+            ),
+        ),
+        # Leads
+        Case(
+            LeadRepository,
+            "get_by_email",
+            lambda s, i: arguments(s.pick("lead_email", i)),
+        ),
+        Case(LeadRepository, "get_consented_leads"),
+        Case(LeadRepository, "stream_consented_leads"),
+        Case(LeadRepository, "get_leads_with_filters"),
+        Case(
+            LeadRepository,
+            "get_leads_with_filters",
+            lambda s, i: arguments(search=s.pick("search", i)),
+            variant="search",
+        ),
+        Case(LeadRepository, "get_leads_with_filters_cursor"),
+        # Email logs
+        Case(
+            EmailLogRepository,
+            "get_by_provider_id",
+            lambda s, i: arguments(s.pick("provider_id", i)),
+        ),
+        Case(EmailLogRepository, "get_logs_with_filters"),
+        Case(
+            EmailLogRepository,
+            "get_logs_with_filters",
+            lambda s, i: arguments(status="failed"),
+            variant="status",
+        ),
+        Case(EmailLogRepository, "get_logs_with_filters_cursor"),
+        Case(
+            EmailLogRepository,
+            "get_analytics",
+            lambda s, i: arguments(end_date=s.latest, tz="Europe/Zurich"),
+        ),
+        Case(
+            EmailLogRepository,
+            "update_status_by_provider_id",
+            lambda s, i: arguments(s.pick("provider_id", i), "sent"),
+            write=True,
+        ),
+        # Users
+        Case(
+            UserRepository,
+            "get_user_by_email",
+            lambda s, i: arguments(s.pick("user_email", i)),
+        ),
+        Case(
+            UserRepository,
+            "is_email_taken",
+            lambda s, i: arguments(s.pick("user_email", i)),
+        ),
+        Case(
+            UserRepository,
+            "create_user",
+            lambda s, i: arguments(
+                {
+                    "name": "Benchmark",
+                    "email": f"benchmark-{i}@primai.example",
+                    "password": "secret",
+                },
+            ),
+            write=True,
+        ),
+        Case(
+            UserRepository,
+            "update_user",
+            lambda s, i: arguments(s.pick("User.id", i), {"name": "Benchmark"}),
+            write=True,
+        ),
+    ]
+
+
+def all_cases() -> List[Case]:
+    cases = []
+    for repository, model in REPOSITORIES.items():
+        cases.extend(generic_cases(repository, model))
+        if hasattr(repository, "list_partitions"):
+            cases.extend(partition_cases(repository))
+    cases.extend(specific_cases())
+    return cases
+
+
+def missing_cases(cases: List[Case]) -> List[str]:
+    """Public async repository methods that no case calls.
+
+    Besides coroutine and async generator functions, these include plain
+    methods annotated to return an async iterator (such as
+    ``stream_consented_leads``, which hands back ``stream_where``'s).
+    """
+    covered = {(case.repository, case.method) for case in cases}
+    missing = []
+    for repository in REPOSITORIES:
+        for name, value in inspect.getmembers(repository):
+            is_async = (
+                inspect.iscoroutinefunction(value)
+                or inspect.isasyncgenfunction(value)
+                or _returns_async_iterable(value)
+            )
+            if (
+                is_async
+                and not name.startswith("_")
+                and (repository, name) not in covered
+            ):
+                missing.append(f"{repository.__name__}.{name}")
+    return missing
+
+
+def _returns_async_iterable(value: Any) -> bool:
+    if not inspect.isfunction(value):
+        return False
+    returns = inspect.signature(value).return_annotation
+    origin = get_origin(returns) or returns
+    return isinstance(origin, type) and issubclass(origin, AsyncIterable)
+
+
+async def draw_samples(db: AsyncSession) -> Samples:
+    """Draw the first ``SAMPLE_SIZE`` distinct keys of each kind.
+
+    Keys sort randomly (UUIDs, random emails), so the samples spread over
+    the whole data set and stay the same between runs on the same data.
+    """
+
+    async def column(*columns: Any, where: Any = None) -> List[Any]:
+        query = select(*columns).distinct()
+        if where is not None:
+            query = query.where(where)
+        query = query.order_by(*columns)
+        result = await db.execute(query.limit(SAMPLE_SIZE))
+        return [row[0] if len(row) == 1 else tuple(row) for row in result]
+
+    keys: Dict[str, List[Any]] = {}
+    for model in REPOSITORIES.values():
+        keys[f"{model.__name__}.id"] = await column(model.id)
+    keys["session_id"] = keys["ChatSession.id"]
+    keys["tool_message_id"] = await column(
+        ToolExecution.message_id,
+        where=ToolExecution.message_id.is_not(None),
+    )
+    keys["session_tool"] = await column(
+        ToolExecution.session_id, ToolExecution.tool_name
+    )
+    keys["document_session_id"] = await column(SessionDocument.session_id)
+    keys["document_tool_execution_id"] = await column(
+        SessionDocument.tool_execution_id,
+        where=SessionDocument.tool_execution_id.is_not(None),
+    )
+    keys["session_document_type"] = await column(
+        SessionDocument.session_id,
+        SessionDocument.document_type,
+    )
+    keys["event_lead_id"] = await column(
+        FunnelEvent.lead_id,
+        where=FunnelEvent.lead_id.is_not(None),
+    )
+    keys["lead_id"] = keys["Lead.id"]
+    keys["lead_email"] = await column(Lead.email)
+    # Substring searches, e.g. "anna" from "anna.1f2e3d4c@example.ch"
+    keys["search"] = sorted({email.split(".")[0] for email in keys["lead_email"]})
+    keys["provider_id"] = await column(
+        EmailLog.provider_id,
+        where=EmailLog.provider_id.is_not(None),
+    )
+    keys["user_email"] = await column(User.email)
+
+    latest = (await db.execute(select(func.max(ChatSession.created_at)))).scalar()
+    if latest is None:
+        raise LookupError("The database holds no chat sessions")
+    if latest.tzinfo is None:
+        latest = latest.replace(tzinfo=timezone.utc)
+    return Samples(keys, latest)
+
+
+class _RollBack(Exception):
+    pass
+
+
+async def call(db: AsyncSession, case: Case, built: Arguments) -> Any:
+    args, kwargs = built
+    result = getattr(case.repository(db), case.method)(*args, **kwargs)
+    if inspect.isasyncgen(result):
+        return [batch async for batch in result]
+    return await result
+
+
+async def measure(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    case: Case,
+    samples: Samples,
+    indexes: range,
+    result: Optional[Result],
+) -> None:
+    """Call a case once per index, recording into ``result`` if given.
+
+    Raises:
+        Whatever the call raises
+    """
+    for index in indexes:
+        built = case.build(samples, index)
+        async with sessionmaker() as db:
+            with count_statements() as counter:
+                started = time.perf_counter()
+                if case.write:
+                    try:
+                        async with UnitOfWork(db) as uow:
+                            await call(db, case, built)
+                            await uow.flush()
+                            raise _RollBack
+                    except _RollBack:
+                        pass
+                else:
+                    await call(db, case, built)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+        if result is not None:
+            result.add(elapsed_ms, counter)
+
+
+async def run_cases(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    cases: List[Case],
+    samples: Samples,
+    iterations: int,
+    warmup: int,
+) -> Dict[str, Result]:
+    """Warm up and measure the cases; errors are recorded, not raised.
+
+    The iterations are split into rounds that each go through all cases,
+    so that a stretch of background load slows every case a little rather
+    than a few cases a lot.
+    """
+    results = {case.name: Result() for case in cases}
+    size = max(1, -(-iterations // ROUNDS))
+    rounds = [
+        range(start, min(start + size, warmup + iterations))
+        for start in range(warmup, warmup + iterations, size)
+    ]
+    for number, indexes in enumerate([range(warmup), *rounds]):
+        if number:
+            print(f"Round {number}/{len(rounds)}", file=sys.stderr)
+        for case in cases:
+            result = results[case.name]
+            if result.error:
+                continue
+            try:
+                await measure(
+                    sessionmaker,
+                    case,
+                    samples,
+                    indexes,
+                    result if number else None,
+                )
+            except Exception as error:
+                result.error = f"{type(error).__name__}: {error}"
+    for result in results.values():
+        result.finish()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """Describe each regression of ``results`` against ``baseline``.
+
+    Only p50 latencies are compared, the tail being too noisy over a few
+    dozen calls, and after dividing out the median p50 ratio of all cases
+    so that a busier or faster machine does not register as a change
+    everywhere. Statement counts are compared as they are.
+    """
+    pairs = [
+        (before, results[name])
+        for name, before in baseline.items()
+        if name in results and not before["error"] and not results[name]["error"]
+    ]
+    ratios = [after["p50_ms"] / before["p50_ms"] for before, after in pairs]
+    drift = statistics.median(ratios) if ratios else 1.0
+    if abs(drift - 1) > tolerance:
+        print(f"warning: all cases {drift:.2f}x the baseline", file=sys.stderr)
+
+    regressions = []
+    for name, before in baseline.items():
+        after = results.get(name)
+        if after is None or after["error"] or before["error"]:
+            continue
+        expected = before["p50_ms"] * drift
+        if (
+            after["p50_ms"] > expected * (1 + tolerance)
+            and after["p50_ms"] - expected > min_delta_ms
+        ):
+            regressions.append(
+                f"{name}: p50 {before['p50_ms']:.2f} -> {after['p50_ms']:.2f} ms",
+            )
+        if after["statements"] > before["statements"]:
+            regressions.append(
+                f"{name}: statements {before['statements']} -> {after['statements']}",
+            )
+        if after["n_plus_one"] and not before["n_plus_one"]:
+            regressions.append(f"{name}: repeats an identical SELECT (N+1)")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Tuple[Dict[str, Any], List[str]]:
+    """Prepare the data, run the cases and return the report and problems."""
+    engine = build_engine(DatabaseSettings(url=args.url))
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    problems: List[str] = []
+    try:
+        await datagen.create_schema(engine)
+        async with sessionmaker() as db:
+            sessions = (await db.execute(select(func.count(ChatSession.id)))).scalar()
+        if not sessions:
+            print(f"Generating {args.sessions:,} sessions...", file=sys.stderr)
+            await datagen.populate(
+                engine, datagen.Scale(sessions=args.sessions), args.seed
+            )
+            sessions = args.sessions
+        async with sessionmaker() as db:
+            samples = await draw_samples(db)
+
+        cases = all_cases()
+        problems.extend(
+            f"{name}: public method without a benchmark case"
+            for name in missing_cases(cases)
+        )
+        selected = [case for case in cases if not args.only or args.only in case.name]
+        measured = await run_cases(
+            sessionmaker,
+            selected,
+            samples,
+            args.iterations,
+            args.warmup,
+        )
+        results: Dict[str, Dict[str, Any]] = {}
+        for name, result in measured.items():
+            results[name] = result.summary()
+            print(format_result(name, result), file=sys.stderr)
+            if result.error:
+                problems.append(f"{name}: {result.error}")
+    finally:
+        await engine.dispose()
+
+    report = {
+        "meta": {
+            "dialect": engine.dialect.name,
+            "sessions": sessions,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+    return report, problems
+
+
+def format_result(name: str, result: Result) -> str:
+    if result.error:
+        return f"{name:70} ERROR {result.error}"
+    flag = "  N+1" if result.n_plus_one else ""
+    return (
+        f"{name:70} p50 {result.p50_ms:8.2f}  p95 {result.p95_ms:8.2f}  "
+        f"p99 {result.p99_ms:8.2f} ms  {result.statements:3d} stmts{flag}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DEFAULT_URL, help="Async database URL")
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=DEFAULT_SESSIONS,
+        help="Sessions to generate when the database is empty",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--only", help="Run only cases whose name contains this")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare with saved results")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_MS)
+    args = parser.parse_args()
+
+    # stream_funnel repeats its query per window by design; the repeats are
+    # reported in the results rather than logged
+    logging.getLogger("shared.repositories.loading").setLevel(logging.ERROR)
+    report, problems = asyncio.run(run(args))
+    if args.only:
+        # A partial run does not cover every method
+        problems = [
+            problem for problem in problems if "without a benchmark" not in problem
+        ]
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        for key in ("dialect", "sessions", "seed", "iterations"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                print(
+                    f"warning: baseline {key} {baseline['meta'].get(key)!r} "
+                    f"differs from {report['meta'][key]!r}",
+                    file=sys.stderr,
+                )
+        problems.extend(
+            compare(
+                report["results"],
+                baseline["results"],
+                args.tolerance,
+                args.min_delta_ms,
+            ),
+        )
+
+    for problem in problems:
+        print(f"FAIL {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Per-call Python overhead of the hot repository lookups.
+
+Compares each lookup as previously written (a fresh ``select()`` per call)
+with the prebuilt statement the repository now executes. Two costs are
+measured per call:
+
+- build: constructing the statement and computing the cache key that
+  SQLAlchemy derives on every execution
+- execute: a full ORM execution against in-memory SQLite, which adds the
+  driver and result processing common to both
+
+Usage:
+    python benchmarks/statement_cache.py [--calls 2000] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session, load_only  # noqa: E402
+
+from shared.models import (  # noqa: E402
+    Base,
+    ChatMessage,
+    EmailLog,
+    Lead,
+    SessionDocument,
+    User,
+)
+from shared.repositories import (  # noqa: E402
+    chat_message_repository,
+    email_log_repository,
+    lead_repository,
+    session_document_repository,
+    user_repository,
+)
+
+# (label, fresh statement per call, prebuilt statement, parameters)
+CASES: List[Tuple[str, Callable[[str], Any], Any, Dict[str, Any]]] = [
+    (
+        "Lead by email",
+        lambda value: select(Lead).where(Lead.email == value),
+        lead_repository._BY_EMAIL,
+        {"email": "a@example.com"},
+    ),
+    (
+        "User by email",
+        lambda value: select(User)
+        .options(
+            load_only(
+                User.id,
+                User.name,
+                User.email,
+                User.phone,
+                User.role,
+                User.is_active,
+                User.last_active,
+                User.created_at,
+                User.updated_at,
+                User.password,
+            ),
+        )
+        .filter(User.email == value),
+        user_repository._by_email(),
+        {"email": "a@example.com"},
+    ),
+    (
+        "EmailLog by provider id",
+        lambda value: select(EmailLog).where(EmailLog.provider_id == value),
+        email_log_repository._BY_PROVIDER_ID,
+        {"provider_id": "provider-1"},
+    ),
+    (
+        "ChatMessage by session",
+        lambda value: select(ChatMessage)
+        .where(ChatMessage.session_id == value)
+        .order_by(ChatMessage.created_at),
+        chat_message_repository._BY_SESSION,
+        {"session_id": "session-1"},
+    ),
+    (
+        "SessionDocument by session",
+        lambda value: select(SessionDocument)
+        .where(SessionDocument.session_id == value)
+        .order_by(SessionDocument.created_at),
+        session_document_repository._BY_SESSION,
+        {"session_id": "session-1"},
+    ),
+]
+
+
+def per_call_us(function: Callable[[], Any], calls: int) -> float:
+    """Average duration of ``function`` in microseconds."""
+    function()  # warm SQLAlchemy's compiled cache
+    started = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    results: Dict[str, dict] = {}
+    with Session(engine) as session:
+        for label, fresh, prebuilt, params in CASES:
+            value = next(iter(params.values()))
+            results[label] = {
+                "build_fresh_us": per_call_us(
+                    lambda: fresh(value)._generate_cache_key(),
+                    args.calls,
+                ),
+                "build_prebuilt_us": per_call_us(
+                    lambda: prebuilt._generate_cache_key(),
+                    args.calls,
+                ),
+                "execute_fresh_us": per_call_us(
+                    lambda: session.execute(fresh(value)).all(),
+                    args.calls,
+                ),
+                "execute_prebuilt_us": per_call_us(
+                    lambda: session.execute(prebuilt, params).all(),
+                    args.calls,
+                ),
+            }
+    engine.dispose()
+
+    if args.json:
+        print(json.dumps(results))
+        return 0
+    print(f"{'lookup':28} {'build (us)':>20} {'execute (us)':>22}")
+    for label, result in results.items():
+        print(
+            f"{label:28}"
+            f" {result['build_fresh_us']:8.1f} -> {result['build_prebuilt_us']:6.1f}"
+            f"   {result['execute_fresh_us']:8.1f} -> "
+            f"{result['execute_prebuilt_us']:8.1f}",
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,5 +10,9 @@ setup(
         "pydantic>=2.8.2",
         "pydantic-settings>=2.3.4",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=15.0.0"],
+        "orjson": ["orjson>=3.9"],
+    },
     python_requires=">=3.11",
 )
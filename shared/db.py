@@ -0,0 +1,284 @@
+"""Async engine and session factories shared by the API and the workers.
+
+Typical startup::
+
+    settings = DatabaseSettings()  # DATABASE_URL, DATABASE_POOL_SIZE, ...
+    engine = build_engine(settings)
+    Session = build_sessionmaker(engine)
+    await warm_up(engine, settings.warmup_connections)
+
+With read replicas, ``build_router(settings, engine).sessionmaker()``
+replaces ``build_sessionmaker``. ``pool_metrics(engine)`` reports the
+pool's live usage and counters, for sizing ``pool_size`` /
+``max_overflow`` from data.
+"""
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import exc, make_url, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from shared.repositories.instrumentation import record_pool_wait
+from shared.repositories.routing import MAX_REPLICA_LAG, STICKY_SECONDS, ReplicaRouter
+
+# Prepared statements kept per connection by SQLAlchemy's asyncpg dialect
+# (its default is 100). The repositories' hot lookups are prebuilt
+# statements with stable SQL text, so each is prepared once per connection
+# and reused from then on.
+PREPARED_STATEMENT_CACHE_SIZE = 500
+
+
+class DatabaseSettings(BaseSettings):
+    """Engine and pool configuration, read from ``DATABASE_*`` variables."""
+
+    model_config = SettingsConfigDict(env_prefix="DATABASE_", extra="ignore")
+
+    url: str = Field(repr=False)
+    echo: bool = False
+    application_name: Optional[str] = None
+    # Connections kept open, and extra ones opened under load
+    pool_size: int = 10
+    max_overflow: int = 10
+    # Seconds to wait for a free connection before raising
+    pool_timeout: float = 30.0
+    # Replace connections older than this many seconds
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # Set when connecting through PgBouncer in transaction pooling mode
+    pgbouncer: bool = False
+    prepared_statement_cache_size: int = PREPARED_STATEMENT_CACHE_SIZE
+    # Connections opened by warm_up (defaults to pool_size)
+    warmup_connections: Optional[int] = None
+    # Read replicas, as a JSON list in DATABASE_REPLICA_URLS; see
+    # build_router
+    replica_urls: List[str] = Field(default_factory=list, repr=False)
+    # Read-your-writes window after a write, in seconds
+    replica_sticky_seconds: float = STICKY_SECONDS
+    # Replication lag (seconds) above which a replica gets no reads
+    replica_max_lag: float = MAX_REPLICA_LAG
+
+
+@dataclass
+class PoolMetrics:
+    """Live state and running totals of an engine's connection pool."""
+
+    pool_size: int = 0
+    checked_out: int = 0
+    # Connections open beyond pool_size right now (negative while the
+    # pool has not filled up yet)
+    overflow: int = 0
+    checkouts: int = 0
+    connects: int = 0
+    overflow_connects: int = 0
+    timeouts: int = 0
+    # Time spent obtaining connections: waiting for a free one or opening
+    # a new one, including checkouts that timed out
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        attempts = self.checkouts + self.timeouts
+        return self.wait_seconds_total / attempts if attempts else 0.0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool recording checkout waits, connects and overflow events."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedPool":
+        # engine.dispose() replaces the pool; keep counting across it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            self._record_wait(time.perf_counter() - started)
+            raise
+        self.metrics.checkouts += 1
+        self._record_wait(time.perf_counter() - started)
+        return entry
+
+    def _record_wait(self, waited: float) -> None:
+        metrics = self.metrics
+        metrics.wait_seconds_total += waited
+        metrics.wait_seconds_max = max(metrics.wait_seconds_max, waited)
+        record_pool_wait(waited)
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        entry = super()._create_connection()
+        self.metrics.connects += 1
+        if self._overflow > 0:
+            self.metrics.overflow_connects += 1
+        return entry
+
+
+def asyncpg_connect_args(
+    prepared_statement_cache_size: int = PREPARED_STATEMENT_CACHE_SIZE,
+    pgbouncer: bool = False,
+    application_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build ``connect_args`` for ``create_async_engine`` on postgresql+asyncpg.
+
+    Example:
+        engine = create_async_engine(url, connect_args=asyncpg_connect_args())
+
+    Args:
+        prepared_statement_cache_size: Prepared statements cached per
+            connection
+        pgbouncer: Disable statement caching and use unique statement names,
+            since PgBouncer in transaction pooling mode may run consecutive
+            statements on different server connections
+        application_name: Reported in ``pg_stat_activity``
+
+    Returns:
+        Keyword arguments passed through to the asyncpg connection
+    """
+    connect_args: Dict[str, Any] = {
+        "prepared_statement_cache_size": prepared_statement_cache_size,
+    }
+    if pgbouncer:
+        connect_args.update(
+            prepared_statement_cache_size=0,
+            statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+    if application_name:
+        connect_args["server_settings"] = {"application_name": application_name}
+    return connect_args
+
+
+def build_engine(settings: Optional[DatabaseSettings] = None) -> AsyncEngine:
+    """Create an async engine with an instrumented, tuned connection pool.
+
+    Args:
+        settings: Engine configuration (read from the environment by default)
+
+    Returns:
+        AsyncEngine; in-memory SQLite (for tests) keeps its default pool
+    """
+    settings = settings or DatabaseSettings()
+    url = make_url(settings.url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return create_async_engine(url, echo=settings.echo)
+
+    connect_args: Dict[str, Any] = {}
+    if url.get_driver_name() == "asyncpg":
+        connect_args = asyncpg_connect_args(
+            settings.prepared_statement_cache_size,
+            pgbouncer=settings.pgbouncer,
+            application_name=settings.application_name,
+        )
+    return create_async_engine(
+        url,
+        echo=settings.echo,
+        poolclass=InstrumentedPool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def build_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Create the session factory used with the repositories.
+
+    Objects stay usable after commit (``expire_on_commit=False``); in async
+    code an expired attribute cannot be reloaded implicitly.
+    """
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def build_router(
+    settings: Optional[DatabaseSettings] = None,
+    primary: Optional[AsyncEngine] = None,
+) -> ReplicaRouter:
+    """Create a replica router for the primary and ``replica_urls``.
+
+    Replica engines get the same pool settings as the primary. Use
+    ``router.sessionmaker()`` in place of ``build_sessionmaker``.
+
+    Args:
+        settings: Engine configuration (read from the environment by default)
+        primary: Existing primary engine (built from ``settings`` if omitted)
+
+    Returns:
+        ReplicaRouter; with no replicas configured all reads use the primary
+    """
+    settings = settings or DatabaseSettings()
+    replicas = [
+        build_engine(settings.model_copy(update={"url": url}))
+        for url in settings.replica_urls
+    ]
+    return ReplicaRouter(
+        primary or build_engine(settings),
+        replicas,
+        sticky_seconds=settings.replica_sticky_seconds,
+        max_lag=settings.replica_max_lag,
+    )
+
+
+async def warm_up(engine: AsyncEngine, connections: Optional[int] = None) -> int:
+    """Open pool connections ahead of the first requests.
+
+    The connections are checked out together, so each one is a new
+    connection, and returned to the pool after a ``SELECT 1``.
+
+    Args:
+        engine: Engine to warm up
+        connections: Number of connections (defaults to the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    if connections is None:
+        size = getattr(engine.pool, "size", None)
+        connections = size() if callable(size) else 1
+
+    async with AsyncExitStack() as stack:
+        opened = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(connections)),
+        )
+        for connection in opened:
+            await connection.execute(text("SELECT 1"))
+    return len(opened)
+
+
+def pool_metrics(engine: AsyncEngine) -> Optional[PoolMetrics]:
+    """Snapshot of the pool's metrics, or None if the pool is not instrumented."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedPool):
+        return None
+    return replace(
+        pool.metrics,
+        pool_size=pool.size(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+    )
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
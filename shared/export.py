@@ -0,0 +1,244 @@
+"""Incremental CSV / NDJSON / Parquet exporters for streamed repository rows.
+
+Typical nightly export, resumable after an interruption::
+
+    with open("leads.csv", "a", newline="") as f:
+        result = await export_batches(
+            leads.stream_consented_leads(after=saved_token),
+            CsvExporter(f, Lead, write_header=saved_token is None),
+            checkpoint=save_token,
+        )
+"""
+
+import csv
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import IO, Any, AsyncIterable, Callable, List, Optional, Sequence, Type
+
+from sqlalchemy import JSON, Boolean, DateTime, Integer, inspect
+
+from shared.models.base import BaseModel
+from shared.models.serialization import is_internal
+from shared.repositories.pagination import encode_cursor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+@dataclass
+class ExportResult:
+    """Outcome of an export run."""
+
+    rows: int = 0
+    resume_token: Optional[str] = None
+
+
+class Exporter(ABC):
+    """Writes batches of model instances to a file, one batch at a time."""
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        columns: Optional[Sequence[str]] = None,
+    ):
+        self.model = model
+        self.columns = list(
+            columns
+            or [
+                attr.key
+                for attr in inspect(model).column_attrs
+                if not any(is_internal(column) for column in attr.columns)
+            ]
+        )
+
+    @abstractmethod
+    def write_batch(self, rows: List[BaseModel]) -> None:
+        """Append ``rows`` to the file."""
+
+    def flush(self) -> None:
+        """Make everything written so far durable before a checkpoint."""
+
+    def close(self) -> None:
+        """Finish the file; the exporter cannot be used afterwards."""
+        self.flush()
+
+
+class CsvExporter(Exporter):
+    """CSV with one row per record; JSON columns are embedded as JSON text."""
+
+    def __init__(
+        self,
+        fileobj: IO[str],
+        model: Type[BaseModel],
+        columns: Optional[Sequence[str]] = None,
+        write_header: bool = True,
+    ):
+        super().__init__(model, columns)
+        self.fileobj = fileobj
+        self._writer = csv.writer(fileobj)
+        if write_header:
+            self._writer.writerow(self.columns)
+
+    def write_batch(self, rows: List[BaseModel]) -> None:
+        self._writer.writerows(
+            [_csv_value(getattr(row, column)) for column in self.columns]
+            for row in rows
+        )
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+
+class NdjsonExporter(Exporter):
+    """Newline-delimited JSON with one object per record."""
+
+    def __init__(
+        self,
+        fileobj: IO[str],
+        model: Type[BaseModel],
+        columns: Optional[Sequence[str]] = None,
+    ):
+        super().__init__(model, columns)
+        self.fileobj = fileobj
+
+    def write_batch(self, rows: List[BaseModel]) -> None:
+        self.fileobj.write(
+            "".join(
+                json.dumps(
+                    {column: getattr(row, column) for column in self.columns},
+                    default=_json_default,
+                    separators=(",", ":"),
+                )
+                + "\n"
+                for row in rows
+            ),
+        )
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+
+class ParquetExporter(Exporter):
+    """Columnar Parquet with one row group per batch (requires pyarrow).
+
+    Parquet files cannot be appended to, so a resumed export should write
+    to a new part file.
+    """
+
+    def __init__(
+        self,
+        where: Any,
+        model: Type[BaseModel],
+        columns: Optional[Sequence[str]] = None,
+        compression: str = "zstd",
+    ):
+        if pa is None:
+            raise ImportError(
+                "ParquetExporter requires pyarrow: pip install primai-shared[parquet]",
+            )
+        super().__init__(model, columns)
+        table_columns = self.model.__table__.columns
+        self._json_columns = {
+            column
+            for column in self.columns
+            if isinstance(table_columns[column].type, JSON)
+        }
+        self.schema = pa.schema(
+            [
+                (column, _arrow_type(table_columns[column].type))
+                for column in self.columns
+            ],
+        )
+        self._writer = pq.ParquetWriter(where, self.schema, compression=compression)
+
+    def write_batch(self, rows: List[BaseModel]) -> None:
+        arrays = {}
+        for column in self.columns:
+            values = [getattr(row, column) for row in rows]
+            if column in self._json_columns:
+                values = [
+                    None if value is None else json.dumps(value, default=_json_default)
+                    for value in values
+                ]
+            arrays[column] = values
+        self._writer.write_table(pa.Table.from_pydict(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+async def export_batches(
+    batches: AsyncIterable[List[BaseModel]],
+    exporter: Exporter,
+    sort_key: str = "created_at",
+    checkpoint: Optional[Callable[[str], Any]] = None,
+    close: bool = True,
+) -> ExportResult:
+    """Write streamed batches to an exporter with constant memory.
+
+    After each batch is written and flushed, ``checkpoint`` is called with
+    the resume token for the position after that batch; passing the last
+    saved token as ``after`` to the same stream method continues the
+    export from there.
+
+    Args:
+        batches: Output of a repository ``stream_*`` method
+        exporter: Destination writer
+        sort_key: Attribute the stream is ordered by (with ``id``)
+        checkpoint: Callback receiving the resume token after each batch
+        close: Close the exporter when the stream is exhausted
+
+    Returns:
+        ExportResult with the number of rows written and the final token
+    """
+    result = ExportResult()
+    async for batch in batches:
+        if not batch:
+            continue
+        exporter.write_batch(batch)
+        exporter.flush()
+        last = batch[-1]
+        result.rows += len(batch)
+        result.resume_token = encode_cursor(getattr(last, sort_key), last.id)
+        if checkpoint is not None:
+            checkpoint(result.resume_token)
+    if close:
+        exporter.close()
+    return result
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _arrow_type(column_type: Any) -> Any:
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, DateTime):
+        return (
+            pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+        )
+    return pa.string()
@@ -1,9 +1,18 @@
+"""ORM models.
+
+Every model module is imported with the package, so importing any of them
+(including ``shared.models.base`` on its own, as Alembic's ``env.py`` does)
+registers all tables on ``Base.metadata`` and every string reference in
+``relationship()`` resolves. Only :mod:`shared.repositories` loads lazily.
+"""
+
 from shared.models.base import Base, BaseModel
 from shared.models.chat_message import ChatMessage
 from shared.models.chat_session import ChatSession
 from shared.models.email_log import EmailLog
 from shared.models.funnel_event import FunnelEvent
 from shared.models.lead import Lead
+from shared.models.serialization import ModelSerializer, serializer_for
 from shared.models.session_document import SessionDocument
 from shared.models.tool_execution import ToolExecution
 from shared.models.user import User
@@ -19,4 +28,6 @@ __all__ = [
     "User",
     "ToolExecution",
     "SessionDocument",
+    "ModelSerializer",
+    "serializer_for",
 ]
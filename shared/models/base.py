@@ -1,19 +1,26 @@
-from typing import Any
+from typing import Any, Iterable, Optional
 from uuid import uuid4
 
 from sqlalchemy import Column, DateTime, String, func
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import declarative_base
 
+from shared.models.serialization import serializer_for
+
 Base = declarative_base()
 
 
+def generate_id() -> str:
+    """Generate a new primary key value."""
+    return str(uuid4())
+
+
 class BaseModel(Base):
     """Base model with common fields."""
 
     __abstract__ = True
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    id = Column(String, primary_key=True, default=generate_id)
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -30,8 +37,36 @@ class BaseModel(Base):
     def __tablename__(cls) -> str:
         return cls.__name__.lower()
 
-    def to_dict(self) -> dict[str, Any]:
-        """Convert model to dictionary."""
-        return {
-            column.name: getattr(self, column.name) for column in self.__table__.columns
-        }
+    def to_dict(
+        self,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> dict[str, Any]:
+        """Convert model to dictionary.
+
+        Values are returned as loaded (datetimes stay ``datetime``); use
+        ``to_json_dict`` for a JSON-ready dictionary.
+
+        Args:
+            include: Only these attributes (all columns except internal ones
+                by default)
+            exclude: Attributes to leave out
+        """
+        return serializer_for(type(self), include, exclude).to_values(self)
+
+    def to_json_dict(
+        self,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> dict[str, Any]:
+        """Convert model to a JSON-ready dictionary.
+
+        Datetimes become ISO 8601 strings and Decimals and UUIDs strings,
+        through the model's precompiled serializer (see ``serializer_for``).
+
+        Args:
+            include: Only these attributes (all columns except internal ones
+                by default)
+            exclude: Attributes to leave out
+        """
+        return serializer_for(type(self), include, exclude).to_dict(self)
@@ -2,14 +2,19 @@ from sqlalchemy import JSON, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
+from shared.models.partitioning import (
+    MonthlyPartitioned,
+    monthly_partition_args,
+    register_monthly_partitions,
+)
 
 
-class ChatMessage(BaseModel):
+class ChatMessage(MonthlyPartitioned, BaseModel):
     """Chat message model."""
 
     __tablename__ = "chat_messages"
-    __table_args__ = (
-        Index("idx_chat_messages_session_id", "session_id"),
+    __table_args__ = monthly_partition_args(
+        Index("idx_chat_messages_session_created", "session_id", "created_at"),
         Index("idx_chat_messages_updated_at", "updated_at"),
     )
 
@@ -28,4 +33,9 @@ class ChatMessage(BaseModel):
         "ToolExecution",
         back_populates="message",
         cascade="all, delete-orphan",
+        # No foreign key: partitioned tables cannot be referenced
+        primaryjoin="ChatMessage.id == foreign(ToolExecution.message_id)",
     )
+
+
+register_monthly_partitions(ChatMessage.__table__)
@@ -2,6 +2,7 @@ from sqlalchemy import JSON, Boolean, Column, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
+from shared.models.search import register_sqlite_fts, search_text_computed
 
 
 class ChatSession(BaseModel):
@@ -12,6 +13,15 @@ class ChatSession(BaseModel):
         Index("idx_chat_sessions_plz", "plz"),
         Index("idx_chat_sessions_email", "email"),
         Index("idx_chat_sessions_updated_at", "updated_at"),
+        # Keyset order of retention runs
+        Index("idx_chat_sessions_created_id", "created_at", "id"),
+        Index("idx_chat_sessions_message_count", "message_count"),
+        Index(
+            "idx_chat_sessions_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
     )
 
     # Session info
@@ -31,6 +41,13 @@ class ChatSession(BaseModel):
     household_json = Column(JSON, nullable=True)
     email = Column(String, nullable=True)
     consent = Column(Boolean, default=False)
+    # Lowercased email, for substring search
+    search_text = Column(String, search_text_computed("email"), info={"internal": True})
+
+    # Denormalized counters, maintained by the message/document repositories
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    document_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     messages = relationship(
         "ChatMessage",
@@ -48,3 +65,6 @@ class ChatSession(BaseModel):
         back_populates="session",
         cascade="all, delete-orphan",
     )
+
+
+register_sqlite_fts(ChatSession.__table__)
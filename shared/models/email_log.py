@@ -1,4 +1,4 @@
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
@@ -8,6 +8,15 @@ class EmailLog(BaseModel):
     """Email log model."""
 
     __tablename__ = "email_logs"
+    __table_args__ = (
+        # Covers the date-window scans of the analytics dashboard
+        Index(
+            "idx_email_logs_created_status_template",
+            "created_at",
+            "status",
+            "template",
+        ),
+    )
 
     to_email = Column(String, nullable=False)
     cc_email = Column(String, nullable=True)
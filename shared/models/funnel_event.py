@@ -1,13 +1,23 @@
-from sqlalchemy import JSON, Column, ForeignKey, String
+from sqlalchemy import JSON, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
+from shared.models.partitioning import (
+    MonthlyPartitioned,
+    monthly_partition_args,
+    register_monthly_partitions,
+)
 
 
-class FunnelEvent(BaseModel):
+class FunnelEvent(MonthlyPartitioned, BaseModel):
     """Funnel event model for tracking user journey."""
 
     __tablename__ = "funnel_events"
+    __table_args__ = monthly_partition_args(
+        # Serves event-type lookups and funnel scans over a date range
+        Index("idx_funnel_events_type_created", "event_type", "created_at"),
+        Index("idx_funnel_events_session_created", "session_id", "created_at"),
+    )
 
     # Event identification
     event_type = Column(String, nullable=False)
@@ -15,7 +25,6 @@ class FunnelEvent(BaseModel):
         String,
         ForeignKey("chat_sessions.id", ondelete="SET NULL"),
         nullable=True,
-        index=True,
     )
     lead_id = Column(
         String,
@@ -44,3 +53,6 @@ class FunnelEvent(BaseModel):
     # Relationships
     lead = relationship("Lead", back_populates="funnel_events")
     session = relationship("ChatSession", back_populates="funnel_events")
+
+
+register_monthly_partitions(FunnelEvent.__table__)
@@ -2,6 +2,7 @@ from sqlalchemy import Boolean, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
+from shared.models.search import register_sqlite_fts, search_text_computed
 
 
 class Lead(BaseModel):
@@ -14,6 +15,12 @@ class Lead(BaseModel):
         Index("idx_leads_last_name", "last_name"),
         Index("idx_leads_phone", "phone"),
         Index("idx_leads_updated_at", "updated_at"),
+        Index(
+            "idx_leads_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
     )
 
     # Basic info
@@ -34,6 +41,13 @@ class Lead(BaseModel):
     summary_text = Column(String, nullable=True)
     annual_switch = Column(Boolean, default=False)
 
+    # Lowercased email/name plus separator-free phone, for substring search
+    search_text = Column(
+        String,
+        search_text_computed("email", "first_name", "last_name", phone="phone"),
+        info={"internal": True},
+    )
+
     # Relationships
     session = relationship(
         "ChatSession",
@@ -43,3 +57,6 @@ class Lead(BaseModel):
     )
     email_logs = relationship("EmailLog", back_populates="lead")
     funnel_events = relationship("FunnelEvent", back_populates="lead")
+
+
+register_sqlite_fts(Lead.__table__)
@@ -0,0 +1,194 @@
+"""Monthly range partitioning on ``created_at`` for append-only tables.
+
+On PostgreSQL a partitioned model's table is created ``PARTITION BY RANGE
+(created_at)`` together with a default partition and monthly partitions
+for the current and upcoming months. Indexes declared on the model are
+created on the parent and so exist on every partition. Other dialects
+create an ordinary table.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+table's primary key is ``(id, created_at)``; the ORM still identifies rows
+by ``id`` alone. The database therefore does not enforce unique IDs:
+generated IDs are random UUIDs, but rows loaded with explicit IDs (e.g.
+``copy_load`` replays) must carry their original ``created_at`` as well,
+or they are stored as a second row with the same ID instead of
+conflicting.
+
+Rows of a partitioned table cannot be the target of a foreign key, so
+references to them are kept as ORM relationships, and the repositories
+delete or detach the referencing rows themselves (see their
+``_on_delete`` hooks). Deletes that bypass the repositories, such as raw
+SQL or dropped partitions, leave those references dangling.
+
+Existing plain tables are converted with ``partition_table_sql``.
+"""
+
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import DDL, Column, DateTime, PrimaryKeyConstraint, Table, event, func
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+PARTITION_COLUMN = "created_at"
+
+# Monthly partitions created beyond the current month
+MONTHS_AHEAD = 3
+
+
+class MonthlyPartitioned:
+    """Mixin for models partitioned by month; list it before ``BaseModel``."""
+
+    # Set client-side as well: as part of the primary key it is used to
+    # match rows on UPDATE and DELETE, which also prunes to one partition
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"primary_key": [cls.__table__.c.id]}
+
+
+def monthly_partition_args(*table_args) -> tuple:
+    """``__table_args__`` for a model partitioned by month on ``created_at``.
+
+    Args:
+        table_args: Indexes and constraints of the model
+
+    Returns:
+        Table args including the primary key and partition clause
+    """
+    return (
+        *table_args,
+        # id first, so lookups by id alone can use the primary key index
+        PrimaryKeyConstraint("id", PARTITION_COLUMN),
+        {"postgresql_partition_by": f"RANGE ({PARTITION_COLUMN})"},
+    )
+
+
+def month_start(day: date) -> date:
+    """First day of the month containing ``day``."""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month ``months`` after ``month`` (may be negative)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """Name of the partition holding ``month``, e.g. ``funnel_events_y2024m01``."""
+    return f"{table_name}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition_name(table_name: str) -> str:
+    """Name of the partition catching rows outside all monthly partitions."""
+    return f"{table_name}_default"
+
+
+def create_partition_sql(table_name: str, month: date) -> str:
+    """DDL creating the monthly partition for ``month`` if it is missing."""
+    month = month_start(month)
+    # Explicit UTC offsets keep bounds independent of the session time zone
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table_name, month)}" '
+        f'PARTITION OF "{table_name}" '
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def create_default_partition_sql(table_name: str) -> str:
+    """DDL creating the default partition if it is missing."""
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table_name)}" '
+        f'PARTITION OF "{table_name}" DEFAULT'
+    )
+
+
+def upcoming_months(
+    months_ahead: int = MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> List[date]:
+    """The current month and the following ``months_ahead`` months."""
+    current = month_start(today or datetime.now(timezone.utc).date())
+    return [add_months(current, offset) for offset in range(months_ahead + 1)]
+
+
+def register_monthly_partitions(table: Table) -> None:
+    """Create the default and upcoming partitions right after ``table``.
+
+    Later months are added by ``create_upcoming_partitions``, typically
+    from a scheduled job.
+    """
+
+    @event.listens_for(table, "after_create")
+    def _create_partitions(target: Table, connection, **kw) -> None:
+        if connection.dialect.name != "postgresql":
+            return
+        statements = [create_default_partition_sql(target.name)]
+        statements.extend(
+            create_partition_sql(target.name, month) for month in upcoming_months()
+        )
+        for statement in statements:
+            connection.execute(DDL(statement))
+
+
+def partition_table_sql(
+    table: Table,
+    first_month: date,
+    last_month: Optional[date] = None,
+) -> List[str]:
+    """PostgreSQL statements converting an existing plain table in place.
+
+    The old table is renamed, the partitioned table is created with its
+    indexes and partitions from ``first_month`` through ``last_month``,
+    the rows are copied over and the old table is dropped together with
+    the foreign keys that referenced it. Run the statements in a single
+    transaction (e.g. ``op.execute`` each one in an Alembic migration);
+    the table is locked throughout.
+
+    Args:
+        table: Partitioned table as declared by the model
+        first_month: Month of the oldest row
+        last_month: Last month to create (default: ``MONTHS_AHEAD`` after
+            the current month)
+
+    Returns:
+        SQL statements, in order
+    """
+    # Imported on use: the dialect module is slow to import and only
+    # migrations need it
+    from sqlalchemy.dialects import postgresql
+
+    name = table.name
+    old = f"{name}_unpartitioned"
+    dialect = postgresql.dialect()
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+
+    statements = [
+        f'ALTER TABLE "{name}" RENAME TO "{old}"',
+        f'ALTER TABLE "{old}" RENAME CONSTRAINT "{name}_pkey" TO "{old}_pkey"',
+    ]
+    statements.extend(f'DROP INDEX IF EXISTS "{index.name}"' for index in table.indexes)
+    statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+    statements.extend(
+        str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes
+    )
+    statements.append(create_default_partition_sql(name))
+    month = month_start(first_month)
+    last = month_start(last_month) if last_month else upcoming_months()[-1]
+    while month <= last:
+        statements.append(create_partition_sql(name, month))
+        month = add_months(month, 1)
+    statements.append(
+        f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{old}"',
+    )
+    statements.append(f'DROP TABLE "{old}" CASCADE')
+    return statements
@@ -0,0 +1,67 @@
+"""Normalized search columns and their full-text index mirrors."""
+
+from sqlalchemy import DDL, Computed, Table, event
+
+from shared.models.base import Base
+
+# Trigram indexes on search columns need pg_trgm
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def phone_digits_sql(column: str) -> str:
+    """SQL stripping the usual separators from a phone number column."""
+    expression = f"coalesce({column}, '')"
+    for separator in (" ", "-", ".", "/", "(", ")"):
+        expression = f"replace({expression}, '{separator}', '')"
+    return expression
+
+
+def search_text_computed(*columns: str, phone: str = "") -> Computed:
+    """Stored generated column holding the lowercased searchable text."""
+    parts = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    expression = f"lower({parts})"
+    if phone:
+        expression = f"{expression} || ' ' || {phone_digits_sql(phone)}"
+    return Computed(expression, persisted=True)
+
+
+def fts_table_name(table_name: str) -> str:
+    """Name of the SQLite FTS5 table mirroring ``table_name.search_text``."""
+    return f"{table_name}_fts"
+
+
+def register_sqlite_fts(table: Table) -> None:
+    """Mirror ``table.search_text`` into a trigram FTS5 table on SQLite.
+
+    PostgreSQL uses a pg_trgm index on the column instead; the FTS5 table
+    gives local SQLite runs the same substring search without a table scan.
+    """
+    name = table.name
+    fts = fts_table_name(name)
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"search_text, content='{name}', content_rowid='rowid', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {name} BEGIN "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.rowid, new.search_text); "
+        "END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) "
+        "VALUES ('delete', old.rowid, old.search_text); "
+        "END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, search_text) "
+        "VALUES ('delete', old.rowid, old.search_text); "
+        f"INSERT INTO {fts}(rowid, search_text) VALUES (new.rowid, new.search_text); "
+        "END",
+    ]
+    for statement in statements:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {fts}").execute_if(dialect="sqlite"),
+    )
@@ -23,11 +23,9 @@ class SessionDocument(BaseModel):
         ForeignKey("chat_sessions.id", ondelete="CASCADE"),
         nullable=False,
     )
-    tool_execution_id = Column(
-        String,
-        ForeignKey("tool_executions.id", ondelete="SET NULL"),
-        nullable=True,
-    )
+    # References tool_executions.id; not a foreign key since that table is
+    # partitioned
+    tool_execution_id = Column(String, nullable=True)
 
     # Document details
     document_type = Column(
@@ -41,4 +39,8 @@ class SessionDocument(BaseModel):
 
     # Relationships
     session = relationship("ChatSession", back_populates="documents")
-    tool_execution = relationship("ToolExecution", back_populates="documents")
+    tool_execution = relationship(
+        "ToolExecution",
+        back_populates="documents",
+        primaryjoin="foreign(SessionDocument.tool_execution_id) == ToolExecution.id",
+    )
@@ -2,13 +2,18 @@ from sqlalchemy import JSON, Column, ForeignKey, Index, String
 from sqlalchemy.orm import relationship
 
 from shared.models.base import BaseModel
+from shared.models.partitioning import (
+    MonthlyPartitioned,
+    monthly_partition_args,
+    register_monthly_partitions,
+)
 
 
-class ToolExecution(BaseModel):
+class ToolExecution(MonthlyPartitioned, BaseModel):
     """Tool execution model for tracking AI tool calls."""
 
     __tablename__ = "tool_executions"
-    __table_args__ = (
+    __table_args__ = monthly_partition_args(
         Index("idx_tool_executions_session_id", "session_id"),
         Index("idx_tool_executions_message_id", "message_id"),
         Index("idx_tool_executions_tool_name", "tool_name"),
@@ -22,11 +27,9 @@ class ToolExecution(BaseModel):
         ForeignKey("chat_sessions.id", ondelete="CASCADE"),
         nullable=False,
     )
-    message_id = Column(
-        String,
-        ForeignKey("chat_messages.id", ondelete="CASCADE"),
-        nullable=True,
-    )
+    # References chat_messages.id; not a foreign key since that table is
+    # partitioned
+    message_id = Column(String, nullable=True)
 
     # Tool details
     tool_name = Column(String, nullable=False)
@@ -36,9 +39,17 @@ class ToolExecution(BaseModel):
 
     # Relationships
     session = relationship("ChatSession", back_populates="tool_executions")
-    message = relationship("ChatMessage", back_populates="tool_executions")
+    message = relationship(
+        "ChatMessage",
+        back_populates="tool_executions",
+        primaryjoin="foreign(ToolExecution.message_id) == ChatMessage.id",
+    )
     documents = relationship(
         "SessionDocument",
         back_populates="tool_execution",
         cascade="all, delete-orphan",
+        primaryjoin="ToolExecution.id == foreign(SessionDocument.tool_execution_id)",
     )
+
+
+register_monthly_partitions(ToolExecution.__table__)
@@ -1,21 +1,183 @@
-from shared.repositories.base_repository import BaseRepository
-from shared.repositories.chat_message_repository import ChatMessageRepository
-from shared.repositories.chat_session_repository import ChatSessionRepository
-from shared.repositories.email_log_repository import EmailLogRepository
-from shared.repositories.funnel_event_repository import FunnelEventRepository
-from shared.repositories.lead_repository import LeadRepository
-from shared.repositories.session_document_repository import SessionDocumentRepository
-from shared.repositories.tool_execution_repository import ToolExecutionRepository
-from shared.repositories.user_repository import UserRepository
+"""Repositories, imported on first attribute access.
+
+``from shared.repositories import LeadRepository`` imports only the lead
+repository and the models and helpers it depends on.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from shared.repositories.base_repository import BaseRepository
+    from shared.repositories.chat_message_repository import ChatMessageRepository
+    from shared.repositories.chat_session_repository import ChatSessionRepository
+    from shared.repositories.counting import (
+        CachedCount,
+        CountStrategy,
+        EstimatedCount,
+        ExactCount,
+        TotalCount,
+    )
+    from shared.repositories.email_log_repository import EmailLogRepository
+    from shared.repositories.entity_cache import (
+        EntityCache,
+        EntitySnapshot,
+        configure_entity_cache,
+        disable_entity_cache,
+        get_entity_cache,
+    )
+    from shared.repositories.funnel_event_buffer import BufferMetrics, FunnelEventBuffer
+    from shared.repositories.funnel_event_repository import FunnelEventRepository
+    from shared.repositories.instrumentation import (
+        MethodCall,
+        MetricsRegistry,
+        MetricsSink,
+        OpenTelemetrySink,
+        SlowQuery,
+        disable_instrumentation,
+        enable_instrumentation,
+    )
+    from shared.repositories.lead_repository import LeadRepository
+    from shared.repositories.loading import (
+        NPlusOneError,
+        StatementCounter,
+        count_statements,
+        disable_strict_loading,
+        enable_strict_loading,
+        is_strict_loading,
+    )
+    from shared.repositories.pagination import CursorPage
+    from shared.repositories.partitioned_repository import MonthlyPartitionedRepository
+    from shared.repositories.projection import Projection, ReadModel
+    from shared.repositories.retention import RetentionProgress, SessionRetention
+    from shared.repositories.routing import (
+        PRIMARY,
+        REPLICA,
+        ReplicaRouter,
+        ReplicaStatus,
+        RoutingSession,
+        route,
+        routed,
+    )
+    from shared.repositories.session_document_repository import (
+        SessionDocumentRepository,
+    )
+    from shared.repositories.tool_execution_repository import ToolExecutionRepository
+    from shared.repositories.unit_of_work import UnitOfWork
+    from shared.repositories.user_repository import UserRepository
+
+# Public name -> module defining it
+_EXPORTS = {
+    "BaseRepository": "shared.repositories.base_repository",
+    "MonthlyPartitionedRepository": "shared.repositories.partitioned_repository",
+    "CursorPage": "shared.repositories.pagination",
+    "CountStrategy": "shared.repositories.counting",
+    "ExactCount": "shared.repositories.counting",
+    "CachedCount": "shared.repositories.counting",
+    "EstimatedCount": "shared.repositories.counting",
+    "TotalCount": "shared.repositories.counting",
+    "EntityCache": "shared.repositories.entity_cache",
+    "EntitySnapshot": "shared.repositories.entity_cache",
+    "configure_entity_cache": "shared.repositories.entity_cache",
+    "disable_entity_cache": "shared.repositories.entity_cache",
+    "get_entity_cache": "shared.repositories.entity_cache",
+    "ChatSessionRepository": "shared.repositories.chat_session_repository",
+    "ChatMessageRepository": "shared.repositories.chat_message_repository",
+    "EmailLogRepository": "shared.repositories.email_log_repository",
+    "LeadRepository": "shared.repositories.lead_repository",
+    "FunnelEventRepository": "shared.repositories.funnel_event_repository",
+    "FunnelEventBuffer": "shared.repositories.funnel_event_buffer",
+    "BufferMetrics": "shared.repositories.funnel_event_buffer",
+    "UserRepository": "shared.repositories.user_repository",
+    "ToolExecutionRepository": "shared.repositories.tool_execution_repository",
+    "SessionDocumentRepository": "shared.repositories.session_document_repository",
+    "UnitOfWork": "shared.repositories.unit_of_work",
+    "Projection": "shared.repositories.projection",
+    "ReadModel": "shared.repositories.projection",
+    "ReplicaRouter": "shared.repositories.routing",
+    "ReplicaStatus": "shared.repositories.routing",
+    "RoutingSession": "shared.repositories.routing",
+    "route": "shared.repositories.routing",
+    "routed": "shared.repositories.routing",
+    "PRIMARY": "shared.repositories.routing",
+    "REPLICA": "shared.repositories.routing",
+    "MetricsSink": "shared.repositories.instrumentation",
+    "MetricsRegistry": "shared.repositories.instrumentation",
+    "OpenTelemetrySink": "shared.repositories.instrumentation",
+    "MethodCall": "shared.repositories.instrumentation",
+    "SlowQuery": "shared.repositories.instrumentation",
+    "enable_instrumentation": "shared.repositories.instrumentation",
+    "disable_instrumentation": "shared.repositories.instrumentation",
+    "enable_strict_loading": "shared.repositories.loading",
+    "disable_strict_loading": "shared.repositories.loading",
+    "is_strict_loading": "shared.repositories.loading",
+    "count_statements": "shared.repositories.loading",
+    "StatementCounter": "shared.repositories.loading",
+    "NPlusOneError": "shared.repositories.loading",
+    "SessionRetention": "shared.repositories.retention",
+    "RetentionProgress": "shared.repositories.retention",
+}
 
 __all__ = [
     "BaseRepository",
+    "MonthlyPartitionedRepository",
+    "CursorPage",
+    "CountStrategy",
+    "ExactCount",
+    "CachedCount",
+    "EstimatedCount",
+    "TotalCount",
+    "EntityCache",
+    "EntitySnapshot",
+    "configure_entity_cache",
+    "disable_entity_cache",
+    "get_entity_cache",
     "ChatSessionRepository",
     "ChatMessageRepository",
     "EmailLogRepository",
     "LeadRepository",
     "FunnelEventRepository",
+    "FunnelEventBuffer",
+    "BufferMetrics",
     "UserRepository",
     "ToolExecutionRepository",
     "SessionDocumentRepository",
+    "UnitOfWork",
+    "Projection",
+    "ReadModel",
+    "ReplicaRouter",
+    "ReplicaStatus",
+    "RoutingSession",
+    "route",
+    "routed",
+    "PRIMARY",
+    "REPLICA",
+    "SessionRetention",
+    "RetentionProgress",
+    "MetricsSink",
+    "MetricsRegistry",
+    "OpenTelemetrySink",
+    "MethodCall",
+    "SlowQuery",
+    "enable_instrumentation",
+    "disable_instrumentation",
+    "enable_strict_loading",
+    "disable_strict_loading",
+    "is_strict_loading",
+    "count_statements",
+    "StatementCounter",
+    "NPlusOneError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__})
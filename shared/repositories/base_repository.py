@@ -1,61 +1,476 @@
 """Base repository with common CRUD operations."""
 
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    delete,
+    insert,
+    inspect,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import MANYTOONE
 
-from shared.models.base import BaseModel
+from shared.models.base import BaseModel, generate_id
+from shared.repositories.counting import CountStrategy, ExactCount, TotalCount
+from shared.repositories.entity_cache import (
+    EntitySnapshot,
+    get_entity_cache,
+    invalidate_entities,
+)
+from shared.repositories.instrumentation import instrument_class
+from shared.repositories.loading import LoaderOptions
+from shared.repositories.pagination import (
+    CURSOR_NEXT,
+    CURSOR_PREV,
+    CursorPage,
+    decode_cursor,
+    encode_cursor,
+    seek_bound,
+    seek_key,
+)
+from shared.repositories.projection import ColumnLike, Projection
+from shared.repositories.unit_of_work import UnitOfWork, is_unit_of_work_active
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
+_EXACT_COUNT = ExactCount()
+
+# Rows per multi-row INSERT ... RETURNING statement in bulk inserts
+BULK_CHUNK_SIZE = 500
+# Rows fetched per round trip when streaming results
+STREAM_BATCH_SIZE = 1000
+
 
 class BaseRepository(Generic[ModelType]):
     """Base repository with common database operations."""
 
+    # Columns of created (or copy-loaded) rows passed to _on_insert
+    _inserted_columns: Tuple[str, ...] = ()
+    # Columns of deleted rows passed to _on_delete
+    _delete_returning: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        # Repositories defined after enable_instrumentation() are covered too
+        instrument_class(cls)
+
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
 
-    async def get_by_id(self, id: str) -> Optional[ModelType]:
-        """Get record by ID."""
-        return await self.db.get(self.model, id)
+    @property
+    def in_unit_of_work(self) -> bool:
+        """Whether writes are deferred to a unit of work on this session."""
+        return is_unit_of_work_active(self.db)
+
+    @property
+    def dialect_name(self) -> str:
+        """Name of the database dialect behind the session."""
+        return self.db.get_bind().dialect.name
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Open a unit of work shared by all repositories on this session."""
+        return UnitOfWork(self.db)
+
+    def projection(self, *columns: ColumnLike) -> Projection:
+        """Project the model onto ``columns``, returning immutable read models.
+
+        Use this for list queries that need only some columns: rows become
+        small ``__slots__`` objects instead of transient ORM instances.
+
+        Args:
+            columns: Mapped attributes (``Lead.email``) or their names
+
+        Returns:
+            Projection whose ``select()`` loads the columns and whose
+            ``all()`` / ``from_row()`` build the read models
+        """
+        return Projection(self.model, *columns)
+
+    async def get_by_id(
+        self,
+        id: str,
+        options: LoaderOptions = (),
+    ) -> Optional[ModelType]:
+        """Get record by ID.
+
+        Args:
+            id: Primary key
+            options: Loader options for the relationships the caller will
+                read, e.g. ``selectinload(ChatSession.messages)``; they do
+                not apply to a record already in the session
+
+        Returns:
+            The record, or None if it does not exist
+        """
+        return await self.db.get(self.model, id, options=options)
+
+    async def get_by_id_cached(self, id: str) -> Optional[EntitySnapshot]:
+        """Get a read-only snapshot of a record by ID through the entity cache.
+
+        Served from the process-wide cache when ``configure_entity_cache``
+        was called for the model; otherwise loaded on every call. Use
+        ``get_by_id`` when the record is going to be modified.
+        """
+        cache = get_entity_cache(self.model)
+        if cache is not None:
+            snapshot = cache.get(id)
+            if snapshot is not None:
+                return snapshot
+
+        # Read the row itself rather than the session's instance, which may
+        # hold expired or unflushed state
+        table = self.model.__table__
+        with self.db.no_autoflush:
+            result = await self.db.execute(
+                select(*table.columns).where(table.c.id == id),
+            )
+        row = result.first()
+        if row is None:
+            return None
+        snapshot = EntitySnapshot.from_row(self.model, row)
+        if cache is not None:
+            cache.put(id, snapshot)
+        return snapshot
 
     async def get_all(
         self,
         skip: int = 0,
         limit: int = 100,
+        options: LoaderOptions = (),
     ) -> List[ModelType]:
-        """Get all records with pagination."""
+        """Get all records with pagination.
+
+        ``options`` declares the relationships to load with the records,
+        as in ``get_by_id``.
+        """
         result = await self.db.execute(
-            select(self.model).offset(skip).limit(limit),
+            select(self.model).options(*options).offset(skip).limit(limit),
         )
         return list(result.scalars().all())
 
+    async def get_all_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        options: LoaderOptions = (),
+    ) -> CursorPage[ModelType]:
+        """Get all records using keyset pagination on the primary key.
+
+        Args:
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+            options: Loader options for related records, as in ``get_by_id``
+
+        Returns:
+            CursorPage with records and next/prev cursors
+        """
+        return await self._paginate_by_cursor(
+            select(self.model).options(*options),
+            self.model.id,
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+        )
+
+    async def _count(
+        self,
+        count_query: Select,
+        count_strategy: Optional[CountStrategy] = None,
+    ) -> TotalCount:
+        """Compute a list total with the given strategy (exact by default)."""
+        return await (count_strategy or _EXACT_COUNT).count(self.db, count_query)
+
+    async def _paginate_by_cursor(
+        self,
+        query: Select,
+        sort_column: Any,
+        cursor: Optional[str],
+        limit: int,
+        descending: bool = True,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ) -> CursorPage:
+        """Apply a ``(sort_column, id)`` keyset to ``query`` and fetch a page.
+
+        Unlike OFFSET, the seek predicate lets the database start reading at
+        the cursor position through the index on ``sort_column``, so latency
+        does not depend on how deep the page is.
+
+        Args:
+            query: Filtered select, without ordering or limit
+            sort_column: Column to order by; ``id`` breaks ties
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+            descending: Order of the listing as seen by the caller
+            transform: Row factory for column selects, e.g. a
+                ``Projection``; ORM entities are returned when omitted
+
+        Returns:
+            CursorPage with items and next/prev cursors
+        """
+        id_column = self.model.id
+        sort_by_id = sort_column is id_column
+        sort_key = seek_key(sort_column, self.dialect_name)
+        backwards = False
+
+        if cursor:
+            sort_value, last_id, direction = decode_cursor(cursor)
+            backwards = direction == CURSOR_PREV
+            # Walking backwards flips the comparison; results are re-reversed below
+            seek_after = descending == backwards
+            if sort_by_id:
+                position = id_column
+                bound = last_id
+            else:
+                position = tuple_(sort_key, id_column)
+                bound = tuple_(
+                    seek_bound(sort_column, sort_value, self.dialect_name),
+                    last_id,
+                )
+            query = query.where(position > bound if seek_after else position < bound)
+
+        ascending = descending == backwards
+        order = [sort_column] if sort_by_id else [sort_key, id_column]
+        query = query.order_by(
+            *(column.asc() if ascending else column.desc() for column in order),
+        ).limit(limit + 1)
+
+        result = await self.db.execute(query)
+        if transform is None:
+            items = list(result.scalars().all())
+        else:
+            items = [transform(row) for row in result]
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backwards:
+            items.reverse()
+
+        page = CursorPage(items=items)
+        if not items:
+            return page
+
+        sort_attribute = sort_column.key
+        id_key = id_column.key
+        if has_more or backwards:
+            last = items[-1]
+            page.next_cursor = encode_cursor(
+                _item_value(last, sort_attribute),
+                _item_value(last, id_key),
+                CURSOR_NEXT,
+            )
+        if cursor and (has_more or not backwards):
+            first = items[0]
+            page.prev_cursor = encode_cursor(
+                _item_value(first, sort_attribute),
+                _item_value(first, id_key),
+                CURSOR_PREV,
+            )
+        return page
+
+    async def stream_where(
+        self,
+        *predicates: ColumnElement[bool],
+        sort_column: Any = None,
+        after: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[ModelType]]:
+        """Stream matching records in batches over a server-side cursor.
+
+        Records are ordered by ``(sort_column, id)`` so that the position
+        after any batch can be turned into a resume token with
+        ``encode_cursor`` and passed back as ``after``.
+
+        Args:
+            predicates: WHERE clauses
+            sort_column: Column to order by (default: created_at)
+            after: Resume token; only records after this position are read
+            batch_size: Records fetched and yielded per batch
+
+        Yields:
+            Lists of at most ``batch_size`` records
+        """
+        sort_column = sort_column if sort_column is not None else self.model.created_at
+        sort_key = seek_key(sort_column, self.dialect_name)
+        query = select(self.model).where(*predicates)
+        if after:
+            sort_value, last_id, _ = decode_cursor(after)
+            bound = seek_bound(sort_column, sort_value, self.dialect_name)
+            query = query.where(
+                tuple_(sort_key, self.model.id) > tuple_(bound, last_id),
+            )
+        query = query.order_by(sort_key, self.model.id).execution_options(
+            yield_per=batch_size,
+        )
+
+        result = await self.db.stream_scalars(query)
+        async for partition in result.partitions():
+            yield list(partition)
+
     async def create(self, **kwargs) -> ModelType:
         """Create new record."""
         instance = self.model(**kwargs)
         self.db.add(instance)
-        await self.db.commit()
-        await self.db.refresh(instance)
+        if self._inserted_columns:
+            # Not flushed, so that a unit of work still batches the INSERT
+            await self._on_insert(
+                [
+                    {
+                        name: _column_value(instance, name)
+                        for name in self._inserted_columns
+                    },
+                ],
+            )
+        await self._persist(instance)
         return instance
 
-    async def bulk_create(self, items: List[dict]) -> List[ModelType]:
+    async def bulk_create(
+        self,
+        items: Union[Iterable[dict], AsyncIterable[dict]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        as_rows: bool = False,
+    ) -> List[Union[ModelType, Row]]:
         """Create multiple records in a single transaction.
 
+        Rows are sent as multi-row ``INSERT ... RETURNING`` statements of up
+        to ``chunk_size`` rows, so generated IDs and timestamps come back
+        without a refresh per instance.
+
         Args:
-            items: List of dictionaries with model fields
+            items: List or (async) iterable of dictionaries with model fields
+            chunk_size: Maximum rows per INSERT statement
+            as_rows: Return lightweight rows instead of ORM instances
 
         Returns:
-            List of created model instances
+            List of created model instances (or rows)
         """
-        instances = [self.model(**item) for item in items]
-        self.db.add_all(instances)
-        await self.db.commit()
-        # Refresh all instances to get generated IDs and timestamps
-        for instance in instances:
-            await self.db.refresh(instance)
-        return instances
+        created: List[Union[ModelType, Row]] = []
+        async for chunk in _chunked(items, chunk_size):
+            created.extend(await self._insert_returning(chunk, as_rows))
+        await self._commit()
+        return created
+
+    async def bulk_create_stream(
+        self,
+        items: Union[Iterable[dict], AsyncIterable[dict]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        as_rows: bool = False,
+    ) -> AsyncIterator[List[Union[ModelType, Row]]]:
+        """Insert records chunk by chunk, committing after each chunk.
+
+        Intended for backfills: only one chunk is held in memory at a time,
+        and each chunk is yielded once it is committed (or, inside a unit
+        of work, once it is inserted).
+
+        Args:
+            items: List or (async) iterable of dictionaries with model fields
+            chunk_size: Maximum rows per INSERT statement and transaction
+            as_rows: Yield lightweight rows instead of ORM instances
+
+        Yields:
+            Created model instances (or rows) of each committed chunk
+        """
+        async for chunk in _chunked(items, chunk_size):
+            created = await self._insert_returning(chunk, as_rows)
+            await self._commit()
+            yield created
+
+    async def copy_load(
+        self,
+        items: Union[Iterable[dict], AsyncIterable[dict]],
+        chunk_size: Optional[int] = None,
+        on_conflict: Optional[str] = None,
+    ) -> int:
+        """Load large volumes of records, committing after each chunk.
+
+        On PostgreSQL with asyncpg each chunk is sent with the binary COPY
+        protocol into a temporary staging table and merged into the model's
+        table, which is much faster than INSERT for backfills and replays.
+        Other drivers and dialects fall back to multi-row INSERT
+        statements. No instances or rows are returned.
+
+        Args:
+            items: List or (async) iterable of dictionaries with model fields
+            chunk_size: Records staged and merged per transaction
+                (default: ``copy_load.COPY_CHUNK_SIZE``)
+            on_conflict: None to fail on duplicate keys, "ignore" to skip
+                them (idempotent replays) or "update" to overwrite the
+                supplied columns. Conflicts are matched on the full primary
+                key, which for partitioned tables includes ``created_at``
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        # Imported on use, like the COPY driver support behind it
+        from shared.repositories.copy_load import (
+            COPY_CHUNK_SIZE,
+            ON_CONFLICT_MODES,
+            ON_CONFLICT_UPDATE,
+            copy_records,
+        )
+
+        if on_conflict not in ON_CONFLICT_MODES:
+            raise ValueError(f"Unsupported on_conflict mode: {on_conflict!r}")
+
+        table = self.model.__table__
+        loaded = 0
+        async for chunk in _chunked(items, chunk_size or COPY_CHUNK_SIZE):
+            count, inserted = await copy_records(
+                self.db,
+                table,
+                chunk,
+                on_conflict=on_conflict,
+                returning=self._inserted_columns,
+            )
+            if inserted:
+                await self._on_insert(inserted)
+            if on_conflict == ON_CONFLICT_UPDATE:
+                invalidate_entities(self.db, self.model)
+            await self._commit()
+            loaded += count
+        return loaded
+
+    async def _insert_returning(
+        self,
+        chunk: List[dict],
+        as_rows: bool,
+    ) -> List[Union[ModelType, Row]]:
+        """Insert one chunk with a multi-row INSERT ... RETURNING."""
+        if as_rows:
+            table = self.model.__table__
+            result = await self.db.execute(
+                insert(table).returning(*table.columns),
+                chunk,
+            )
+            created = list(result.all())
+        else:
+            result = await self.db.execute(
+                insert(self.model).returning(self.model),
+                chunk,
+            )
+            created = list(result.scalars().all())
+
+        await self._on_insert(chunk)
+        return created
 
     async def update(self, id: str, **kwargs) -> Optional[ModelType]:
         """Update record by ID."""
@@ -66,8 +481,8 @@ class BaseRepository(Generic[ModelType]):
         for key, value in kwargs.items():
             setattr(instance, key, value)
 
-        await self.db.commit()
-        await self.db.refresh(instance)
+        invalidate_entities(self.db, self.model, [id])
+        await self._persist(instance)
         return instance
 
     async def delete(self, id: str) -> bool:
@@ -77,5 +492,182 @@ class BaseRepository(Generic[ModelType]):
             return False
 
         await self.db.delete(instance)
-        await self.db.commit()
+        invalidate_entities(self.db, self.model, [id])
+        if self._delete_returning:
+            await self._on_delete(
+                [{name: getattr(instance, name) for name in self._delete_returning}],
+            )
+        await self._commit()
         return True
+
+    async def update_by_id(self, id: str, values: dict) -> Optional[Row]:
+        """Update a record by ID with a single UPDATE ... RETURNING.
+
+        Unlike ``update``, the row is not loaded first.
+
+        Args:
+            id: Record ID
+            values: Column values to set
+
+        Returns:
+            The updated row, or None if no record has this ID
+        """
+        _, rows = await self.update_where(
+            self.model.id == id,
+            values,
+            returning=True,
+        )
+        return rows[0] if rows else None
+
+    async def update_where(
+        self,
+        predicate: ColumnElement[bool],
+        values: dict,
+        returning: bool = False,
+    ) -> Tuple[int, List[Row]]:
+        """Update every record matching ``predicate`` in one statement.
+
+        Args:
+            predicate: WHERE clause, e.g. ``EmailLog.status == "pending"``
+            values: Column values to set
+            returning: Also return the updated rows
+
+        Returns:
+            Tuple of (affected count, updated rows or empty list)
+        """
+        statement = update(self.model).where(predicate).values(**values)
+        if returning:
+            statement = statement.returning(*self.model.__table__.columns)
+
+        result = await self.db.execute(statement)
+        rows = list(result.all()) if returning else []
+        count = len(rows) if returning else result.rowcount
+        invalidate_entities(
+            self.db,
+            self.model,
+            [row.id for row in rows] if returning else None,
+        )
+        await self._commit()
+        return count, rows
+
+    async def delete_where(self, predicate: ColumnElement[bool]) -> int:
+        """Delete every record matching ``predicate`` in one statement.
+
+        Child rows are removed by the database ``ON DELETE`` rules, or by
+        ``_on_delete`` for children of partitioned tables, rather than ORM
+        cascades.
+
+        Args:
+            predicate: WHERE clause
+
+        Returns:
+            Number of deleted records
+        """
+        statement = delete(self.model).where(predicate)
+        if not self._delete_returning:
+            result = await self.db.execute(statement)
+            invalidate_entities(self.db, self.model)
+            await self._commit()
+            return result.rowcount
+
+        table = self.model.__table__
+        result = await self.db.execute(
+            statement.returning(*(table.c[name] for name in self._delete_returning)),
+        )
+        deleted = [dict(row._mapping) for row in result]
+        invalidate_entities(self.db, self.model)
+        await self._on_delete(deleted)
+        await self._commit()
+        return len(deleted)
+
+    async def _on_insert(self, items: List[dict]) -> None:
+        """Hook run in the write transaction after rows are inserted.
+
+        Args:
+            items: Field values of the inserted rows; at least the
+                ``_inserted_columns``
+        """
+
+    async def _on_delete(self, rows: List[dict]) -> None:
+        """Hook run in the write transaction after rows are deleted.
+
+        Only called when ``_delete_returning`` is set.
+
+        Args:
+            rows: The ``_delete_returning`` columns of the deleted rows
+        """
+
+    async def _commit(self) -> None:
+        """Commit, unless a unit of work will commit later."""
+        if not self.in_unit_of_work:
+            await self.db.commit()
+
+    async def _persist(self, instance: ModelType) -> None:
+        """Commit and refresh an added or modified instance.
+
+        Inside a unit of work the instance is left pending so that it is
+        flushed together with the other writes; its ID is assigned now so
+        callers can link child rows before the flush.
+        """
+        if self.in_unit_of_work:
+            if instance.id is None:
+                instance.id = generate_id()
+            return
+
+        await self.db.commit()
+        await self.db.refresh(instance)
+
+
+def _column_value(instance: BaseModel, key: str) -> Any:
+    """Value of a column of an unflushed instance.
+
+    A foreign key passed as a relationship (e.g. ``session=...``) is only
+    copied to its column by the flush, so it is read from the related
+    instance, whose ID is assigned now if it is pending too.
+    """
+    value = getattr(instance, key)
+    if value is not None:
+        return value
+    for relationship in inspect(type(instance)).relationships:
+        if relationship.direction is not MANYTOONE:
+            continue
+        related = instance.__dict__.get(relationship.key)
+        if related is None:
+            continue
+        for local, remote in relationship.local_remote_pairs:
+            if local.key != key:
+                continue
+            value = getattr(related, remote.key)
+            if value is None and remote.key == "id":
+                related.id = value = generate_id()
+            return value
+    return None
+
+
+def _item_value(item: Any, key: str) -> Any:
+    """Read a field from an ORM instance, read model or row dict."""
+    if isinstance(item, dict):
+        return item[key]
+    return getattr(item, key)
+
+
+async def _chunked(
+    items: Union[Iterable[dict], AsyncIterable[dict]],
+    size: int,
+) -> AsyncIterator[List[dict]]:
+    """Group a sync or async iterable into lists of at most ``size`` items."""
+    chunk: List[dict] = []
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
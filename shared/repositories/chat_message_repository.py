@@ -1,25 +1,72 @@
-from typing import List, Tuple
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from shared.models.chat_message import ChatMessage
-from shared.repositories.base_repository import BaseRepository
+from shared.repositories.chat_session_repository import ChatSessionRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.pagination import CursorPage
+from shared.repositories.partitioned_repository import MonthlyPartitionedRepository
+from shared.repositories.tool_execution_repository import ToolExecutionRepository
 
+# Built once; see LeadRepository.get_by_email
+_BY_SESSION = (
+    select(ChatMessage)
+    .where(ChatMessage.session_id == bindparam("session_id"))
+    .order_by(ChatMessage.created_at)
+)
+_BY_SESSION_SINCE = _BY_SESSION.where(ChatMessage.created_at >= bindparam("since"))
 
-class ChatMessageRepository(BaseRepository[ChatMessage]):
+
+class ChatMessageRepository(MonthlyPartitionedRepository[ChatMessage]):
     """Repository for chat message operations."""
 
+    _inserted_columns = ("session_id",)
+    _delete_returning = ("id", "session_id")
+
     def __init__(self, db: AsyncSession):
         super().__init__(ChatMessage, db)
 
-    async def get_by_session_id(self, session_id: str) -> List[ChatMessage]:
-        """Get all messages for a session."""
+    async def _on_insert(self, items: List[dict]) -> None:
+        """Keep ChatSession.message_count in step with inserts."""
+        await ChatSessionRepository(self.db).adjust_counters(
+            "message_count",
+            Counter(item["session_id"] for item in items),
+        )
+
+    async def _on_delete(self, rows: List[dict]) -> None:
+        """Keep ChatSession.message_count in step and drop tool executions."""
+        await ToolExecutionRepository(self.db)._delete_for_messages(
+            row["id"] for row in rows
+        )
+        deltas = Counter(row["session_id"] for row in rows)
+        await ChatSessionRepository(self.db).adjust_counters(
+            "message_count",
+            {session_id: -count for session_id, count in deltas.items()},
+        )
+
+    async def get_by_session_id(
+        self,
+        session_id: str,
+        since: Optional[datetime] = None,
+    ) -> List[ChatMessage]:
+        """Get all messages for a session.
+
+        Args:
+            session_id: Session ID
+            since: Only messages created at or after this time; passing the
+                session's ``created_at`` skips older monthly partitions
+
+        Returns:
+            List of messages, oldest first
+        """
         result = await self.db.execute(
-            select(ChatMessage)
-            .where(ChatMessage.session_id == session_id)
-            .order_by(ChatMessage.created_at),
+            _BY_SESSION if since is None else _BY_SESSION_SINCE,
+            {"session_id": session_id, "since": since},
         )
         return list(result.scalars().all())
 
@@ -28,6 +75,7 @@ class ChatMessageRepository(BaseRepository[ChatMessage]):
         session_id: str,
         page: int = 1,
         limit: int = 10,
+        count_strategy: Optional[CountStrategy] = None,
     ) -> Tuple[List[ChatMessage], int]:
         """Get paginated messages for a session with tool executions and
         documents.
@@ -36,6 +84,7 @@ class ChatMessageRepository(BaseRepository[ChatMessage]):
             session_id: Session ID to get messages for
             page: Page number (1-indexed)
             limit: Items per page
+            count_strategy: How to compute the total (exact by default)
 
         Returns:
             Tuple of (messages list, total count)
@@ -46,8 +95,7 @@ class ChatMessageRepository(BaseRepository[ChatMessage]):
             .select_from(ChatMessage)
             .where(ChatMessage.session_id == session_id)
         )
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await self._count(count_query, count_strategy)
 
         # Build query with eager loading of tool_executions and their documents
         skip = (page - 1) * limit
@@ -72,3 +120,39 @@ class ChatMessageRepository(BaseRepository[ChatMessage]):
         messages = list(result.scalars().all())
 
         return messages, total
+
+    async def get_messages_by_session_cursor(
+        self,
+        session_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+    ) -> CursorPage[ChatMessage]:
+        """Get messages for a session with tool executions and documents using
+        keyset pagination on (updated_at, id).
+
+        Args:
+            session_id: Session ID to get messages for
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+
+        Returns:
+            CursorPage with messages and next/prev cursors
+        """
+        from shared.models.tool_execution import ToolExecution
+
+        query = (
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id)
+            .options(
+                selectinload(ChatMessage.tool_executions).selectinload(
+                    ToolExecution.documents,
+                ),
+            )
+        )
+        return await self._paginate_by_cursor(
+            query,
+            ChatMessage.updated_at,
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+        )
@@ -1,13 +1,26 @@
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Select, case, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from shared.models.chat_message import ChatMessage
 from shared.models.chat_session import ChatSession
 from shared.models.session_document import SessionDocument
 from shared.repositories.base_repository import BaseRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.entity_cache import invalidate_entities
+from shared.repositories.pagination import CursorPage
+from shared.repositories.routing import REPLICA, route
+from shared.repositories.search import search_condition, search_rank
+from shared.repositories.transcript import transcript_statement
+
+# Denormalized per-session counters maintained by adjust_counters
+COUNTERS = ("message_count", "document_count")
+# Sessions per adjust_counters UPDATE statement
+COUNTER_BATCH_SIZE = 500
 
 
 class ChatSessionRepository(BaseRepository[ChatSession]):
@@ -16,6 +29,7 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
     def __init__(self, db: AsyncSession):
         super().__init__(ChatSession, db)
 
+    @route(REPLICA)
     async def get_sessions_with_filters(
         self,
         page: int = 1,
@@ -25,6 +39,8 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
         created_from: Optional[str] = None,
         created_to: Optional[str] = None,
         min_message_count: Optional[int] = None,
+        count_strategy: Optional[CountStrategy] = None,
+        rank_by_relevance: bool = False,
     ) -> Tuple[List[ChatSession], int]:
         """Get paginated chat sessions with filters.
 
@@ -36,41 +52,109 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
             created_from: Filter by created_at >= this date
             created_to: Filter by created_at <= this date
             min_message_count: Filter sessions with message count > this value
+            count_strategy: How to compute the total (exact by default)
+            rank_by_relevance: Order search results by match quality first
 
         Returns:
-            Tuple of (sessions list with counts, total count)
+            Tuple of (sessions list with counts, total count); the total is a
+            TotalCount whose ``kind`` says whether it is exact, cached or
+            estimated
         """
+        query, count_query = self._build_filtered_query(
+            accident=accident,
+            search=search,
+            created_from=created_from,
+            created_to=created_to,
+            min_message_count=min_message_count,
+        )
+
+        # Get total count
+        total = await self._count(count_query, count_strategy)
+
+        # Apply pagination and sorting
+        skip = (page - 1) * limit
+        if search and rank_by_relevance:
+            rank = search_rank(ChatSession, search, self.dialect_name)
+            if rank is not None:
+                query = query.order_by(rank)
+        query = query.order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+
+        result = await self.db.execute(query)
+        sessions = [dict(row._mapping) for row in result]
+
+        return sessions, total
+
+    async def get_sessions_with_filters_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        accident: Optional[bool] = None,
+        search: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        min_message_count: Optional[int] = None,
+    ) -> CursorPage[dict]:
+        """Get chat sessions with filters using keyset pagination.
+
+        Same filters and ordering (updated_at desc) as
+        ``get_sessions_with_filters``, but seeks on ``(updated_at, id)``
+        instead of using OFFSET and does not count the total.
+
+        Args:
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+            accident: Filter by accident coverage (True/False/None for all)
+            search: Search term for email (contains) or exact PLZ match
+            created_from: Filter by created_at >= this date
+            created_to: Filter by created_at <= this date
+            min_message_count: Filter sessions with message count > this value
+
+        Returns:
+            CursorPage with sessions and next/prev cursors
+        """
+        query, _ = self._build_filtered_query(
+            accident=accident,
+            search=search,
+            created_from=created_from,
+            created_to=created_to,
+            min_message_count=min_message_count,
+        )
+        return await self._paginate_by_cursor(
+            query,
+            ChatSession.updated_at,
+            cursor=cursor,
+            limit=limit,
+            transform=lambda row: dict(row._mapping),
+        )
+
+    def _build_filtered_query(
+        self,
+        accident: Optional[bool] = None,
+        search: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        min_message_count: Optional[int] = None,
+    ) -> Tuple[Select, Select]:
+        """Build the filtered session list query and its count query."""
         # Build base query with selected fields only
-        query = (
-            select(
-                ChatSession.id,
-                ChatSession.plz,
-                ChatSession.canton,
-                ChatSession.yob,
-                ChatSession.age,
-                ChatSession.model_pref,
-                ChatSession.deductible,
-                ChatSession.accident,
-                ChatSession.household_json,
-                ChatSession.email,
-                ChatSession.consent,
-                ChatSession.created_at,
-                ChatSession.updated_at,
-                func.count(ChatMessage.id.distinct()).label("message_count"),
-                func.count(SessionDocument.id.distinct()).label("document_count"),
-            )
-            .outerjoin(
-                ChatMessage,
-                ChatMessage.session_id == ChatSession.id,
-            )
-            .outerjoin(
-                SessionDocument,
-                SessionDocument.session_id == ChatSession.id,
-            )
-            .group_by(
-                ChatSession.id,
-            )
+        query = select(
+            ChatSession.id,
+            ChatSession.plz,
+            ChatSession.canton,
+            ChatSession.yob,
+            ChatSession.age,
+            ChatSession.model_pref,
+            ChatSession.deductible,
+            ChatSession.accident,
+            ChatSession.household_json,
+            ChatSession.email,
+            ChatSession.consent,
+            ChatSession.created_at,
+            ChatSession.updated_at,
+            ChatSession.message_count,
+            ChatSession.document_count,
         )
+        count_query = select(func.count()).select_from(ChatSession)
 
         # Apply filters
         conditions = []
@@ -82,7 +166,7 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
             # Search in email (contains) or exact PLZ match
             conditions.append(
                 or_(
-                    ChatSession.email.ilike(f"%{search}%"),
+                    search_condition(ChatSession, search, self.dialect_name),
                     ChatSession.plz == search,
                 ),
             )
@@ -107,56 +191,194 @@ class ChatSessionRepository(BaseRepository[ChatSession]):
                 # If parsing fails, skip this filter
                 pass
 
-        # If min_message_count is specified, filter sessions with message count > min_message_count
         if min_message_count is not None:
-            # Subquery to count messages per session
-            message_count_subquery = (
-                select(
-                    ChatMessage.session_id,
-                    func.count(ChatMessage.id).label("message_count"),
-                )
-                .group_by(ChatMessage.session_id)
-                .having(func.count(ChatMessage.id) > min_message_count)
-                .subquery()
-            )
-
-            # Add join to filter sessions
-            query = query.join(
-                message_count_subquery,
-                ChatSession.id == message_count_subquery.c.session_id,
-            )
+            conditions.append(ChatSession.message_count > min_message_count)
 
         if conditions:
             query = query.where(*conditions)
+            count_query = count_query.where(*conditions)
 
-        # Get total count
-        count_query = select(func.count()).select_from(ChatSession)
+        return query, count_query
 
-        if min_message_count is not None:
-            message_count_subquery = (
-                select(
-                    ChatMessage.session_id,
-                    func.count(ChatMessage.id).label("message_count"),
+    async def get_transcript(
+        self,
+        session_id: str,
+        message_limit: Optional[int] = None,
+        message_offset: int = 0,
+        include_large_fields: bool = True,
+    ) -> Optional[Dict]:
+        """Load a session with everything needed to render the conversation.
+
+        Built by the database as one JSON document in a single query: the
+        session's fields plus
+
+        - ``messages``: oldest first, each with its ``tool_executions``,
+          each of those with its ``documents``
+        - ``tool_executions`` / ``documents``: those not attached to a
+          message / tool execution
+        - ``funnel_events``: oldest first
+
+        Timestamps are ISO 8601 strings as rendered by the database.
+
+        Args:
+            session_id: Session ID
+            message_limit: Messages to include (default: all); the total is
+                the session's ``message_count``
+            message_offset: Messages to skip, oldest first
+            include_large_fields: Include free-form JSON columns such as
+                ``ToolExecution.tool_result`` (see ``transcript.LARGE_FIELDS``)
+
+        Returns:
+            Transcript dictionary, or None if the session does not exist
+        """
+        paged = message_limit is not None or message_offset > 0
+        if message_limit is None and self.dialect_name == "sqlite":
+            message_limit = -1  # SQLite's "no limit"; NULL on PostgreSQL
+        result = await self.db.execute(
+            transcript_statement(self.dialect_name, paged, include_large_fields),
+            {
+                "session_id": session_id,
+                "message_limit": message_limit,
+                "message_offset": message_offset,
+            },
+        )
+        return result.scalar_one_or_none()
+
+    async def adjust_counters(self, counter: str, deltas: Dict[str, int]) -> None:
+        """Add per-session deltas to a denormalized counter column.
+
+        Runs inside the caller's transaction and leaves ``updated_at``
+        untouched. Does not commit. Sessions are updated by one statement
+        per ``COUNTER_BATCH_SIZE`` sessions, in ID order so that concurrent
+        writers lock them in the same order. Sessions added but not yet
+        flushed get the delta on the instance instead.
+
+        Args:
+            counter: ``message_count`` or ``document_count``
+            deltas: Mapping of session ID to the amount to add
+
+        Raises:
+            ValueError: If ``counter`` is not a counter column
+        """
+        if counter not in COUNTERS:
+            raise ValueError(f"Unknown session counter: {counter!r}")
+        column = getattr(ChatSession, counter)
+        # Sessions not inserted yet take the delta in their INSERT
+        pending = [
+            instance
+            for instance in self.db.new
+            if isinstance(instance, ChatSession) and deltas.get(instance.id)
+        ]
+        for instance in pending:
+            value = getattr(instance, counter) or 0
+            setattr(instance, counter, value + deltas[instance.id])
+        pending_ids = {instance.id for instance in pending}
+        session_ids = sorted(
+            session_id
+            for session_id, delta in deltas.items()
+            if delta and session_id not in pending_ids
+        )
+        # Issued before any pending inserts are flushed so that a unit of
+        # work can still batch them
+        with self.db.no_autoflush:
+            for start in range(0, len(session_ids), COUNTER_BATCH_SIZE):
+                end = start + COUNTER_BATCH_SIZE
+                batch = session_ids[start:end]
+                delta = case(
+                    {session_id: deltas[session_id] for session_id in batch},
+                    value=ChatSession.id,
+                    else_=0,
                 )
-                .group_by(ChatMessage.session_id)
-                .having(func.count(ChatMessage.id) > min_message_count)
-                .subquery()
-            )
-            count_query = count_query.join(
-                message_count_subquery,
-                ChatSession.id == message_count_subquery.c.session_id,
-            )
+                await self.db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.id.in_(batch))
+                    .values(
+                        {column: column + delta, "updated_at": ChatSession.updated_at},
+                    )
+                    .execution_options(synchronize_session=False),
+                )
+        invalidate_entities(self.db, ChatSession, session_ids)
 
-        if conditions:
-            count_query = count_query.where(*conditions)
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        # Apply the deltas to sessions already loaded, as the ORM's
+        # "evaluate" synchronization would for a plain column + delta
+        for session_id in session_ids:
+            instance = self.db.identity_map.get(identity_key(ChatSession, session_id))
+            if instance is not None and counter in instance.__dict__:
+                value = instance.__dict__[counter] or 0
+                set_committed_value(instance, counter, value + deltas[session_id])
 
-        # Apply pagination and sorting
-        skip = (page - 1) * limit
-        query = query.order_by(ChatSession.updated_at.desc()).offset(skip).limit(limit)
+    async def reconcile_counters(
+        self,
+        session_ids: Optional[List[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Recompute message_count and document_count from the child tables.
 
-        result = await self.db.execute(query)
-        sessions = [dict(row._mapping) for row in result]
+        Use once to backfill the columns, and periodically to repair drift
+        from deletes that bypass the repositories (e.g. ORM cascades). Works
+        through sessions in primary-key batches, committing after each.
 
-        return sessions, total
+        Args:
+            session_ids: Sessions to reconcile (default: all sessions)
+            batch_size: Sessions per UPDATE statement
+
+        Returns:
+            Number of sessions whose counters were corrected
+        """
+        message_count = (
+            select(func.count())
+            .where(ChatMessage.session_id == ChatSession.id)
+            .scalar_subquery()
+        )
+        document_count = (
+            select(func.count())
+            .where(SessionDocument.session_id == ChatSession.id)
+            .scalar_subquery()
+        )
+
+        corrected = 0
+        async for batch in self._id_batches(session_ids, batch_size):
+            result = await self.db.execute(
+                update(ChatSession)
+                .where(
+                    ChatSession.id.in_(batch),
+                    or_(
+                        ChatSession.message_count != message_count,
+                        ChatSession.document_count != document_count,
+                    ),
+                )
+                .values(
+                    message_count=message_count,
+                    document_count=document_count,
+                    updated_at=ChatSession.updated_at,
+                )
+                .execution_options(synchronize_session=False),
+            )
+            corrected += result.rowcount
+            invalidate_entities(self.db, ChatSession, batch)
+            await self._commit()
+        return corrected
+
+    async def _id_batches(
+        self,
+        session_ids: Optional[List[str]],
+        batch_size: int,
+    ) -> AsyncIterator[List[str]]:
+        """Yield the given session IDs, or all of them by keyset, in batches."""
+        if session_ids is not None:
+            for start in range(0, len(session_ids), batch_size):
+                end = start + batch_size
+                yield session_ids[start:end]
+            return
+
+        last_id: Optional[str] = None
+        while True:
+            query = select(ChatSession.id).order_by(ChatSession.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(ChatSession.id > last_id)
+            result = await self.db.execute(query)
+            batch = list(result.scalars().all())
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]
@@ -0,0 +1,272 @@
+"""Bulk loading through PostgreSQL COPY, with a batched INSERT fallback."""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Table,
+    column,
+    func,
+    insert,
+    literal_column,
+    select,
+)
+from sqlalchemy import table as table_clause
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows staged and merged per transaction by ``copy_load``
+COPY_CHUNK_SIZE = 50_000
+
+ON_CONFLICT_IGNORE = "ignore"
+ON_CONFLICT_UPDATE = "update"
+ON_CONFLICT_MODES = (None, ON_CONFLICT_IGNORE, ON_CONFLICT_UPDATE)
+
+
+async def copy_records(
+    db: AsyncSession,
+    table: Table,
+    records: List[dict],
+    on_conflict: Optional[str] = None,
+    returning: Sequence[str] = (),
+) -> Tuple[int, List[dict]]:
+    """Load one chunk of records into ``table``.
+
+    On PostgreSQL (asyncpg) the records are streamed with binary COPY into
+    a temporary copy of the table and merged with a single
+    ``INSERT ... SELECT``, so ``on_conflict`` upserts by primary key. Other
+    drivers and dialects use multi-row INSERT statements.
+
+    Columns left out of a record get their Python-side default (e.g. the
+    generated ID) or their server default. Computed columns are never
+    written.
+
+    Args:
+        db: Database session
+        table: Target table
+        records: Dictionaries keyed by column name
+        on_conflict: None (fail on duplicates), "ignore" or "update"; the
+            latter two need the full primary key in every record
+        returning: Columns to return for rows that were newly inserted
+
+    Returns:
+        Tuple of (rows written, newly inserted rows restricted to ``returning``)
+    """
+    if on_conflict not in ON_CONFLICT_MODES:
+        raise ValueError(f"Unsupported on_conflict mode: {on_conflict!r}")
+    if on_conflict is not None:
+        pk = [col.name for col in table.primary_key]
+        if any(record.get(name) is None for record in records for name in pk):
+            raise ValueError(
+                f"on_conflict={on_conflict!r} requires every record to carry "
+                f"its primary key ({', '.join(pk)})",
+            )
+    records = _with_defaults(table, records)
+    if not records:
+        return 0, []
+    dialect = db.get_bind().dialect
+    # COPY goes through asyncpg's copy_records_to_table; other PostgreSQL
+    # drivers (e.g. psycopg) use INSERT statements
+    if dialect.name == "postgresql" and dialect.driver == "asyncpg":
+        return await _copy_merge(db, table, records, on_conflict, returning)
+    return await _insert_batches(db, table, records, on_conflict, returning)
+
+
+async def _copy_merge(
+    db: AsyncSession,
+    table: Table,
+    records: List[dict],
+    on_conflict: Optional[str],
+    returning: Sequence[str],
+) -> Tuple[int, List[dict]]:
+    # Dialect modules are imported on use, they are slow to import
+    from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+
+    stage = f"_copy_{table.name}"
+    connection = await db.connection()
+    # Also opens the transaction the raw COPY below runs in
+    await connection.exec_driver_sql(
+        f'CREATE TEMP TABLE "{stage}" (LIKE "{table.name}" INCLUDING DEFAULTS)',
+    )
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+    for names, group in _group_by_columns(records):
+        columns = [table.c[name] for name in names]
+        await driver_connection.copy_records_to_table(
+            stage,
+            columns=names,
+            records=[
+                tuple(_copy_value(col, record[col.name]) for col in columns)
+                for record in group
+            ],
+        )
+
+    names = _writable_columns(table)
+    staged = table_clause(stage, *[column(name) for name in names])
+    statement = postgresql_insert(table).from_select(names, select(*staged.c))
+    statement = _on_conflict(
+        statement,
+        table,
+        on_conflict,
+        _record_keys(records),
+        now=statement.excluded.updated_at if "updated_at" in table.c else None,
+    )
+    if returning:
+        statement = statement.returning(
+            *[table.c[name] for name in returning],
+            # xmax is zero only for rows this statement inserted
+            literal_column("xmax = 0").label("inserted"),
+        )
+
+    result = await connection.execute(statement)
+    if returning:
+        rows = result.all()
+        count = len(rows)
+        inserted = [
+            {name: row._mapping[name] for name in returning}
+            for row in rows
+            if row.inserted
+        ]
+    else:
+        count = result.rowcount
+        inserted = []
+    await connection.exec_driver_sql(f'DROP TABLE "{stage}"')
+    return count, inserted
+
+
+async def _insert_batches(
+    db: AsyncSession,
+    table: Table,
+    records: List[dict],
+    on_conflict: Optional[str],
+    returning: Sequence[str],
+) -> Tuple[int, List[dict]]:
+    dialect_name = db.get_bind().dialect.name
+    if on_conflict is None:
+        make_insert = insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects import postgresql
+
+        make_insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        make_insert = sqlite.insert
+    else:
+        raise ValueError(
+            f"on_conflict={on_conflict!r} requires PostgreSQL or SQLite",
+        )
+
+    pk = [col.name for col in table.primary_key]
+    keys = _record_keys(records)
+    count = 0
+    inserted: List[dict] = []
+    for _, group in _group_by_columns(records):
+        # Insert new rows first so RETURNING reports only those; existing
+        # rows are then overwritten by a second, conflicting pass
+        statement = make_insert(table)
+        if on_conflict is not None:
+            statement = statement.on_conflict_do_nothing(index_elements=pk)
+        statement = statement.returning(
+            *[table.c[name] for name in dict.fromkeys([*pk, *returning])],
+        )
+        rows = (await db.execute(statement, group)).all()
+        inserted.extend(
+            {name: row._mapping[name] for name in returning} for row in rows
+        )
+        count += len(rows)
+
+        if on_conflict == ON_CONFLICT_UPDATE and len(rows) < len(group):
+            statement = _on_conflict(
+                make_insert(table),
+                table,
+                on_conflict,
+                keys,
+                now=func.now(),
+            )
+            await db.execute(statement, group)
+            count += len(group) - len(rows)
+
+    return count, inserted if returning else []
+
+
+def _on_conflict(
+    statement: Any,
+    table: Table,
+    on_conflict: Optional[str],
+    keys: Set[str],
+    now: Any,
+) -> Any:
+    pk = [col.name for col in table.primary_key]
+    if on_conflict == ON_CONFLICT_IGNORE:
+        return statement.on_conflict_do_nothing(index_elements=pk)
+    if on_conflict == ON_CONFLICT_UPDATE:
+        # Only overwrite columns the caller supplied, so server defaults
+        # such as created_at do not clobber stored values
+        update_set: Dict[str, Any] = {
+            name: statement.excluded[name]
+            for name in _writable_columns(table)
+            if name in keys and name not in pk
+        }
+        if now is not None and "updated_at" in table.c and "updated_at" not in keys:
+            update_set["updated_at"] = now
+        if not update_set:
+            return statement.on_conflict_do_nothing(index_elements=pk)
+        return statement.on_conflict_do_update(index_elements=pk, set_=update_set)
+    return statement
+
+
+def _writable_columns(table: Table) -> List[str]:
+    return [col.name for col in table.columns if col.computed is None]
+
+
+def _with_defaults(table: Table, records: List[dict]) -> List[dict]:
+    writable = set(_writable_columns(table))
+    datetimes = {col.name for col in table.columns if isinstance(col.type, DateTime)}
+    defaults = [
+        col
+        for col in table.columns
+        if col.default is not None
+        and (col.default.is_scalar or col.default.is_callable)
+    ]
+    prepared = []
+    for record in records:
+        record = {name: value for name, value in record.items() if name in writable}
+        for name in datetimes.intersection(record):
+            if isinstance(record[name], str):
+                # e.g. rows replayed from an NDJSON export
+                record[name] = datetime.fromisoformat(record[name])
+        for col in defaults:
+            if record.get(col.name) is None:
+                default = col.default
+                record[col.name] = (
+                    default.arg(None) if default.is_callable else default.arg
+                )
+        prepared.append(record)
+    return prepared
+
+
+def _record_keys(records: List[dict]) -> Set[str]:
+    keys: Set[str] = set()
+    for record in records:
+        keys.update(record)
+    return keys
+
+
+def _group_by_columns(records: List[dict]) -> List[Tuple[List[str], List[dict]]]:
+    # COPY and multi-row INSERT both need the same columns in every row
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for record in records:
+        groups.setdefault(tuple(sorted(record)), []).append(record)
+    return [(list(names), group) for names, group in groups.items()]
+
+
+def _copy_value(col: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(col.type, JSON):
+        # asyncpg's binary COPY encodes json columns from text
+        return json.dumps(value)
+    return value
@@ -0,0 +1,133 @@
+"""Total-count strategies for paginated list methods."""
+
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+
+
+class TotalCount(int):
+    """Row total that also says how it was obtained.
+
+    Behaves like a plain ``int``; ``kind`` is one of ``COUNT_EXACT``,
+    ``COUNT_CACHED`` or ``COUNT_ESTIMATED`` so the UI can render
+    estimates as e.g. "~1.2M".
+    """
+
+    kind: str
+
+    def __new__(cls, value: int, kind: str = COUNT_EXACT) -> "TotalCount":
+        total = super().__new__(cls, value)
+        total.kind = kind
+        return total
+
+    @property
+    def is_exact(self) -> bool:
+        return self.kind != COUNT_ESTIMATED
+
+    def __repr__(self) -> str:
+        return f"TotalCount({int(self)}, kind={self.kind!r})"
+
+
+class CountStrategy(ABC):
+    """Computes the total for a ``SELECT count(*)`` query."""
+
+    @abstractmethod
+    async def count(self, db: AsyncSession, count_query: Select) -> TotalCount:
+        """Return the total of ``count_query``."""
+
+
+class ExactCount(CountStrategy):
+    """Run the count query every time (default)."""
+
+    async def count(self, db: AsyncSession, count_query: Select) -> TotalCount:
+        result = await db.execute(count_query)
+        return TotalCount(result.scalar() or 0, COUNT_EXACT)
+
+
+class CachedCount(CountStrategy):
+    """Reuse exact counts for identical filters for ``ttl`` seconds.
+
+    The cache key is the compiled count statement plus its bound
+    parameters, so two calls with the same normalized filter set share an
+    entry. Keep one instance per process (e.g. at module level) so the
+    cache outlives individual requests.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+
+    async def count(self, db: AsyncSession, count_query: Select) -> TotalCount:
+        key = _statement_key(count_query)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            return TotalCount(entry[1], COUNT_CACHED)
+
+        total = await ExactCount().count(db, count_query)
+        self._entries[key] = (now + self.ttl, int(total))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return total
+
+    def clear(self) -> None:
+        """Drop all cached totals."""
+        self._entries.clear()
+
+
+class EstimatedCount(CountStrategy):
+    """Use the PostgreSQL planner's row estimate for large results.
+
+    The estimate comes from ``EXPLAIN`` and costs no table scan. When it is
+    below ``exact_below`` the exact count is cheap enough and is run
+    instead. Other dialects always count exactly.
+    """
+
+    def __init__(self, exact_below: int = 10_000):
+        self.exact_below = exact_below
+
+    async def count(self, db: AsyncSession, count_query: Select) -> TotalCount:
+        estimate = await self._estimate(db, count_query)
+        if estimate is None or estimate < self.exact_below:
+            return await ExactCount().count(db, count_query)
+        return TotalCount(estimate, COUNT_ESTIMATED)
+
+    async def _estimate(self, db: AsyncSession, count_query: Select) -> Optional[int]:
+        dialect = db.get_bind().dialect
+        if dialect.name != "postgresql":
+            return None
+
+        sql = count_query.compile(
+            dialect=dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        # Sent as-is: literal timestamps would otherwise be parsed as binds
+        connection = await db.connection()
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        explained = result.scalar()
+        if isinstance(explained, str):
+            explained = json.loads(explained)
+        plan = explained[0]["Plan"]
+        # The count(*) aggregate itself is estimated at one row; use the
+        # row estimate of the node feeding it
+        if plan.get("Node Type") == "Aggregate" and plan.get("Plans"):
+            plan = plan["Plans"][0]
+        return int(plan["Plan Rows"])
+
+
+def _statement_key(statement: Select) -> Hashable:
+    compiled = statement.compile()
+    params = sorted((name, repr(value)) for name, value in compiled.params.items())
+    return str(compiled), tuple(params)
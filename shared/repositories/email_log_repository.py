@@ -1,11 +1,20 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import ColumnElement, Date, bindparam, cast, desc, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models.email_log import EmailLog
 from shared.repositories.base_repository import BaseRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.pagination import CursorPage
+from shared.repositories.routing import REPLICA, route
+
+# Built once; see LeadRepository.get_by_email
+_BY_PROVIDER_ID = select(EmailLog).where(
+    EmailLog.provider_id == bindparam("provider_id"),
+)
 
 
 class EmailLogRepository(BaseRepository[EmailLog]):
@@ -16,16 +25,37 @@ class EmailLogRepository(BaseRepository[EmailLog]):
 
     async def get_by_provider_id(self, provider_id: str) -> Optional[EmailLog]:
         """Get email log by provider ID."""
-        result = await self.db.execute(
-            select(EmailLog).where(EmailLog.provider_id == provider_id),
-        )
+        result = await self.db.execute(_BY_PROVIDER_ID, {"provider_id": provider_id})
         return result.scalar_one_or_none()
 
+    async def update_status_by_provider_id(
+        self,
+        provider_id: str,
+        status: str,
+        error: Optional[str] = None,
+    ) -> int:
+        """Set the status (and error) of the logs with a provider ID.
+
+        Args:
+            provider_id: Email provider message ID
+            status: New status
+            error: Error message to store, if any
+
+        Returns:
+            Number of updated logs
+        """
+        count, _ = await self.update_where(
+            EmailLog.provider_id == provider_id,
+            {"status": status, "error": error},
+        )
+        return count
+
     async def get_logs_with_filters(
         self,
         page: int = 1,
         limit: int = 10,
         status: Optional[str] = None,
+        count_strategy: Optional[CountStrategy] = None,
     ) -> Tuple[List[EmailLog], int]:
         """Get paginated email logs with filters.
 
@@ -33,6 +63,7 @@ class EmailLogRepository(BaseRepository[EmailLog]):
             page: Page number (1-indexed)
             limit: Items per page
             status: Filter by status
+            count_strategy: How to compute the total (exact by default)
 
         Returns:
             Tuple of (email logs list, total count)
@@ -54,89 +85,114 @@ class EmailLogRepository(BaseRepository[EmailLog]):
         if status:
             count_query = count_query.where(EmailLog.status == status)
 
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await self._count(count_query, count_strategy)
 
         return logs, total
 
-    async def get_analytics(self, days: int = 30) -> Dict:
-        """Get email analytics for the specified number of days.
+    async def get_logs_with_filters_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        status: Optional[str] = None,
+    ) -> CursorPage[EmailLog]:
+        """Get email logs with filters using keyset pagination on
+        (created_at, id).
 
         Args:
-            days: Number of days to analyze
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+            status: Filter by status
 
         Returns:
-            Dictionary with analytics data
+            CursorPage with email logs and next/prev cursors
         """
-        # Date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-
-        # Total emails
-        total_result = await self.db.execute(
-            select(func.count(EmailLog.id)).where(
-                EmailLog.created_at >= start_date,
-            ),
-        )
-        total_emails = total_result.scalar() or 0
+        query = select(EmailLog)
+        if status:
+            query = query.where(EmailLog.status == status)
 
-        # Sent emails
-        sent_result = await self.db.execute(
-            select(func.count(EmailLog.id))
-            .where(EmailLog.created_at >= start_date)
-            .where(EmailLog.status == "sent"),
+        return await self._paginate_by_cursor(
+            query,
+            EmailLog.created_at,
+            cursor=cursor,
+            limit=limit,
         )
-        sent_emails = sent_result.scalar() or 0
 
-        # Failed emails
-        failed_result = await self.db.execute(
-            select(func.count(EmailLog.id))
-            .where(EmailLog.created_at >= start_date)
-            .where(EmailLog.status == "failed"),
-        )
-        failed_emails = failed_result.scalar() or 0
+    @route(REPLICA)
+    async def get_analytics(
+        self,
+        days: int = 30,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        tz: str = "UTC",
+    ) -> Dict:
+        """Get email analytics for a date range.
 
-        # Pending emails
-        pending_result = await self.db.execute(
-            select(func.count(EmailLog.id))
-            .where(EmailLog.created_at >= start_date)
-            .where(EmailLog.status == "pending"),
-        )
-        pending_emails = pending_result.scalar() or 0
+        All counters come from a single scan of the range, grouped by day
+        and template with conditional aggregates per status.
 
-        # Success rate
-        success_rate = (sent_emails / total_emails * 100) if total_emails > 0 else 0
+        Args:
+            days: Number of days to analyze when start_date is not given
+            start_date: Include emails created at or after this time
+            end_date: Include emails created before this time (default: now)
+            tz: IANA timezone name used to bucket emails by day (on
+                PostgreSQL and SQLite)
 
-        # Emails by template
-        template_result = await self.db.execute(
-            select(EmailLog.template, func.count(EmailLog.id))
-            .where(EmailLog.created_at >= start_date)
-            .where(EmailLog.template.isnot(None))
-            .group_by(EmailLog.template),
-        )
-        emails_by_template = {
-            template: count for template, count in template_result.fetchall()
-        }
+        Returns:
+            Dictionary with analytics data
+        """
+        # Date range
+        end_date = end_date or datetime.now(timezone.utc)
+        start_date = start_date or end_date - timedelta(days=days)
+        in_range = (EmailLog.created_at >= start_date, EmailLog.created_at < end_date)
 
-        # Emails by day
-        daily_result = await self.db.execute(
+        day = self._day_bucket(tz, start_date).label("day")
+        aggregate_result = await self.db.execute(
             select(
-                func.date(EmailLog.created_at).label("date"),
-                func.count(EmailLog.id).label("count"),
+                day,
+                EmailLog.template,
+                func.count().label("total"),
+                func.count().filter(EmailLog.status == "sent").label("sent"),
+                func.count().filter(EmailLog.status == "failed").label("failed"),
+                func.count().filter(EmailLog.status == "pending").label("pending"),
             )
-            .where(EmailLog.created_at >= start_date)
-            .group_by(func.date(EmailLog.created_at))
-            .order_by("date"),
+            .where(*in_range)
+            .group_by(day, EmailLog.template),
         )
+
+        total_emails = sent_emails = failed_emails = pending_emails = 0
+        emails_by_template: Dict[str, int] = {}
+        counts_by_day: Dict[str, int] = {}
+        for row in aggregate_result:
+            total_emails += row.total
+            sent_emails += row.sent
+            failed_emails += row.failed
+            pending_emails += row.pending
+            if row.template is not None:
+                emails_by_template[row.template] = (
+                    emails_by_template.get(row.template, 0) + row.total
+                )
+            date = str(row.day)
+            counts_by_day[date] = counts_by_day.get(date, 0) + row.total
+
+        # Success rate
+        success_rate = (sent_emails / total_emails * 100) if total_emails > 0 else 0
+
         emails_by_day = [
-            {"date": str(date), "count": count}
-            for date, count in daily_result.fetchall()
+            {"date": date, "count": count}
+            for date, count in sorted(counts_by_day.items())
         ]
 
         # Recent emails
         recent_result = await self.db.execute(
-            select(EmailLog)
-            .where(EmailLog.created_at >= start_date)
+            select(
+                EmailLog.id,
+                EmailLog.to_email,
+                EmailLog.subject,
+                EmailLog.status,
+                EmailLog.template,
+                EmailLog.created_at,
+            )
+            .where(*in_range)
             .order_by(desc(EmailLog.created_at))
             .limit(10),
         )
@@ -149,7 +205,7 @@ class EmailLogRepository(BaseRepository[EmailLog]):
                 "template": log.template,
                 "created_at": log.created_at.isoformat(),
             }
-            for log in recent_result.scalars().all()
+            for log in recent_result
         ]
 
         return {
@@ -162,3 +218,20 @@ class EmailLogRepository(BaseRepository[EmailLog]):
             "emails_by_day": emails_by_day,
             "recent_emails": recent_emails,
         }
+
+    def _day_bucket(self, tz: str, reference: datetime) -> ColumnElement:
+        """Build the local calendar day of ``created_at`` in timezone ``tz``.
+
+        PostgreSQL converts each timestamp with the named zone. SQLite has
+        no timezone database, so the zone's UTC offset at ``reference`` is
+        applied to the whole range. Other dialects ignore ``tz`` and take
+        the date of the timestamp as the database returns it.
+        """
+        if self.dialect_name == "postgresql":
+            return func.date(func.timezone(tz, EmailLog.created_at))
+        if self.dialect_name != "sqlite":
+            return cast(EmailLog.created_at, Date)
+
+        offset = reference.astimezone(ZoneInfo(tz)).utcoffset() or timedelta()
+        minutes = int(offset.total_seconds() // 60)
+        return func.date(EmailLog.created_at, f"{minutes:+d} minutes")
@@ -0,0 +1,198 @@
+"""Process-local read-through cache of entity snapshots keyed by ID."""
+
+import copy
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+from sqlalchemy import Row, event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from shared.models.base import BaseModel
+
+_PENDING_KEY = "shared.entity_cache_pending"
+
+
+class EntitySnapshot:
+    """Detached, read-only copy of an entity's column values.
+
+    Snapshots hold no session state and never lazy-load, so they can be
+    shared between sessions and coroutines. Relationship attributes are
+    not included.
+    """
+
+    __slots__ = ("_model", "_values")
+
+    def __init__(self, model: Type[BaseModel], values: Dict[str, Any]):
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_values", values)
+
+    @classmethod
+    def from_row(cls, model: Type[BaseModel], row: Row) -> "EntitySnapshot":
+        """Build a snapshot from a row selecting all of the model's columns."""
+        mapper = inspect(model)
+        mapping = row._mapping
+        values = {
+            attr.key: copy.deepcopy(mapping[attr.columns[0]])
+            for attr in mapper.column_attrs
+        }
+        return cls(model, values)
+
+    @property
+    def model(self) -> Type[BaseModel]:
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self._model.__name__} snapshot is read-only")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EntitySnapshot):
+            return NotImplemented
+        return self._model is other._model and self._values == other._values
+
+    def __hash__(self) -> int:
+        return hash((self._model, self._values.get("id")))
+
+    def __repr__(self) -> str:
+        return f"<{self._model.__name__}Snapshot(id={self._values.get('id')!r})>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy the snapshot's values into a new dictionary."""
+        return copy.deepcopy(self._values)
+
+
+@dataclass
+class CacheStats:
+    """Counters of one entity cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class EntityCache:
+    """LRU cache with per-entry TTL for one model's snapshots."""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, EntitySnapshot]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, id: str) -> Optional[EntitySnapshot]:
+        entry = self._entries.get(id)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[id]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(id)
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self, id: str, snapshot: EntitySnapshot) -> None:
+        self._entries[id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, id: str) -> None:
+        if self._entries.pop(id, None) is not None:
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+
+_caches: Dict[Type[BaseModel], EntityCache] = {}
+
+
+def configure_entity_cache(
+    model: Type[BaseModel],
+    ttl: float = 30.0,
+    max_entries: int = 10_000,
+) -> EntityCache:
+    """Enable (or reconfigure) caching of ``model`` snapshots.
+
+    Args:
+        model: Model class, e.g. ``ChatSession``
+        ttl: Seconds a snapshot stays valid
+        max_entries: LRU size bound
+
+    Returns:
+        The model's cache, exposing ``stats``
+    """
+    cache = EntityCache(ttl=ttl, max_entries=max_entries)
+    _caches[model] = cache
+    return cache
+
+
+def disable_entity_cache(model: Type[BaseModel]) -> None:
+    """Stop caching ``model`` and drop its entries."""
+    _caches.pop(model, None)
+
+
+def get_entity_cache(model: Type[BaseModel]) -> Optional[EntityCache]:
+    """Return the model's cache, or None if caching is not enabled for it."""
+    return _caches.get(model)
+
+
+def invalidate_entities(
+    db: AsyncSession,
+    model: Type[BaseModel],
+    ids: Optional[Iterable[str]] = None,
+) -> None:
+    """Drop cached snapshots now and again when the transaction ends.
+
+    The second pass removes snapshots that were cached while this
+    transaction was still open, whether from the old committed row or from
+    this transaction's own writes before a rollback.
+
+    Args:
+        db: Session performing the write
+        model: Model class written to
+        ids: IDs written, or None for an unknown set (clears the model)
+    """
+    cache = _caches.get(model)
+    if cache is None:
+        return
+
+    ids = None if ids is None else list(ids)
+    _invalidate(cache, ids)
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    pending.append((model, ids))
+
+
+def _invalidate(cache: EntityCache, ids: Optional[list]) -> None:
+    if ids is None:
+        cache.clear()
+        return
+    for id in ids:
+        cache.invalidate(id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_pending(session: Session) -> None:
+    for model, ids in session.info.pop(_PENDING_KEY, []):
+        cache = _caches.get(model)
+        if cache is not None:
+            _invalidate(cache, ids)
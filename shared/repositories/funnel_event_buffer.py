@@ -0,0 +1,176 @@
+"""In-process buffer batching funnel event inserts off the request path."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.repositories.funnel_event_repository import FunnelEventRepository
+from shared.repositories.unit_of_work import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class BufferMetrics:
+    """Counters and timings of a FunnelEventBuffer."""
+
+    queue_depth: int = 0
+    enqueued: int = 0
+    dropped: int = 0
+    flushed: int = 0
+    failed: int = 0
+    flushes: int = 0
+    last_flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+    total_flush_seconds: float = 0.0
+
+
+class FunnelEventBuffer:
+    """Queue funnel events in memory and insert them in batches.
+
+    A background task flushes whenever ``max_batch_size`` events are
+    waiting or ``flush_interval`` seconds have passed since the first
+    queued event, using one multi-row INSERT per batch. The queue is
+    bounded: ``submit`` waits for room (backpressure), ``submit_nowait``
+    never blocks and drops the event instead. ``stop`` flushes everything
+    still queued.
+
+    Example:
+        buffer = FunnelEventBuffer(async_session_factory)
+        await buffer.start()
+        buffer.submit_nowait({"event_type": "page_view", "session_id": sid})
+        ...
+        await buffer.stop()
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = 500,
+        flush_interval: float = 0.25,
+        max_queue_size: int = 10_000,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._metrics = BufferMetrics()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def metrics(self) -> BufferMetrics:
+        """Current metrics, including the live queue depth."""
+        self._metrics.queue_depth = self._queue.qsize()
+        return self._metrics
+
+    async def __aenter__(self) -> "FunnelEventBuffer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush all queued events and stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, event: dict) -> None:
+        """Queue an event, waiting while the queue is full."""
+        await self._queue.put(self._stamp(event))
+        self._metrics.enqueued += 1
+
+    def submit_nowait(self, event: dict) -> bool:
+        """Queue an event without waiting.
+
+        Returns:
+            False if the queue was full and the event was dropped
+        """
+        try:
+            self._queue.put_nowait(self._stamp(event))
+        except asyncio.QueueFull:
+            self._metrics.dropped += 1
+            return False
+        self._metrics.enqueued += 1
+        return True
+
+    @staticmethod
+    def _stamp(event: dict) -> dict:
+        # Record when the event happened, not when its batch is flushed
+        if event.get("created_at") is None:
+            event = {**event, "created_at": datetime.now(timezone.utc)}
+        return event
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch: List[dict] = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]) -> None:
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                repository = FunnelEventRepository(db)
+                async with UnitOfWork(db):
+                    for events in _group_by_keys(batch):
+                        await repository.bulk_create(events, as_rows=True)
+        except Exception:
+            self._metrics.failed += len(batch)
+            logger.exception("Failed to flush %d funnel events", len(batch))
+        else:
+            self._metrics.flushed += len(batch)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._metrics.flushes += 1
+            self._metrics.last_flush_seconds = elapsed
+            self._metrics.total_flush_seconds += elapsed
+            self._metrics.max_flush_seconds = max(
+                self._metrics.max_flush_seconds,
+                elapsed,
+            )
+
+
+def _group_by_keys(batch: List[dict]) -> List[List[dict]]:
+    # A multi-row INSERT needs the same columns in every row
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for event in batch:
+        groups.setdefault(tuple(sorted(event)), []).append(event)
+    return list(groups.values())
@@ -1,39 +1,135 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Subquery,
+    and_,
+    bindparam,
+    case,
+    func,
+    null,
+    select,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models.funnel_event import FunnelEvent
-from shared.repositories.base_repository import BaseRepository
+from shared.repositories.base_repository import STREAM_BATCH_SIZE
+from shared.repositories.partitioned_repository import MonthlyPartitionedRepository
 
+# Columns a funnel can be broken down by (taken from the first step's event)
+FUNNEL_BREAKDOWNS = (
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+    "utm_term",
+    "utm_content",
+    "device_type",
+    "locale",
+)
+# Columns identifying whose journey a funnel follows
+FUNNEL_ENTITIES = ("session_id", "lead_id")
 
-class FunnelEventRepository(BaseRepository[FunnelEvent]):
+
+# Built once; see LeadRepository.get_by_email
+_BY_SESSION = (
+    select(FunnelEvent)
+    .where(FunnelEvent.session_id == bindparam("session_id"))
+    .order_by(FunnelEvent.created_at)
+)
+_BY_SESSION_SINCE = _BY_SESSION.where(FunnelEvent.created_at >= bindparam("since"))
+
+
+class FunnelEventRepository(MonthlyPartitionedRepository[FunnelEvent]):
     """Repository for funnel event operations."""
 
     def __init__(self, db: AsyncSession):
         super().__init__(FunnelEvent, db)
 
-    async def get_by_session_id(self, session_id: str) -> List[FunnelEvent]:
-        """Get all events for a session."""
+    async def get_by_session_id(
+        self,
+        session_id: str,
+        since: Optional[datetime] = None,
+    ) -> List[FunnelEvent]:
+        """Get all events for a session.
+
+        Args:
+            session_id: Session ID
+            since: Only events created at or after this time; passing the
+                session's ``created_at`` skips older monthly partitions
+
+        Returns:
+            List of funnel events, oldest first
+        """
         result = await self.db.execute(
-            select(FunnelEvent)
-            .where(FunnelEvent.session_id == session_id)
-            .order_by(FunnelEvent.created_at),
+            _BY_SESSION if since is None else _BY_SESSION_SINCE,
+            {"session_id": session_id, "since": since},
         )
         return list(result.scalars().all())
 
+    def stream_by_session_id(
+        self,
+        session_id: str,
+        after: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[FunnelEvent]]:
+        """Stream all events for a session, oldest first, in batches."""
+        return self.stream_where(
+            FunnelEvent.session_id == session_id,
+            after=after,
+            batch_size=batch_size,
+        )
+
+    def stream_by_date_range(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        after: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[FunnelEvent]]:
+        """Stream all events created in a date range, oldest first, in batches.
+
+        Args:
+            start_date: Include events created at or after this time
+            end_date: Include events created before this time
+            after: Resume token from a previous export
+            batch_size: Events per batch
+
+        Yields:
+            Lists of funnel events
+        """
+        return self.stream_where(
+            FunnelEvent.created_at >= start_date,
+            FunnelEvent.created_at < end_date,
+            after=after,
+            batch_size=batch_size,
+        )
+
     async def get_by_event_type(
         self,
         event_type: str,
         limit: int = 100,
+        since: Optional[datetime] = None,
     ) -> List[FunnelEvent]:
-        """Get events by type."""
-        result = await self.db.execute(
+        """Get the most recent events of a type.
+
+        Args:
+            event_type: Event type
+            limit: Maximum number of events
+            since: Only events created at or after this time, so older
+                monthly partitions are skipped
+
+        Returns:
+            List of funnel events, newest first
+        """
+        query = (
             select(FunnelEvent)
             .where(FunnelEvent.event_type == event_type)
-            .order_by(FunnelEvent.created_at.asc())
-            .limit(limit),
+            .order_by(FunnelEvent.created_at.desc())
+            .limit(limit)
         )
+        result = await self.db.execute(self._created_since(query, since))
         return list(result.scalars().all())
 
     async def get_by_lead_id(self, lead_id: str) -> List[FunnelEvent]:
@@ -44,3 +140,322 @@ class FunnelEventRepository(BaseRepository[FunnelEvent]):
             .order_by(FunnelEvent.created_at),
         )
         return list(result.scalars().all())
+
+    async def get_funnel(
+        self,
+        steps: Sequence[str],
+        start_date: datetime,
+        end_date: datetime,
+        breakdown: Optional[str] = None,
+        entity: str = "session_id",
+    ) -> Dict:
+        """Compute an ordered conversion funnel over a date range.
+
+        A session (or lead) reaches step N when it has a step-N event at or
+        after the time it reached step N-1; the earliest qualifying event is
+        used for each step. Step times are computed in SQL with window
+        functions over a single scan of the matching events.
+
+        Args:
+            steps: Ordered, distinct event types, e.g. ["chat_started", "lead_created"]
+            start_date: Include events created at or after this time
+            end_date: Include events created before this time
+            breakdown: Optional column to split by (see FUNNEL_BREAKDOWNS),
+                taken from the entity's first step event
+            entity: Whose journey to follow, "session_id" or "lead_id"
+
+        Returns:
+            Dictionary with per-step counts, conversion rates (in percent)
+            and median / p90 seconds from the previous step, overall and
+            per breakdown value
+        """
+        self._validate_funnel(steps, breakdown, entity)
+        aggregated = await self._aggregate_funnel(
+            steps,
+            start_date,
+            end_date,
+            breakdown,
+            entity,
+        )
+        return _funnel_report(steps, start_date, end_date, breakdown, aggregated)
+
+    async def stream_funnel(
+        self,
+        steps: Sequence[str],
+        start_date: datetime,
+        end_date: datetime,
+        interval: timedelta = timedelta(days=7),
+        breakdown: Optional[str] = None,
+        entity: str = "session_id",
+    ) -> AsyncIterator[Dict]:
+        """Compute a funnel slice by slice for long date ranges.
+
+        Each slice of ``interval`` is evaluated as an independent cohort
+        (events outside the slice are ignored) and yielded as soon as it is
+        computed, in the same format as ``get_funnel``.
+
+        Args:
+            steps: Ordered, distinct event types
+            start_date: Start of the first slice
+            end_date: End of the last slice
+            interval: Length of each slice
+            breakdown: Optional column to split by (see FUNNEL_BREAKDOWNS)
+            entity: Whose journey to follow, "session_id" or "lead_id"
+
+        Yields:
+            One funnel report per slice
+        """
+        self._validate_funnel(steps, breakdown, entity)
+        slice_start = start_date
+        while slice_start < end_date:
+            slice_end = min(slice_start + interval, end_date)
+            aggregated = await self._aggregate_funnel(
+                steps,
+                slice_start,
+                slice_end,
+                breakdown,
+                entity,
+            )
+            yield _funnel_report(steps, slice_start, slice_end, breakdown, aggregated)
+            slice_start = slice_end
+
+    @staticmethod
+    def _validate_funnel(
+        steps: Sequence[str],
+        breakdown: Optional[str],
+        entity: str,
+    ) -> None:
+        if not steps:
+            raise ValueError("A funnel needs at least one step")
+        if len(set(steps)) != len(steps):
+            raise ValueError("Funnel steps must be distinct event types")
+        if breakdown is not None and breakdown not in FUNNEL_BREAKDOWNS:
+            raise ValueError(f"Unsupported funnel breakdown: {breakdown}")
+        if entity not in FUNNEL_ENTITIES:
+            raise ValueError(f"Unsupported funnel entity: {entity}")
+
+    async def _aggregate_funnel(
+        self,
+        steps: Sequence[str],
+        start_date: datetime,
+        end_date: datetime,
+        breakdown: Optional[str],
+        entity: str,
+    ) -> Tuple[List[dict], Dict[Optional[str], List[dict]]]:
+        """Aggregate per-entity step times into per-step stats.
+
+        Returns:
+            Tuple of (overall stats, stats per breakdown value)
+        """
+        journeys = self._funnel_journeys(steps, start_date, end_date, breakdown, entity)
+        times = [journeys.c[f"t{index}"] for index in range(1, len(steps) + 1)]
+
+        if self.dialect_name == "postgresql":
+            if breakdown is None:
+                columns = [null(), null()]
+            else:
+                columns = [journeys.c.dim, func.grouping(journeys.c.dim)]
+            for index, step_time in enumerate(times):
+                columns.append(func.count(step_time))
+                if index:
+                    seconds = func.extract("epoch", step_time - times[index - 1])
+                    columns.append(func.percentile_cont(0.5).within_group(seconds))
+                    columns.append(func.percentile_cont(0.9).within_group(seconds))
+            query = select(*columns)
+            if breakdown is not None:
+                # Overall and per-value stats from the same scan
+                query = query.group_by(
+                    func.grouping_sets(journeys.c.dim, tuple_()),
+                )
+            result = await self.db.execute(query)
+
+            overall: List[dict] = _empty_stats(steps)
+            groups: Dict[Optional[str], List[dict]] = {}
+            for row in result:
+                values = list(row[2:])
+                stats = []
+                for index in range(len(steps)):
+                    count = values.pop(0)
+                    median = p90 = None
+                    if index:
+                        median, p90 = values.pop(0), values.pop(0)
+                    stats.append({"count": count, "median": median, "p90": p90})
+                if breakdown is None or row[1]:
+                    overall = stats
+                else:
+                    groups[row[0]] = stats
+            return overall, groups
+
+        # Without percentile aggregates, durations are summarized here
+        result = await self.db.execute(select(journeys.c.dim, *times))
+        counts: Dict[Optional[str], List[int]] = {}
+        durations: Dict[Optional[str], List[List[float]]] = {}
+        for row in result:
+            dim, step_times = row[0], row[1:]
+            group_counts = counts.setdefault(dim, [0] * len(steps))
+            group_durations = durations.setdefault(dim, [[] for _ in steps])
+            for index, step_time in enumerate(step_times):
+                if step_time is None:
+                    break
+                group_counts[index] += 1
+                if index:
+                    elapsed = step_time - step_times[index - 1]
+                    group_durations[index].append(elapsed.total_seconds())
+
+        overall_durations = [
+            [seconds for group in durations.values() for seconds in group[index]]
+            for index in range(len(steps))
+        ]
+        overall = _stats(
+            [
+                sum(group[index] for group in counts.values())
+                for index in range(len(steps))
+            ],
+            overall_durations,
+        )
+        if breakdown is None:
+            return overall, {}
+        return overall, {dim: _stats(counts[dim], durations[dim]) for dim in counts}
+
+    def _funnel_journeys(
+        self,
+        steps: Sequence[str],
+        start_date: datetime,
+        end_date: datetime,
+        breakdown: Optional[str],
+        entity: str,
+    ) -> Subquery:
+        """Build a subquery with one row per entity and its step times t1..tN.
+
+        Each step time is a windowed MIN over the entity's events, layered
+        so that step N only considers events at or after step N-1.
+        """
+        entity_column = getattr(FunnelEvent, entity)
+        step_number = case(
+            {event_type: index for index, event_type in enumerate(steps, 1)},
+            value=FunnelEvent.event_type,
+        )
+        dim_column = getattr(FunnelEvent, breakdown) if breakdown else None
+        first_step_first = case((step_number == 1, 0), else_=1)
+
+        events = (
+            select(
+                entity_column.label("entity_id"),
+                FunnelEvent.created_at.label("ts"),
+                step_number.label("step"),
+                (
+                    func.first_value(dim_column).over(
+                        partition_by=entity_column,
+                        order_by=(first_step_first, FunnelEvent.created_at),
+                    )
+                    if dim_column is not None
+                    else null()
+                ).label("dim"),
+            )
+            .where(
+                FunnelEvent.event_type.in_(steps),
+                FunnelEvent.created_at >= start_date,
+                FunnelEvent.created_at < end_date,
+                entity_column.isnot(None),
+            )
+            .subquery("funnel_events_0")
+        )
+
+        layer = events
+        previous: Optional[ColumnElement] = None
+        for index in range(1, len(steps) + 1):
+            reached = layer.c.step == index
+            if previous is not None:
+                reached = and_(reached, layer.c.ts >= previous)
+            layer = select(
+                layer,
+                func.min(case((reached, layer.c.ts)))
+                .over(partition_by=layer.c.entity_id)
+                .label(f"t{index}"),
+            ).subquery(f"funnel_events_{index}")
+            previous = layer.c[f"t{index}"]
+
+        times = [
+            func.min(layer.c[f"t{index}"]).label(f"t{index}")
+            for index in range(1, len(steps) + 1)
+        ]
+        return (
+            select(layer.c.entity_id, func.min(layer.c.dim).label("dim"), *times)
+            .where(layer.c.t1.isnot(None))
+            .group_by(layer.c.entity_id)
+            .subquery("funnel_journeys")
+        )
+
+
+def _empty_stats(steps: Sequence[str]) -> List[dict]:
+    return [{"count": 0, "median": None, "p90": None} for _ in steps]
+
+
+def _stats(counts: List[int], durations: List[List[float]]) -> List[dict]:
+    return [
+        {
+            "count": count,
+            "median": _percentile(seconds, 0.5),
+            "p90": _percentile(seconds, 0.9),
+        }
+        for count, seconds in zip(counts, durations)
+    ]
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile, matching percentile_cont."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _funnel_report(
+    steps: Sequence[str],
+    start_date: datetime,
+    end_date: datetime,
+    breakdown: Optional[str],
+    aggregated: Tuple[List[dict], Dict[Optional[str], List[dict]]],
+) -> Dict:
+    """Turn aggregated step stats into the funnel response format."""
+    overall, groups = aggregated
+    report = {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "steps": _funnel_steps(steps, overall),
+        "breakdown": None,
+    }
+    if breakdown is not None:
+        report["breakdown"] = {
+            "dimension": breakdown,
+            "values": {
+                value: _funnel_steps(steps, stats) for value, stats in groups.items()
+            },
+        }
+    return report
+
+
+def _funnel_steps(steps: Sequence[str], stats: List[dict]) -> List[dict]:
+    first = stats[0]["count"]
+    rows = []
+    for index, event_type in enumerate(steps):
+        count = stats[index]["count"]
+        previous = stats[index - 1]["count"] if index else count
+        rows.append(
+            {
+                "event_type": event_type,
+                "count": count,
+                "conversion_rate": (
+                    round(count / previous * 100, 2) if previous else 0
+                ),
+                "overall_conversion_rate": (
+                    round(count / first * 100, 2) if first else 0
+                ),
+                "median_seconds": stats[index]["median"],
+                "p90_seconds": stats[index]["p90"],
+            },
+        )
+    return rows
@@ -0,0 +1,451 @@
+"""Opt-in per-method instrumentation of repositories.
+
+``enable_instrumentation()`` wraps every public async method of
+``BaseRepository`` and its subclasses (including ones defined later) and
+records, per call, the latency, the SQL statements issued, the rows
+returned and the time spent waiting for a pooled connection::
+
+    registry = enable_instrumentation(slow_query_seconds=0.5)
+    ...
+    body = registry.prometheus_text()  # for a /metrics endpoint
+
+Until it is called (and after ``disable_instrumentation()``) the methods
+are the original functions and no engine events are registered, so the
+disabled cost is zero. Calls are attributed to the concrete repository,
+e.g. ``LeadRepository.get_by_id``; a method called by another method
+counts towards both.
+"""
+
+import functools
+import inspect
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+from shared.repositories.pagination import CursorPage
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_ORIGINAL_ATTR = "_instrumented_original"
+_STARTED_ATTR = "_instrumentation_started"
+
+_active_calls: ContextVar[Tuple["MethodCall", ...]] = ContextVar(
+    "active_repository_calls",
+    default=(),
+)
+
+
+@dataclass
+class MethodCall:
+    """Measurements of one repository method call."""
+
+    repository: str
+    method: str
+    seconds: float = 0.0
+    statements: int = 0
+    rows: int = 0
+    pool_wait_seconds: float = 0.0
+    error: bool = False
+
+
+@dataclass
+class SlowQuery:
+    """A statement that ran longer than the slow-query threshold."""
+
+    repository: str
+    method: str
+    statement: str
+    # Parameter names (or positions) and value types, never the values
+    parameters: Any
+    seconds: float
+    explain: Optional[str] = None
+
+
+@dataclass
+class MethodStats:
+    """Running totals of one repository method."""
+
+    buckets: List[int]
+    calls: int = 0
+    errors: int = 0
+    seconds_total: float = 0.0
+    statements_total: int = 0
+    rows_total: int = 0
+    pool_wait_seconds_total: float = 0.0
+
+
+class MetricsSink:
+    """Receives the measurements of instrumented repository calls."""
+
+    def record(self, call: MethodCall) -> None:
+        """Record a finished method call."""
+
+    def record_slow_query(self, query: SlowQuery) -> None:
+        """Record a statement over the slow-query threshold."""
+
+
+class MetricsRegistry(MetricsSink):
+    """In-memory metrics per repository method, with Prometheus text output."""
+
+    def __init__(
+        self,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        max_slow_queries: int = 100,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.stats: Dict[Tuple[str, str], MethodStats] = {}
+        # Most recent slow queries, oldest first
+        self.slow_queries: Deque[SlowQuery] = deque(maxlen=max_slow_queries)
+
+    def record(self, call: MethodCall) -> None:
+        key = (call.repository, call.method)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = MethodStats([0] * len(self.buckets))
+        stats.calls += 1
+        stats.errors += call.error
+        stats.seconds_total += call.seconds
+        stats.statements_total += call.statements
+        stats.rows_total += call.rows
+        stats.pool_wait_seconds_total += call.pool_wait_seconds
+        for index, bound in enumerate(self.buckets):
+            if call.seconds <= bound:
+                stats.buckets[index] += 1
+                break
+
+    def record_slow_query(self, query: SlowQuery) -> None:
+        self.slow_queries.append(query)
+
+    def reset(self) -> None:
+        """Forget all recorded calls and slow queries."""
+        self.stats.clear()
+        self.slow_queries.clear()
+
+    def prometheus_text(self, prefix: str = "repository") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_call_seconds Repository method latency",
+            f"# TYPE {prefix}_call_seconds histogram",
+        ]
+        for (repository, method), stats in sorted(self.stats.items()):
+            labels = f'repository="{repository}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats.buckets):
+                cumulative += count
+                lines.append(
+                    f'{prefix}_call_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}",
+                )
+            lines.append(
+                f'{prefix}_call_seconds_bucket{{{labels},le="+Inf"}} {stats.calls}',
+            )
+            lines.append(f"{prefix}_call_seconds_sum{{{labels}}} {stats.seconds_total}")
+            lines.append(f"{prefix}_call_seconds_count{{{labels}}} {stats.calls}")
+
+        counters = [
+            ("errors_total", "Repository method calls that raised", "errors"),
+            ("statements_total", "SQL statements issued", "statements_total"),
+            ("rows_total", "Rows returned by repository methods", "rows_total"),
+            (
+                "pool_wait_seconds_total",
+                "Time spent waiting for a pooled connection",
+                "pool_wait_seconds_total",
+            ),
+        ]
+        for name, help_text, attribute in counters:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for (repository, method), stats in sorted(self.stats.items()):
+                labels = f'repository="{repository}",method="{method}"'
+                lines.append(
+                    f"{prefix}_{name}{{{labels}}} {getattr(stats, attribute)}",
+                )
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetrySink(MetricsSink):
+    """Forward measurements to OpenTelemetry instruments.
+
+    Example:
+        from opentelemetry import metrics
+        enable_instrumentation(OpenTelemetrySink(metrics.get_meter("primai")))
+    """
+
+    def __init__(self, meter: Any, prefix: str = "repository"):
+        """Create the instruments on ``meter`` (an OpenTelemetry ``Meter``)."""
+        self._duration = meter.create_histogram(
+            f"{prefix}.call.duration",
+            unit="s",
+            description="Repository method latency",
+        )
+        self._statements = meter.create_counter(
+            f"{prefix}.statements",
+            description="SQL statements issued",
+        )
+        self._rows = meter.create_counter(
+            f"{prefix}.rows",
+            description="Rows returned by repository methods",
+        )
+        self._pool_wait = meter.create_counter(
+            f"{prefix}.pool.wait",
+            unit="s",
+            description="Time spent waiting for a pooled connection",
+        )
+        self._slow_queries = meter.create_counter(
+            f"{prefix}.slow_queries",
+            description="Statements over the slow-query threshold",
+        )
+
+    def record(self, call: MethodCall) -> None:
+        attributes = {
+            "repository": call.repository,
+            "method": call.method,
+            "error": call.error,
+        }
+        self._duration.record(call.seconds, attributes)
+        self._statements.add(call.statements, attributes)
+        self._rows.add(call.rows, attributes)
+        self._pool_wait.add(call.pool_wait_seconds, attributes)
+
+    def record_slow_query(self, query: SlowQuery) -> None:
+        self._slow_queries.add(
+            1,
+            {"repository": query.repository, "method": query.method},
+        )
+
+
+@dataclass
+class _Instrumentation:
+    sinks: List[MetricsSink]
+    slow_query_seconds: Optional[float]
+    explain: bool
+    classes: List[type] = field(default_factory=list)
+
+
+_state: Optional[_Instrumentation] = None
+
+
+def enable_instrumentation(
+    *sinks: MetricsSink,
+    slow_query_seconds: Optional[float] = None,
+    explain: bool = False,
+) -> MetricsRegistry:
+    """Start instrumenting repository methods.
+
+    Args:
+        sinks: Where measurements go; a new ``MetricsRegistry`` by default
+        slow_query_seconds: Capture statements running longer than this
+        explain: Also capture ``EXPLAIN (ANALYZE, BUFFERS)`` of slow
+            SELECTs on PostgreSQL; this runs the query a second time
+
+    Returns:
+        The first ``MetricsRegistry`` among the sinks (created if there is
+        none)
+    """
+    global _state
+    from shared.repositories.base_repository import BaseRepository
+
+    disable_instrumentation()
+    registry = next((s for s in sinks if isinstance(s, MetricsRegistry)), None)
+    if registry is None:
+        registry = MetricsRegistry()
+        sinks = (registry, *sinks)
+    _state = _Instrumentation(list(sinks), slow_query_seconds, explain)
+    for cls in _with_subclasses(BaseRepository):
+        instrument_class(cls)
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    return registry
+
+
+def disable_instrumentation() -> None:
+    """Restore the original repository methods and remove engine listeners."""
+    global _state
+    if _state is None:
+        return
+    for cls in _state.classes:
+        for name, value in list(vars(cls).items()):
+            original = getattr(value, _ORIGINAL_ATTR, None)
+            if original is not None:
+                setattr(cls, name, original)
+    event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+    _state = None
+
+
+def instrument_class(cls: type) -> None:
+    """Wrap the public async methods defined on ``cls`` if enabled.
+
+    Called for every ``BaseRepository`` subclass when it is created.
+    """
+    if _state is None or cls in _state.classes:
+        return
+    for name, value in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        setattr(cls, name, _instrumented(name, value))
+    _state.classes.append(cls)
+
+
+def record_pool_wait(seconds: float) -> None:
+    """Attribute time spent obtaining a pooled connection to active calls."""
+    for call in _active_calls.get():
+        call.pool_wait_seconds += seconds
+
+
+def _instrumented(name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(method)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        call = MethodCall(type(self).__name__, name)
+        token = _active_calls.set((*_active_calls.get(), call))
+        started = time.perf_counter()
+        try:
+            result = await method(self, *args, **kwargs)
+            call.rows = _count_rows(result)
+            return result
+        except BaseException:
+            call.error = True
+            raise
+        finally:
+            call.seconds = time.perf_counter() - started
+            _active_calls.reset(token)
+            state = _state
+            if state is not None:
+                for sink in state.sinks:
+                    sink.record(call)
+
+    setattr(wrapper, _ORIGINAL_ATTR, method)
+    return wrapper
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    calls = _active_calls.get()
+    if not calls:
+        return
+    for call in calls:
+        call.statements += 1
+    if context is not None:
+        setattr(context, _STARTED_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    state = _state
+    started = getattr(context, _STARTED_ATTR, None)
+    if state is None or state.slow_query_seconds is None or started is None:
+        return
+    seconds = time.perf_counter() - started
+    if seconds < state.slow_query_seconds:
+        return
+
+    call = _active_calls.get()[-1]
+    query = SlowQuery(
+        call.repository,
+        call.method,
+        statement,
+        _parameter_shape(parameters, executemany),
+        seconds,
+    )
+    if state.explain and _explainable(conn, statement, context):
+        query.explain = _explain(conn, statement, parameters)
+    logger.warning(
+        "Slow query in %s.%s (%.0f ms): %s",
+        query.repository,
+        query.method,
+        seconds * 1000,
+        statement,
+    )
+    for sink in state.sinks:
+        sink.record_slow_query(query)
+
+
+def _explainable(
+    conn: Connection,
+    statement: str,
+    context: Optional[ExecutionContext],
+) -> bool:
+    # ANALYZE executes the statement, so only plain SELECTs qualify; a
+    # server-side cursor still being read must not be interleaved with
+    if conn.dialect.name != "postgresql" or context is None:
+        return False
+    if context.execution_options.get("stream_results"):
+        return False
+    return statement.lstrip().upper().startswith("SELECT")
+
+
+def _explain(conn: Connection, statement: str, parameters: Any) -> Optional[str]:
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except Exception:
+        logger.exception("EXPLAIN of a slow query failed")
+        return None
+    finally:
+        cursor.close()
+
+
+def _parameter_shape(parameters: Any, executemany: bool) -> Any:
+    if executemany and parameters:
+        return {"rows": len(parameters), "each": _parameter_shape(parameters[0], False)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _count_rows(result: Any) -> int:
+    """Rows in a repository method's return value."""
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, int):
+        # Affected row counts of bulk writes
+        return result
+    if isinstance(result, CursorPage):
+        return len(result.items)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        # (items, total) of paginated listings
+        return len(result[0])
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def _with_subclasses(cls: Type[Any]) -> Iterable[Type[Any]]:
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _with_subclasses(subclass)
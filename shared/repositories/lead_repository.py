@@ -1,11 +1,37 @@
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Select, bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models.lead import Lead
-from shared.repositories.base_repository import BaseRepository
+from shared.repositories.base_repository import STREAM_BATCH_SIZE, BaseRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.pagination import CursorPage
+from shared.repositories.projection import ReadModel
+from shared.repositories.search import search_condition, search_rank
+
+# Columns returned by the lead list endpoints
+_LIST_COLUMNS = (
+    Lead.id,
+    Lead.email,
+    Lead.first_name,
+    Lead.last_name,
+    Lead.phone,
+    Lead.locale,
+    Lead.consent,
+    Lead.source,
+    Lead.session_id,
+    Lead.summary_html,
+    Lead.summary_text,
+    Lead.annual_switch,
+    Lead.created_at,
+    Lead.updated_at,
+)
+
+# Hot lookups are built once, so SQLAlchemy neither rebuilds the statement
+# nor recomputes its cache key per call; only the bound values change
+_BY_EMAIL = select(Lead).where(Lead.email == bindparam("email"))
 
 
 class LeadRepository(BaseRepository[Lead]):
@@ -16,9 +42,7 @@ class LeadRepository(BaseRepository[Lead]):
 
     async def get_by_email(self, email: str) -> Optional[Lead]:
         """Get lead by email."""
-        result = await self.db.execute(
-            select(Lead).where(Lead.email == email),
-        )
+        result = await self.db.execute(_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
     async def get_consented_leads(self) -> List[Lead]:
@@ -28,6 +52,26 @@ class LeadRepository(BaseRepository[Lead]):
         )
         return list(result.scalars().all())
 
+    def stream_consented_leads(
+        self,
+        after: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[Lead]]:
+        """Stream leads who have given consent, oldest first, in batches.
+
+        Args:
+            after: Resume token from a previous export
+            batch_size: Leads per batch
+
+        Yields:
+            Lists of leads
+        """
+        return self.stream_where(
+            Lead.consent == True,  # noqa: E712
+            after=after,
+            batch_size=batch_size,
+        )
+
     async def get_leads_with_filters(
         self,
         page: int = 1,
@@ -36,9 +80,14 @@ class LeadRepository(BaseRepository[Lead]):
         session_id: Optional[str] = None,
         created_from: Optional[str] = None,
         created_to: Optional[str] = None,
-    ) -> Tuple[List[Lead], int]:
+        count_strategy: Optional[CountStrategy] = None,
+        rank_by_relevance: bool = False,
+    ) -> Tuple[List[ReadModel], int]:
         """Get paginated leads with filters.
 
+        Leads are returned as read-only ``LeadRow`` objects holding the
+        listed columns only.
+
         Args:
             page: Page number (1-indexed)
             limit: Items per page
@@ -46,41 +95,93 @@ class LeadRepository(BaseRepository[Lead]):
             session_id: Filter by session_id
             created_from: Filter by created_at >= this date
             created_to: Filter by created_at <= this date
+            count_strategy: How to compute the total (exact by default)
+            rank_by_relevance: Order search results by match quality first
 
         Returns:
             Tuple of (leads list, total count)
         """
-        # Build base query with selected fields only
-        query = select(
-            Lead.id,
-            Lead.email,
-            Lead.first_name,
-            Lead.last_name,
-            Lead.phone,
-            Lead.locale,
-            Lead.consent,
-            Lead.source,
-            Lead.session_id,
-            Lead.summary_html,
-            Lead.summary_text,
-            Lead.annual_switch,
-            Lead.created_at,
+        query, count_query = self._build_filtered_query(
+            search=search,
+            session_id=session_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+
+        # Get total count
+        total = await self._count(count_query, count_strategy)
+
+        # Apply pagination and sorting
+        skip = (page - 1) * limit
+        if search and rank_by_relevance:
+            rank = search_rank(Lead, search, self.dialect_name)
+            if rank is not None:
+                query = query.order_by(rank)
+        query = query.order_by(Lead.updated_at.desc()).offset(skip).limit(limit)
+
+        result = await self.db.execute(query)
+        leads = self.projection(*_LIST_COLUMNS).all(result)
+
+        return leads, total
+
+    async def get_leads_with_filters_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+        search: Optional[str] = None,
+        session_id: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+    ) -> CursorPage[ReadModel]:
+        """Get leads with filters using keyset pagination on (updated_at, id).
+
+        Leads are returned as read-only ``LeadRow`` objects, as in
+        ``get_leads_with_filters``.
+
+        Args:
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+            search: Search term for email (contains), first name, last name, or phone
+            session_id: Filter by session_id
+            created_from: Filter by created_at >= this date
+            created_to: Filter by created_at <= this date
+
+        Returns:
+            CursorPage with leads and next/prev cursors
+        """
+        query, _ = self._build_filtered_query(
+            search=search,
+            session_id=session_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return await self._paginate_by_cursor(
+            query,
             Lead.updated_at,
+            cursor=cursor,
+            limit=limit,
+            transform=self.projection(*_LIST_COLUMNS),
         )
 
+    def _build_filtered_query(
+        self,
+        search: Optional[str] = None,
+        session_id: Optional[str] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+    ) -> Tuple[Select, Select]:
+        """Build the filtered lead list query and its count query."""
+        # Build base query with selected fields only
+        query = select(*_LIST_COLUMNS)
+        count_query = select(func.count()).select_from(Lead)
+
         # Apply filters
         conditions = []
 
         if search:
-            # Search in email, first name, last name, or phone (all case-insensitive contains)
-            conditions.append(
-                or_(
-                    Lead.email.ilike(f"%{search}%"),
-                    Lead.first_name.ilike(f"%{search}%"),
-                    Lead.last_name.ilike(f"%{search}%"),
-                    Lead.phone.ilike(f"%{search}%"),
-                ),
-            )
+            # Search in email, first name, last name, or phone (all case-insensitive
+            # contains) through the indexed search_text column
+            conditions.append(search_condition(Lead, search, self.dialect_name))
 
         if session_id:
             conditions.append(Lead.session_id == session_id)
@@ -107,19 +208,6 @@ class LeadRepository(BaseRepository[Lead]):
 
         if conditions:
             query = query.where(*conditions)
-
-        # Get total count
-        count_query = select(func.count()).select_from(Lead)
-        if conditions:
             count_query = count_query.where(*conditions)
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
 
-        # Apply pagination and sorting
-        skip = (page - 1) * limit
-        query = query.order_by(Lead.updated_at.desc()).offset(skip).limit(limit)
-
-        result = await self.db.execute(query)
-        leads = [Lead(**dict(row._mapping)) for row in result]
-
-        return leads, total
+        return query, count_query
@@ -0,0 +1,181 @@
+"""Guards against accidental lazy loading (N+1 queries).
+
+Strict loading makes every relationship that a query did not load eagerly
+raise on access instead of emitting a lazy SELECT, for all sessions or for
+one::
+
+    enable_strict_loading()           # process-wide, e.g. in tests
+    enable_strict_loading(db)         # a single session
+
+Repository methods that hand out related objects declare the loads they
+need (``selectinload`` and friends), and the generic ones accept
+``options`` for the caller to do so, so they keep working in strict mode
+and issue the same number of statements for one row or a thousand.
+Relationships already present in the identity map stay accessible, since
+reading them needs no SQL.
+
+``count_statements()`` counts the statements of a request and flags
+identical SELECTs repeated within it, the signature of an N+1 loop::
+
+    @app.middleware("http")
+    async def n_plus_one_guard(request, call_next):
+        with count_statements() as counter:
+            response = await call_next(request)
+        response.headers["X-DB-Statements"] = str(counter.statements)
+        return response
+"""
+
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+from sqlalchemy.orm.interfaces import ORMOption
+
+logger = logging.getLogger(__name__)
+
+# Times an identical SELECT may run within one counted scope before it is
+# reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+# Loader options passed to repository methods, e.g. selectinload(...)
+LoaderOptions = Sequence[ORMOption]
+
+_STRICT_KEY = "shared.strict_loading"
+
+_strict_default = False
+_active_counters: ContextVar[Tuple["StatementCounter", ...]] = ContextVar(
+    "active_statement_counters",
+    default=(),
+)
+
+# raise_on_sql: many-to-one targets already in the session stay readable
+_RAISE_ON_LAZY_LOAD = raiseload("*", sql_only=True)
+
+
+class NPlusOneError(RuntimeError):
+    """A counted scope repeated an identical SELECT too many times."""
+
+
+@dataclass
+class StatementCounter:
+    """Statements executed within a ``count_statements()`` scope."""
+
+    threshold: int = N_PLUS_ONE_THRESHOLD
+    statements: int = 0
+    # SELECT text -> executions
+    selects: Counter = field(default_factory=Counter)
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """SELECTs run at least ``threshold`` times, most frequent first."""
+        return [
+            (statement, count)
+            for statement, count in self.selects.most_common()
+            if count >= self.threshold
+        ]
+
+
+def enable_strict_loading(db: Union[AsyncSession, Session, None] = None) -> None:
+    """Make lazy loads that would emit SQL raise ``InvalidRequestError``.
+
+    Args:
+        db: Session to make strict; all sessions without an explicit
+            setting when omitted
+    """
+    _set_strict(db, True)
+
+
+def disable_strict_loading(db: Union[AsyncSession, Session, None] = None) -> None:
+    """Allow lazy loads again, for one session or by default."""
+    _set_strict(db, False)
+
+
+def is_strict_loading(db: Union[AsyncSession, Session]) -> bool:
+    """Check whether lazy loads raise on this session."""
+    return _sync_session(db).info.get(_STRICT_KEY, _strict_default)
+
+
+@contextmanager
+def count_statements(
+    threshold: int = N_PLUS_ONE_THRESHOLD,
+    raise_on_n_plus_one: bool = False,
+) -> Iterator[StatementCounter]:
+    """Count the statements executed by the enclosed code.
+
+    Scopes nest; a statement counts towards every enclosing scope. On exit
+    each SELECT repeated ``threshold`` times or more is logged as a
+    warning.
+
+    Args:
+        threshold: Repetitions of one SELECT that count as an N+1
+        raise_on_n_plus_one: Raise ``NPlusOneError`` instead of only
+            logging (unless the enclosed code raised)
+
+    Yields:
+        The counter, updated as statements run
+    """
+    if not event.contains(Engine, "before_cursor_execute", _count_statement):
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    counter = StatementCounter(threshold)
+    token = _active_counters.set((*_active_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+    repeated = counter.repeated()
+    for statement, count in repeated:
+        logger.warning("Possible N+1: %d executions of %s", count, statement)
+    if repeated and raise_on_n_plus_one:
+        statement, count = repeated[0]
+        raise NPlusOneError(f"{count} executions of {statement}")
+
+
+def _set_strict(db: Union[AsyncSession, Session, None], enabled: bool) -> None:
+    global _strict_default
+    if db is None:
+        _strict_default = enabled
+    else:
+        _sync_session(db).info[_STRICT_KEY] = enabled
+
+
+def _sync_session(db: Union[AsyncSession, Session]) -> Session:
+    return db.sync_session if isinstance(db, AsyncSession) else db
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _raise_on_lazy_load(state: ORMExecuteState) -> None:
+    # Relationship loads are included, so the objects an eager load brings
+    # in are strict as well
+    if (
+        state.is_select
+        and not state.is_column_load
+        and state.session.info.get(_STRICT_KEY, _strict_default)
+    ):
+        state.statement = state.statement.options(_RAISE_ON_LAZY_LOAD)
+
+
+def _count_statement(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    counters = _active_counters.get()
+    if not counters:
+        return
+    compiled = getattr(context, "compiled", None)
+    is_select = compiled is not None and compiled.statement.is_select
+    for counter in counters:
+        counter.statements += 1
+        if is_select:
+            counter.selects[statement] += 1
@@ -0,0 +1,89 @@
+"""Keyset (cursor) pagination helpers shared by repositories."""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import ColumnElement, DateTime, String, func, literal, type_coerce
+
+ItemType = TypeVar("ItemType")
+
+CURSOR_NEXT = "n"
+CURSOR_PREV = "p"
+
+# Length of a DateTime stored by SQLAlchemy on SQLite, with microseconds
+_SQLITE_DATETIME_LENGTH = len("2024-01-01 00:00:00.000000")
+
+
+@dataclass
+class CursorPage(Generic[ItemType]):
+    """One page of a keyset-paginated listing.
+
+    ``next_cursor`` / ``prev_cursor`` are opaque tokens to pass back as
+    ``cursor`` to fetch the neighbouring page; ``None`` means there is no
+    page in that direction.
+    """
+
+    items: List[ItemType] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(sort_value: Any, id: str, direction: str = CURSOR_NEXT) -> str:
+    """Encode a ``(sort_key, id)`` position into an opaque cursor token."""
+    if isinstance(sort_value, datetime):
+        value = {"dt": sort_value.isoformat()}
+    else:
+        value = {"v": sort_value}
+    payload = json.dumps(
+        {"k": value, "i": id, "d": direction},
+        separators=(",", ":"),
+    ).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str, str]:
+    """Decode a cursor token into ``(sort_value, id, direction)``.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["k"]
+        sort_value = (
+            datetime.fromisoformat(value["dt"]) if "dt" in value else value["v"]
+        )
+        id = payload["i"]
+        direction = payload["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+    if direction not in (CURSOR_NEXT, CURSOR_PREV) or not isinstance(id, str):
+        raise ValueError("Invalid pagination cursor")
+    return sort_value, id, direction
+
+
+def seek_key(column: Any, dialect_name: str) -> ColumnElement:
+    """``column`` as compared and ordered by a keyset seek.
+
+    SQLite stores DateTime values as text: server defaults
+    (``CURRENT_TIMESTAMP``) as ``YYYY-MM-DD HH:MM:SS`` and values bound by
+    SQLAlchemy, cursor positions included, with ``.ffffff`` microseconds.
+    Text comparison of the two forms is not chronological, so there the
+    key pads every value to the longer form. Other columns and dialects
+    are returned unchanged.
+    """
+    if dialect_name == "sqlite" and isinstance(column.type, DateTime):
+        padded = type_coerce(column, String) + ".000000"
+        return func.substr(padded, 1, _SQLITE_DATETIME_LENGTH)
+    return column
+
+
+def seek_bound(column: Any, value: Any, dialect_name: str) -> ColumnElement:
+    """A cursor's ``value`` bound as ``column``'s type, in ``seek_key`` form."""
+    return seek_key(literal(value, column.type), dialect_name)
@@ -0,0 +1,132 @@
+"""Repository base for tables partitioned by month on ``created_at``."""
+
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import Select, text
+
+from shared.models.partitioning import (
+    MONTHS_AHEAD,
+    add_months,
+    create_partition_sql,
+    partition_name,
+    upcoming_months,
+)
+from shared.repositories.base_repository import BaseRepository, ModelType
+
+_MONTH_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+class MonthlyPartitionedRepository(BaseRepository[ModelType]):
+    """Base repository adding partition maintenance for partitioned models.
+
+    Queries that bound ``created_at`` with plain range comparisons (as the
+    ``since`` arguments of subclasses do) let PostgreSQL skip partitions
+    outside the range. Maintenance methods are no-ops on other dialects.
+    """
+
+    def _created_since(self, query: Select, since: Optional[datetime]) -> Select:
+        """Restrict ``query`` to rows created at or after ``since``."""
+        if since is None:
+            return query
+        return query.where(self.model.created_at >= since)
+
+    async def list_partitions(self) -> List[Tuple[str, Optional[date]]]:
+        """List the table's partitions.
+
+        Returns:
+            Tuples of (partition name, first day of its month), oldest first;
+            the month is None for the default partition
+        """
+        if self.dialect_name != "postgresql":
+            return []
+
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:table AS regclass)",
+            ),
+            {"table": self.model.__tablename__},
+        )
+        partitions = []
+        for (name,) in result.all():
+            match = _MONTH_SUFFIX.search(name)
+            month = date(int(match[1]), int(match[2]), 1) if match else None
+            partitions.append((name, month))
+        partitions.sort(key=lambda partition: partition[1] or date.max)
+        return partitions
+
+    async def create_upcoming_partitions(
+        self,
+        months_ahead: int = MONTHS_AHEAD,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """Create the partitions for the current and next months.
+
+        Run this regularly (e.g. daily) so that rows never land in the
+        default partition; a month cannot be attached while the default
+        partition holds rows for it.
+
+        Args:
+            months_ahead: Number of months after the current one to cover
+            today: Reference date (defaults to today in UTC)
+
+        Returns:
+            Names of the partitions that were created
+        """
+        if self.dialect_name != "postgresql":
+            return []
+
+        existing = {month for _, month in await self.list_partitions()}
+        table_name = self.model.__tablename__
+        connection = await self.db.connection()
+        created = []
+        for month in upcoming_months(months_ahead, today):
+            if month in existing:
+                continue
+            await connection.exec_driver_sql(create_partition_sql(table_name, month))
+            created.append(partition_name(table_name, month))
+        await self._commit()
+        return created
+
+    async def detach_partitions_before(
+        self,
+        before: Union[date, datetime],
+        drop: bool = False,
+    ) -> List[str]:
+        """Detach every monthly partition that ends on or before ``before``.
+
+        Detaching is a catalog change, so whole months leave the table
+        instantly instead of being deleted and vacuumed row by row. The
+        detached tables can be archived (e.g. with ``pg_dump``) or dropped.
+        Denormalized counters such as ``ChatSession.message_count`` are not
+        adjusted; run ``ChatSessionRepository.reconcile_counters`` after.
+
+        Args:
+            before: Cut-off; only months entirely before it are detached
+            drop: Drop the detached tables as well
+
+        Returns:
+            Names of the detached partitions
+        """
+        if self.dialect_name != "postgresql":
+            return []
+
+        if isinstance(before, datetime):
+            before = before.date()
+        table_name = self.model.__tablename__
+        connection = await self.db.connection()
+        detached = []
+        for name, month in await self.list_partitions():
+            if month is None or add_months(month, 1) > before:
+                continue
+            await connection.exec_driver_sql(
+                f'ALTER TABLE "{table_name}" DETACH PARTITION "{name}"',
+            )
+            if drop:
+                await connection.exec_driver_sql(f'DROP TABLE "{name}"')
+            detached.append(name)
+        await self._commit()
+        return detached
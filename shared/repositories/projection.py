@@ -0,0 +1,181 @@
+"""Immutable, ``__slots__``-based read models for column projections.
+
+List endpoints select a subset of a model's columns. Building ORM
+instances from those rows pays for attribute instrumentation and
+identity state on objects that are never persisted, and the result looks
+like an entity that could lazy-load or be flushed. ``Projection`` instead
+builds one small read-only class per (model, columns) pair and fills it
+straight from the row tuples.
+"""
+
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from sqlalchemy import Row, Select, inspect, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from shared.models.base import BaseModel
+from shared.models.serialization import ModelSerializer, serializer_for
+
+ColumnLike = Union[InstrumentedAttribute, str]
+
+_ROW_MODELS: Dict[Tuple[Type[BaseModel], Tuple[str, ...]], Type["ReadModel"]] = {}
+
+
+class ReadModel:
+    """Base class of the read models generated by ``Projection``.
+
+    Instances hold exactly the projected fields, as slots. They cannot be
+    modified, hold no session state and never lazy-load.
+    """
+
+    __slots__ = ()
+
+    _model: ClassVar[Type[BaseModel]]
+    _fields: ClassVar[Tuple[str, ...]] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        if "id" in self._fields:
+            return hash((type(self), getattr(self, "id")))
+        return hash((type(self), self._values()))
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self._fields
+        )
+        return f"{type(self).__name__}({values})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the row to a dictionary."""
+        return {field: getattr(self, field) for field in self._fields}
+
+
+class Projection:
+    """A fixed set of a model's columns and the read model for its rows.
+
+    Example:
+        summary = Projection(Lead, Lead.id, Lead.email, Lead.created_at)
+        result = await db.execute(summary.select().where(Lead.consent == True))
+        leads = summary.all(result)  # [LeadRow(id=..., email=..., ...)]
+    """
+
+    def __init__(self, model: Type[BaseModel], *columns: ColumnLike):
+        """Create a projection.
+
+        Args:
+            model: Model the columns belong to
+            columns: Mapped attributes (``Lead.email``) or their names
+        """
+        if not columns:
+            raise ValueError("A projection needs at least one column")
+        keys = tuple(
+            column if isinstance(column, str) else column.key for column in columns
+        )
+        self.model = model
+        self.row_model = read_model(model, keys)
+        self.columns = tuple(getattr(model, key) for key in keys)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return self.row_model._fields
+
+    @property
+    def serializer(self) -> ModelSerializer:
+        """Serializer of the projected fields, e.g. for ``dumps_many(rows)``."""
+        return serializer_for(self.model, include=self.fields)
+
+    def select(self) -> Select:
+        """Select the projected columns, in field order."""
+        return select(*self.columns)
+
+    def from_row(self, row: Union[Row, Tuple[Any, ...]]) -> ReadModel:
+        """Build a read model from a row of ``select()``."""
+        return self.row_model(*row)
+
+    __call__ = from_row
+
+    def all(self, rows: Iterable[Union[Row, Tuple[Any, ...]]]) -> List[ReadModel]:
+        """Build read models from every row of a result."""
+        row_model = self.row_model
+        return [row_model(*row) for row in rows]
+
+
+def read_model(model: Type[BaseModel], fields: Iterable[str]) -> Type[ReadModel]:
+    """Get (or generate) the read model class for ``fields`` of ``model``.
+
+    Classes are cached, so every projection of the same columns shares one
+    class. Fields are annotated with the columns' Python types.
+    """
+    fields = tuple(fields)
+    key = (model, fields)
+    row_model = _ROW_MODELS.get(key)
+    if row_model is None:
+        row_model = _ROW_MODELS.setdefault(key, _build_read_model(model, fields))
+    return row_model
+
+
+def _build_read_model(
+    model: Type[BaseModel],
+    fields: Tuple[str, ...],
+) -> Type[ReadModel]:
+    if len(set(fields)) != len(fields):
+        raise ValueError(f"Duplicate fields in projection: {fields}")
+    columns = inspect(model).columns
+    annotations = {}
+    for field in fields:
+        if field.startswith("_") or hasattr(ReadModel, field):
+            raise ValueError(f"{field!r} cannot be used as a read model field")
+        if field not in columns:
+            raise ValueError(f"{model.__name__} has no column {field!r}")
+        annotations[field] = _python_type(columns[field])
+
+    row_model = type(
+        f"{model.__name__}Row",
+        (ReadModel,),
+        {
+            "__slots__": fields,
+            "__annotations__": annotations,
+            "__module__": __name__,
+            "_model": model,
+            "_fields": fields,
+        },
+    )
+    row_model.__init__ = _make_init(row_model, fields)
+    return row_model
+
+
+def _make_init(row_model: Type[ReadModel], fields: Tuple[str, ...]) -> Any:
+    """Generate ``__init__(self, <fields>)`` assigning the slots directly.
+
+    Calling each slot descriptor's ``__set__`` bypasses the read-only
+    ``__setattr__`` without the overhead of ``object.__setattr__``.
+    """
+    setters = {f"_set_{field}": getattr(row_model, field).__set__ for field in fields}
+    lines = [f"def __init__(self, {', '.join(fields)}):"]
+    lines.extend(f"    _set_{field}(self, {field})" for field in fields)
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), setters, namespace)
+    init = namespace["__init__"]
+    init.__qualname__ = f"{row_model.__name__}.__init__"
+    return init
+
+
+def _python_type(column: Any) -> Any:
+    try:
+        python_type: Any = column.type.python_type
+    except NotImplementedError:
+        python_type = Any
+    return Optional[python_type] if column.nullable else python_type
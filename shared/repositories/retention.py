@@ -0,0 +1,166 @@
+"""Batched, rate-limited purging (and optional archival) of old chat sessions."""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List, Optional, Union
+
+from sqlalchemy import ColumnElement, Row, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.models.chat_session import ChatSession
+from shared.repositories.chat_session_repository import ChatSessionRepository
+from shared.repositories.pagination import (
+    decode_cursor,
+    encode_cursor,
+    seek_bound,
+    seek_key,
+)
+
+# Sessions deleted per transaction by retention runs
+RETENTION_BATCH_SIZE = 200
+
+
+@dataclass
+class RetentionProgress:
+    """Running totals of a retention run."""
+
+    sessions: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    resume_token: Optional[str] = None
+    finished: bool = False
+
+
+class SessionRetention:
+    """Delete chat sessions created before a cut-off, a small batch at a time.
+
+    Each batch selects the oldest matching sessions in ``(created_at, id)``
+    order, optionally hands them to ``archive``, and deletes them with one
+    ``DELETE ... WHERE id IN (...)``. Messages, tool executions and
+    documents go with them through the database ``ON DELETE CASCADE``
+    rules, so no child collections are loaded. Each batch is its own
+    transaction, followed by a pause that bounds lock time and lets
+    replicas catch up.
+
+    Example:
+        retention = SessionRetention(db, max_age=timedelta(days=365))
+        progress = await retention.run(
+            after=saved_token,
+            on_progress=lambda p: save_token(p.resume_token),
+        )
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_age: Optional[timedelta] = None,
+        before: Optional[datetime] = None,
+        where: Optional[ColumnElement[bool]] = None,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        pause: float = 0.5,
+        archive: Optional[Callable[[List[ChatSession]], Any]] = None,
+    ):
+        """Configure a retention run.
+
+        Args:
+            db: Database session
+            max_age: Delete sessions created longer ago than this
+            before: Delete sessions created before this time (instead of
+                ``max_age``)
+            where: Additional filter, e.g. ``ChatSession.email == email``
+                for an erasure request
+            batch_size: Sessions deleted per transaction
+            pause: Seconds to sleep between batches
+            archive: Called (and awaited if async) with each batch of
+                sessions before it is deleted, e.g. ``exporter.write_batch``
+        """
+        if max_age is None and before is None and where is None:
+            raise ValueError("Provide max_age, before or where")
+        if before is None and max_age is not None:
+            before = datetime.now(timezone.utc) - max_age
+        self.db = db
+        self.before = before
+        self.where = where
+        self.batch_size = batch_size
+        self.pause = pause
+        self.archive = archive
+        self.sessions = ChatSessionRepository(db)
+
+    async def run(
+        self,
+        after: Optional[str] = None,
+        on_progress: Optional[Callable[[RetentionProgress], Any]] = None,
+        max_batches: Optional[int] = None,
+    ) -> RetentionProgress:
+        """Process batches until no matching session is left.
+
+        Args:
+            after: Resume token of an interrupted run
+            on_progress: Called with the totals after every batch
+            max_batches: Stop after this many batches (e.g. per maintenance
+                window); ``finished`` is False if sessions remain
+
+        Returns:
+            RetentionProgress with totals and the last resume token
+        """
+        progress = RetentionProgress(resume_token=after)
+        started = time.monotonic()
+        while max_batches is None or progress.batches < max_batches:
+            batch = await self._next_batch(progress.resume_token)
+            if not batch:
+                progress.finished = True
+                break
+
+            if self.archive is not None:
+                archived = self.archive(batch)
+                if inspect.isawaitable(archived):
+                    await archived
+            last = batch[-1]
+            progress.resume_token = encode_cursor(last.created_at, last.id)
+            progress.sessions += await self.sessions.delete_where(
+                ChatSession.id.in_([session.id for session in batch]),
+            )
+            progress.batches += 1
+            progress.elapsed_seconds = time.monotonic() - started
+            if on_progress is not None:
+                on_progress(progress)
+
+            if len(batch) < self.batch_size:
+                progress.finished = True
+                break
+            await asyncio.sleep(self.pause)
+
+        progress.elapsed_seconds = time.monotonic() - started
+        return progress
+
+    async def _next_batch(
+        self,
+        after: Optional[str],
+    ) -> List[Union[ChatSession, Row]]:
+        query = select(ChatSession)
+        if self.archive is None:
+            # Only the keys are needed to delete
+            query = select(ChatSession.id, ChatSession.created_at)
+        if self.before is not None:
+            query = query.where(ChatSession.created_at < self.before)
+        if self.where is not None:
+            query = query.where(self.where)
+        dialect_name = self.sessions.dialect_name
+        created_at_key = seek_key(ChatSession.created_at, dialect_name)
+        if after is not None:
+            created_at, id, _ = decode_cursor(after)
+            # Rows before the token were handled by the interrupted run
+            bound = seek_bound(ChatSession.created_at, created_at, dialect_name)
+            query = query.where(
+                tuple_(created_at_key, ChatSession.id) > tuple_(bound, id),
+            )
+        query = query.order_by(created_at_key, ChatSession.id).limit(
+            self.batch_size,
+        )
+        result = await self.db.execute(query)
+        if self.archive is None:
+            return list(result.all())
+        return list(result.scalars().all())
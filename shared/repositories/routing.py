@@ -0,0 +1,263 @@
+"""Read-replica routing for repository sessions.
+
+Sessions from ``ReplicaRouter.sessionmaker()`` send plain SELECTs to a
+healthy replica and everything else to the primary::
+
+    router = ReplicaRouter(primary_engine, [replica_engine])
+    Session = router.sessionmaker()
+    asyncio.create_task(router.monitor())  # health and lag checks
+
+Reads still go to the primary when:
+
+- a unit of work is open on the session, or the session's transaction has
+  written (flushed or executed INSERT / UPDATE / DELETE)
+- the current request context wrote less than ``sticky_seconds`` ago, so
+  users read their own writes despite replication lag
+- the query is ``SELECT ... FOR UPDATE`` or not a SELECT at all
+- no replica is healthy
+
+``route(PRIMARY)`` / ``route(REPLICA)`` override this for a repository
+method, and ``routed()`` for a block of code. ``REPLICA`` suits heavy
+reads that tolerate a little staleness; it ignores the read-your-writes
+window but never moves reads out of a transaction that has written.
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.sql.dml import UpdateBase
+
+from shared.repositories.unit_of_work import is_unit_of_work_active
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+# Seconds after a write during which the same request context reads from
+# the primary
+STICKY_SECONDS = 2.0
+# Replicas lagging further behind than this many seconds get no reads
+MAX_REPLICA_LAG = 5.0
+
+_ROUTER_KEY = "shared.replica_router"
+_WROTE_KEY = "shared.routing_wrote"
+
+# Per request context: monotonic time of the last write, and the override
+_last_write: ContextVar[Optional[float]] = ContextVar("last_write", default=None)
+_route: ContextVar[Optional[str]] = ContextVar("route", default=None)
+
+AsyncMethod = TypeVar("AsyncMethod", bound=Callable[..., Awaitable[Any]])
+
+# PostgreSQL standby lag; zero when everything received has been replayed,
+# so an idle primary does not look like lag
+_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END",
+)
+
+
+@dataclass
+class ReplicaStatus:
+    """Result of the latest health check of one replica."""
+
+    healthy: bool = True
+    lag_seconds: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: Optional[float] = None
+
+
+class ReplicaRouter:
+    """Primary and replica engines, replica health, and routing policy."""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        sticky_seconds: float = STICKY_SECONDS,
+        max_lag: float = MAX_REPLICA_LAG,
+        check_timeout: float = 2.0,
+    ):
+        """Create a router.
+
+        Args:
+            primary: Engine for writes and consistent reads
+            replicas: Engines of the read replicas
+            sticky_seconds: Read-your-writes window after a write
+            max_lag: Replication lag (seconds) above which a replica is
+                skipped
+            check_timeout: Seconds a health check may take per replica
+        """
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self.statuses = [ReplicaStatus() for _ in self.replicas]
+        self._next = itertools.count()
+
+    def sessionmaker(self, **kwargs: Any) -> async_sessionmaker[AsyncSession]:
+        """Create a session factory whose sessions route through this router."""
+        kwargs.setdefault("expire_on_commit", False)
+        return async_sessionmaker(
+            self.primary,
+            sync_session_class=RoutingSession,
+            info={_ROUTER_KEY: self},
+            **kwargs,
+        )
+
+    def pick_replica(self) -> Optional[AsyncEngine]:
+        """Next healthy replica in round-robin order, if any."""
+        healthy = [
+            replica
+            for replica, status in zip(self.replicas, self.statuses)
+            if status.healthy
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    async def check(self) -> List[ReplicaStatus]:
+        """Check every replica's connectivity and replication lag.
+
+        Returns:
+            The updated status of each replica, in order
+        """
+        await asyncio.gather(
+            *(
+                self._check(replica, status)
+                for replica, status in zip(self.replicas, self.statuses)
+            ),
+        )
+        return self.statuses
+
+    async def monitor(self, interval: float = 10.0) -> None:
+        """Run ``check`` every ``interval`` seconds until cancelled."""
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    async def _check(self, replica: AsyncEngine, status: ReplicaStatus) -> None:
+        was_healthy = status.healthy
+        try:
+            lag = await asyncio.wait_for(
+                _replication_lag(replica),
+                self.check_timeout,
+            )
+        except Exception as error:
+            status.healthy = False
+            status.lag_seconds = None
+            status.error = str(error) or type(error).__name__
+        else:
+            status.lag_seconds = lag
+            status.healthy = lag <= self.max_lag
+            status.error = None if status.healthy else f"lag {lag:.1f}s"
+        status.checked_at = time.time()
+
+        if was_healthy and not status.healthy:
+            logger.warning(
+                "Replica %s taken out of rotation: %s",
+                replica.url.render_as_string(hide_password=True),
+                status.error,
+            )
+        elif status.healthy and not was_healthy:
+            logger.info(
+                "Replica %s back in rotation",
+                replica.url.render_as_string(hide_password=True),
+            )
+
+
+class RoutingSession(Session):
+    """Session choosing the primary or a replica per statement."""
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        clause: Any = None,
+        **kwargs: Any,
+    ) -> Engine:
+        router: Optional[ReplicaRouter] = self.info.get(_ROUTER_KEY)
+        if router is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[_WROTE_KEY] = True
+            _last_write.set(time.monotonic())
+            return router.primary.sync_engine
+        if not _is_plain_select(clause) or self._must_read_primary(router):
+            return router.primary.sync_engine
+        replica = router.pick_replica()
+        if replica is None:
+            return router.primary.sync_engine
+        return replica.sync_engine
+
+    def _must_read_primary(self, router: ReplicaRouter) -> bool:
+        if self.info.get(_WROTE_KEY) or is_unit_of_work_active(self):
+            return True
+        route = _route.get()
+        if route is not None:
+            return route == PRIMARY
+        last_write = _last_write.get()
+        return (
+            last_write is not None
+            and time.monotonic() - last_write < router.sticky_seconds
+        )
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _forget_writes(session: Session, transaction: SessionTransaction) -> None:
+    # Only the outermost transaction ending makes the writes visible (or
+    # discards them)
+    if transaction.parent is None:
+        session.info.pop(_WROTE_KEY, None)
+
+
+@contextmanager
+def routed(target: str) -> Iterator[None]:
+    """Send the reads of the enclosed code to ``PRIMARY`` or ``REPLICA``."""
+    if target not in (PRIMARY, REPLICA):
+        raise ValueError(f"Unknown route {target!r}")
+    token = _route.set(target)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def route(target: str) -> Callable[[AsyncMethod], AsyncMethod]:
+    """Decorate an async repository method to read from ``target``."""
+
+    def decorator(method: AsyncMethod) -> AsyncMethod:
+        @functools.wraps(method)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with routed(target):
+                return await method(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _is_plain_select(clause: Any) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+async def _replication_lag(engine: AsyncEngine) -> float:
+    async with engine.connect() as connection:
+        if engine.dialect.name != "postgresql":
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+        lag = (await connection.execute(_LAG_SQL)).scalar()
+    return float(lag or 0.0)
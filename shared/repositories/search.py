@@ -0,0 +1,102 @@
+"""Substring search over the normalized ``search_text`` model columns."""
+
+import re
+from typing import Optional, Type
+
+from sqlalchemy import ColumnElement, column, func, literal_column, or_, select, table
+
+from shared.models.base import BaseModel
+from shared.models.search import fts_table_name
+
+_PHONE_TERM = re.compile(r"^\+?[\d\s\-./()]+$")
+# The FTS5 trigram tokenizer only matches terms of at least three characters
+_MIN_FTS_TERM = 3
+
+
+def normalize_search_term(term: str) -> str:
+    """Lowercase a search term and collapse its whitespace."""
+    return " ".join(term.lower().split())
+
+
+def normalize_phone(term: str) -> Optional[str]:
+    """Reduce a phone-like search term to its national digits.
+
+    "+41 79 123 45 67", "0041791234567" and "079 123 45 67" all become
+    "791234567", which is a substring of the stored number in any of
+    those formats.
+
+    Returns:
+        The digits, or None if the term does not look like a phone number
+    """
+    if not _PHONE_TERM.match(term):
+        return None
+    digits = re.sub(r"\D", "", term)
+    if len(digits) < _MIN_FTS_TERM:
+        return None
+    if digits.startswith("0041"):
+        return digits[4:]
+    if term.lstrip().startswith("+41"):
+        return digits[2:]
+    return digits[1:] if digits.startswith("0") else digits
+
+
+def search_condition(
+    model: Type[BaseModel],
+    term: str,
+    dialect_name: str,
+) -> ColumnElement[bool]:
+    """Build the WHERE clause matching ``term`` anywhere in ``search_text``.
+
+    PostgreSQL serves the LIKE from the pg_trgm GIN index, SQLite from the
+    FTS5 trigram table; other dialects fall back to a plain LIKE.
+    """
+    needles = [normalize_search_term(term)]
+    phone = normalize_phone(term)
+    if phone and phone != needles[0]:
+        needles.append(phone)
+
+    if dialect_name == "sqlite" and all(len(n) >= _MIN_FTS_TERM for n in needles):
+        fts = table(fts_table_name(model.__tablename__), column("rowid"))
+        query = " OR ".join(_fts_phrase(needle) for needle in needles)
+        return literal_column(f"{model.__tablename__}.rowid").in_(
+            select(fts.c.rowid).where(literal_column(fts.name).match(query)),
+        )
+
+    return or_(
+        *(model.search_text.like(_like_pattern(n), escape="\\") for n in needles)
+    )
+
+
+def search_rank(
+    model: Type[BaseModel], term: str, dialect_name: str
+) -> Optional[ColumnElement]:
+    """Build an ORDER BY clause putting the best matches first.
+
+    Returns:
+        The ordering, or None if the dialect has no relevance measure
+    """
+    needle = normalize_search_term(term)
+    if dialect_name == "postgresql":
+        return func.similarity(model.search_text, needle).desc()
+
+    if dialect_name == "sqlite" and len(needle) >= _MIN_FTS_TERM:
+        fts = table(fts_table_name(model.__tablename__), column("rowid"))
+        return (
+            select(func.bm25(literal_column(fts.name)))
+            .where(
+                literal_column(fts.name).match(_fts_phrase(needle)),
+                fts.c.rowid == literal_column(f"{model.__tablename__}.rowid"),
+            )
+            .scalar_subquery()
+            .asc()
+        )
+    return None
+
+
+def _like_pattern(needle: str) -> str:
+    escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_phrase(needle: str) -> str:
+    return '"' + needle.replace('"', '""') + '"'
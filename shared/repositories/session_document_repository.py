@@ -1,25 +1,62 @@
-from typing import List, Tuple
+from collections import Counter
+from typing import List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, bindparam, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models.session_document import SessionDocument
 from shared.repositories.base_repository import BaseRepository
+from shared.repositories.chat_session_repository import ChatSessionRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.pagination import CursorPage
+from shared.repositories.projection import ReadModel
+
+# Columns returned by the document list endpoints
+_LIST_COLUMNS = (
+    SessionDocument.id,
+    SessionDocument.document_type,
+    SessionDocument.document_url,
+    SessionDocument.recipient_email,
+    SessionDocument.status,
+    SessionDocument.error_message,
+    SessionDocument.created_at,
+)
+
+# Built once; see LeadRepository.get_by_email
+_BY_SESSION = (
+    select(SessionDocument)
+    .where(SessionDocument.session_id == bindparam("session_id"))
+    .order_by(SessionDocument.created_at)
+)
 
 
 class SessionDocumentRepository(BaseRepository[SessionDocument]):
     """Repository for session document operations."""
 
+    _inserted_columns = ("session_id",)
+    _delete_returning = ("session_id",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(SessionDocument, db)
 
+    async def _on_insert(self, items: List[dict]) -> None:
+        """Keep ChatSession.document_count in step with inserts."""
+        await ChatSessionRepository(self.db).adjust_counters(
+            "document_count",
+            Counter(item["session_id"] for item in items),
+        )
+
+    async def _on_delete(self, rows: List[dict]) -> None:
+        """Keep ChatSession.document_count in step with deletes."""
+        deltas = Counter(row["session_id"] for row in rows)
+        await ChatSessionRepository(self.db).adjust_counters(
+            "document_count",
+            {session_id: -count for session_id, count in deltas.items()},
+        )
+
     async def get_by_session_id(self, session_id: str) -> List[SessionDocument]:
         """Get all documents for a session."""
-        result = await self.db.execute(
-            select(SessionDocument)
-            .where(SessionDocument.session_id == session_id)
-            .order_by(SessionDocument.created_at),
-        )
+        result = await self.db.execute(_BY_SESSION, {"session_id": session_id})
         return list(result.scalars().all())
 
     async def get_by_tool_execution_id(
@@ -50,32 +87,49 @@ class SessionDocumentRepository(BaseRepository[SessionDocument]):
         )
         return list(result.scalars().all())
 
+    async def update_status(
+        self,
+        document_id: str,
+        status: str,
+        error_message: Optional[str] = None,
+    ) -> Optional[Row]:
+        """Set the status (and error message) of a document.
+
+        Args:
+            document_id: Document ID
+            status: New status (generated, sent, failed)
+            error_message: Error message to store, if any
+
+        Returns:
+            The updated row, or None if the document does not exist
+        """
+        return await self.update_by_id(
+            document_id,
+            {"status": status, "error_message": error_message},
+        )
+
     async def get_documents_by_session_paginated(
         self,
         session_id: str,
         page: int = 1,
         limit: int = 10,
-    ) -> Tuple[List[SessionDocument], int]:
+        count_strategy: Optional[CountStrategy] = None,
+    ) -> Tuple[List[ReadModel], int]:
         """Get paginated documents for a session with only specific fields.
 
         Args:
             session_id: Session ID to get documents for
             page: Page number (1-indexed)
             limit: Items per page
+            count_strategy: How to compute the total (exact by default)
 
         Returns:
-            Tuple of (documents list, total count)
+            Tuple of (read-only document rows, total count)
         """
         # Build query with selected fields only
-        query = select(
-            SessionDocument.id,
-            SessionDocument.document_type,
-            SessionDocument.document_url,
-            SessionDocument.recipient_email,
-            SessionDocument.status,
-            SessionDocument.error_message,
-            SessionDocument.created_at,
-        ).where(SessionDocument.session_id == session_id)
+        query = select(*_LIST_COLUMNS).where(
+            SessionDocument.session_id == session_id,
+        )
 
         # Get total count
         count_query = (
@@ -83,8 +137,7 @@ class SessionDocumentRepository(BaseRepository[SessionDocument]):
             .select_from(SessionDocument)
             .where(SessionDocument.session_id == session_id)
         )
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await self._count(count_query, count_strategy)
 
         # Apply pagination and sorting by created_at desc
         skip = (page - 1) * limit
@@ -93,6 +146,36 @@ class SessionDocumentRepository(BaseRepository[SessionDocument]):
         )
 
         result = await self.db.execute(query)
-        documents = [SessionDocument(**dict(row._mapping)) for row in result]
+        documents = self.projection(*_LIST_COLUMNS).all(result)
 
         return documents, total
+
+    async def get_documents_by_session_cursor(
+        self,
+        session_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+    ) -> CursorPage[ReadModel]:
+        """Get documents for a session with only specific fields using keyset
+        pagination on (created_at, id).
+
+        Args:
+            session_id: Session ID to get documents for
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+
+        Returns:
+            CursorPage with read-only document rows and next/prev cursors
+        """
+        query = select(*_LIST_COLUMNS).where(
+            SessionDocument.session_id == session_id,
+        )
+
+        return await self._paginate_by_cursor(
+            query,
+            SessionDocument.created_at,
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+            transform=self.projection(*_LIST_COLUMNS),
+        )
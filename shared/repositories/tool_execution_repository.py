@@ -1,24 +1,103 @@
-from typing import List, Tuple
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import bindparam, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.models.session_document import SessionDocument
 from shared.models.tool_execution import ToolExecution
-from shared.repositories.base_repository import BaseRepository
+from shared.repositories.counting import CountStrategy
+from shared.repositories.entity_cache import invalidate_entities
+from shared.repositories.pagination import CursorPage
+from shared.repositories.partitioned_repository import MonthlyPartitionedRepository
+from shared.repositories.projection import ReadModel
 
+# Columns returned by the tool execution list endpoints
+_LIST_COLUMNS = (
+    ToolExecution.id,
+    ToolExecution.tool_name,
+    ToolExecution.tool_arguments,
+    ToolExecution.tool_result,
+    ToolExecution.status,
+    ToolExecution.created_at,
+)
 
-class ToolExecutionRepository(BaseRepository[ToolExecution]):
+
+# Built once; see LeadRepository.get_by_email
+_BY_SESSION = (
+    select(ToolExecution)
+    .where(ToolExecution.session_id == bindparam("session_id"))
+    .order_by(ToolExecution.created_at)
+)
+_BY_SESSION_SINCE = _BY_SESSION.where(ToolExecution.created_at >= bindparam("since"))
+
+# Parent IDs per statement when cleaning up after deletes
+_CLEANUP_BATCH_SIZE = 500
+
+
+class ToolExecutionRepository(MonthlyPartitionedRepository[ToolExecution]):
     """Repository for tool execution operations."""
 
+    _delete_returning = ("id",)
+
     def __init__(self, db: AsyncSession):
         super().__init__(ToolExecution, db)
 
-    async def get_by_session_id(self, session_id: str) -> List[ToolExecution]:
-        """Get all tool executions for a session."""
+    async def _on_delete(self, rows: List[dict]) -> None:
+        """Detach documents from the deleted tool executions.
+
+        Stands in for ``ON DELETE SET NULL``, which session_documents
+        cannot declare since tool_executions is partitioned.
+        """
+        for batch in _batches(row["id"] for row in rows):
+            await self.db.execute(
+                update(SessionDocument)
+                .where(SessionDocument.tool_execution_id.in_(batch))
+                .values(tool_execution_id=None, updated_at=SessionDocument.updated_at),
+            )
+        if rows:
+            invalidate_entities(self.db, SessionDocument)
+
+    async def _delete_for_messages(self, message_ids: Iterable[str]) -> None:
+        """Delete the tool executions of deleted messages.
+
+        Stands in for ``ON DELETE CASCADE``, which tool_executions cannot
+        declare since chat_messages is partitioned. Runs in the caller's
+        transaction.
+        """
+        for batch in _batches(message_ids):
+            result = await self.db.execute(
+                delete(ToolExecution)
+                .where(ToolExecution.message_id.in_(batch))
+                .returning(ToolExecution.id),
+            )
+            deleted = [{"id": id} for id in result.scalars()]
+            if deleted:
+                invalidate_entities(
+                    self.db,
+                    ToolExecution,
+                    [row["id"] for row in deleted],
+                )
+                await self._on_delete(deleted)
+
+    async def get_by_session_id(
+        self,
+        session_id: str,
+        since: Optional[datetime] = None,
+    ) -> List[ToolExecution]:
+        """Get all tool executions for a session.
+
+        Args:
+            session_id: Session ID
+            since: Only executions created at or after this time; passing
+                the session's ``created_at`` skips older monthly partitions
+
+        Returns:
+            List of tool executions, oldest first
+        """
         result = await self.db.execute(
-            select(ToolExecution)
-            .where(ToolExecution.session_id == session_id)
-            .order_by(ToolExecution.created_at),
+            _BY_SESSION if since is None else _BY_SESSION_SINCE,
+            {"session_id": session_id, "since": since},
         )
         return list(result.scalars().all())
 
@@ -52,7 +131,8 @@ class ToolExecutionRepository(BaseRepository[ToolExecution]):
         session_id: str,
         page: int = 1,
         limit: int = 10,
-    ) -> Tuple[List[ToolExecution], int]:
+        count_strategy: Optional[CountStrategy] = None,
+    ) -> Tuple[List[ReadModel], int]:
         """Get paginated tool executions for a session with only specific
         fields.
 
@@ -60,19 +140,15 @@ class ToolExecutionRepository(BaseRepository[ToolExecution]):
             session_id: Session ID to get tool executions for
             page: Page number (1-indexed)
             limit: Items per page
+            count_strategy: How to compute the total (exact by default)
 
         Returns:
-            Tuple of (tool executions list, total count)
+            Tuple of (read-only tool execution rows, total count)
         """
         # Build query with selected fields only
-        query = select(
-            ToolExecution.id,
-            ToolExecution.tool_name,
-            ToolExecution.tool_arguments,
-            ToolExecution.tool_result,
-            ToolExecution.status,
-            ToolExecution.created_at,
-        ).where(ToolExecution.session_id == session_id)
+        query = select(*_LIST_COLUMNS).where(
+            ToolExecution.session_id == session_id,
+        )
 
         # Get total count
         count_query = (
@@ -80,14 +156,51 @@ class ToolExecutionRepository(BaseRepository[ToolExecution]):
             .select_from(ToolExecution)
             .where(ToolExecution.session_id == session_id)
         )
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await self._count(count_query, count_strategy)
 
         # Apply pagination and sorting by created_at desc
         skip = (page - 1) * limit
         query = query.order_by(ToolExecution.created_at.asc()).offset(skip).limit(limit)
 
         result = await self.db.execute(query)
-        tool_executions = [ToolExecution(**dict(row._mapping)) for row in result]
+        tool_executions = self.projection(*_LIST_COLUMNS).all(result)
 
         return tool_executions, total
+
+    async def get_tool_executions_by_session_cursor(
+        self,
+        session_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+    ) -> CursorPage[ReadModel]:
+        """Get tool executions for a session with only specific fields using keyset
+        pagination on (created_at, id).
+
+        Args:
+            session_id: Session ID to get tool executions for
+            cursor: Token from a previous page (None for the first page)
+            limit: Items per page
+
+        Returns:
+            CursorPage with read-only tool execution rows and next/prev cursors
+        """
+        query = select(*_LIST_COLUMNS).where(
+            ToolExecution.session_id == session_id,
+        )
+
+        return await self._paginate_by_cursor(
+            query,
+            ToolExecution.created_at,
+            cursor=cursor,
+            limit=limit,
+            descending=False,
+            transform=self.projection(*_LIST_COLUMNS),
+        )
+
+
+def _batches(ids: Iterable[str]) -> Iterable[List[str]]:
+    """Split IDs into sorted batches, so rows are locked in a stable order."""
+    ids = sorted(ids)
+    for start in range(0, len(ids), _CLEANUP_BATCH_SIZE):
+        end = start + _CLEANUP_BATCH_SIZE
+        yield ids[start:end]
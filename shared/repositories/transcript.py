@@ -0,0 +1,213 @@
+"""Single-statement loading of a chat session's transcript.
+
+The session, its messages with their tool executions and documents, and
+its funnel events are assembled into one JSON document by the database
+(``json_build_object`` / ``json_agg`` on PostgreSQL, ``json_object`` /
+``json_group_array`` on SQLite), so rendering a conversation takes one
+round trip instead of one per table.
+"""
+
+from functools import cache
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    ColumnElement,
+    ScalarSelect,
+    Select,
+    bindparam,
+    case,
+    func,
+    literal_column,
+    select,
+    type_coerce,
+)
+
+from shared.models.base import BaseModel
+from shared.models.chat_message import ChatMessage
+from shared.models.chat_session import ChatSession
+from shared.models.funnel_event import FunnelEvent
+from shared.models.serialization import is_internal
+from shared.models.session_document import SessionDocument
+from shared.models.tool_execution import ToolExecution
+
+# Columns left out with include_large_fields=False: free-form JSON that
+# can dwarf the rest of the transcript
+LARGE_FIELDS: Dict[Type[BaseModel], Tuple[str, ...]] = {
+    ChatSession: ("household_json",),
+    ChatMessage: ("meta",),
+    ToolExecution: ("tool_arguments", "tool_result"),
+    FunnelEvent: ("payload", "geo_data"),
+}
+
+
+@cache
+def transcript_statement(
+    dialect_name: str,
+    paged: bool = False,
+    include_large_fields: bool = True,
+) -> Select:
+    """Build the transcript statement for a dialect.
+
+    The statement takes ``session_id`` and, if ``paged``, ``message_limit``
+    and ``message_offset`` parameters, and returns one row with the
+    transcript as a decoded JSON value (no row for an unknown session).
+
+    Args:
+        dialect_name: ``postgresql`` or ``sqlite``
+        paged: Page the message list
+        include_large_fields: Include the columns in ``LARGE_FIELDS``
+
+    Returns:
+        Select, built once per combination of arguments
+    """
+    json = _JsonBuilder(dialect_name, include_large_fields)
+
+    documents = json.array(
+        SessionDocument,
+        SessionDocument.tool_execution_id == ToolExecution.id,
+        correlate=(ToolExecution,),
+    )
+    tool_executions = json.array(
+        ToolExecution,
+        ToolExecution.message_id == ChatMessage.id,
+        ToolExecution.session_id == ChatSession.id,
+        nested={"documents": documents},
+        correlate=(ChatMessage, ChatSession),
+    )
+    messages = json.array(
+        ChatMessage,
+        ChatMessage.session_id == ChatSession.id,
+        nested={"tool_executions": tool_executions},
+        correlate=(ChatSession,),
+        paged=paged,
+    )
+    # Tool executions and documents not attached to a message / execution
+    unlinked_tool_executions = json.array(
+        ToolExecution,
+        ToolExecution.message_id.is_(None),
+        ToolExecution.session_id == ChatSession.id,
+        nested={"documents": documents},
+        correlate=(ChatSession,),
+    )
+    unlinked_documents = json.array(
+        SessionDocument,
+        SessionDocument.tool_execution_id.is_(None),
+        SessionDocument.session_id == ChatSession.id,
+        correlate=(ChatSession,),
+    )
+    # Funnel events may carry client timestamps from before the session
+    funnel_events = json.array(
+        FunnelEvent,
+        FunnelEvent.session_id == ChatSession.id,
+        correlate=(ChatSession,),
+    )
+
+    transcript = json.object(
+        [
+            *json.fields(ChatSession, ChatSession.__table__.c),
+            ("messages", messages),
+            ("tool_executions", unlinked_tool_executions),
+            ("documents", unlinked_documents),
+            ("funnel_events", funnel_events),
+        ],
+        nested={
+            "messages",
+            "tool_executions",
+            "documents",
+            "funnel_events",
+        },
+    )
+    return select(type_coerce(transcript, JSON)).where(
+        ChatSession.id == bindparam("session_id"),
+    )
+
+
+class _JsonBuilder:
+    """Dialect-specific JSON object and array construction."""
+
+    def __init__(self, dialect_name: str, include_large_fields: bool):
+        if dialect_name not in ("postgresql", "sqlite"):
+            raise ValueError(f"Transcripts are not supported on {dialect_name}")
+        self.postgresql = dialect_name == "postgresql"
+        self.include_large_fields = include_large_fields
+
+    def fields(
+        self,
+        model: Type[BaseModel],
+        columns: Iterable[ColumnElement],
+    ) -> List[Tuple[str, ColumnElement]]:
+        """Name and column of the fields of ``model`` to include."""
+        skipped = () if self.include_large_fields else LARGE_FIELDS.get(model, ())
+        return [
+            (column.key, column)
+            for column in columns
+            if column.key not in skipped and not is_internal(column)
+        ]
+
+    def object(
+        self,
+        fields: Iterable[Tuple[str, ColumnElement]],
+        nested: Iterable[str] = (),
+    ) -> ColumnElement:
+        """JSON object of ``fields``; ``nested`` names hold JSON values."""
+        nested = set(nested)
+        arguments: List[ColumnElement] = []
+        for key, value in fields:
+            arguments.append(literal_column(f"'{key}'"))
+            arguments.append(
+                value if self.postgresql else self._sqlite(value, key in nested)
+            )
+        if self.postgresql:
+            return func.json_build_object(*arguments)
+        return func.json_object(*arguments)
+
+    def array(
+        self,
+        model: Type[BaseModel],
+        *predicates: ColumnElement[bool],
+        nested: Optional[Dict[str, ScalarSelect]] = None,
+        correlate: Tuple[type, ...] = (),
+        paged: bool = False,
+    ) -> ScalarSelect:
+        """JSON array of the matching rows of ``model``, oldest first."""
+        nested = nested or {}
+        columns = [
+            column.label(key) for key, column in self.fields(model, model.__table__.c)
+        ]
+        columns.extend(subquery.label(key) for key, subquery in nested.items())
+        rows = (
+            select(*columns)
+            .where(*predicates)
+            .order_by(model.created_at, model.id)
+            .correlate(*correlate)
+        )
+        if paged:
+            rows = rows.limit(bindparam("message_limit")).offset(
+                bindparam("message_offset"),
+            )
+        rows = rows.subquery()
+
+        item = self.object(((column.key, column) for column in rows.c), nested)
+        if self.postgresql:
+            # Imported on use, the dialect module is slow to import
+            from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+            aggregate = func.coalesce(
+                func.json_agg(aggregate_order_by(item, rows.c.created_at, rows.c.id)),
+                literal_column("'[]'::json"),
+            )
+        else:
+            # Aggregates in the order of the subquery
+            aggregate = func.json_group_array(item)
+        return select(aggregate).scalar_subquery()
+
+    def _sqlite(self, value: ColumnElement, nested: bool) -> ColumnElement:
+        # SQLite keeps JSON as text and booleans as integers; mark them so
+        # they are embedded as JSON rather than as strings and numbers
+        if nested or isinstance(value.type, JSON):
+            return func.json(value)
+        if isinstance(value.type, Boolean):
+            return func.json(case((value, "true"), (~value, "false")))
+        return value
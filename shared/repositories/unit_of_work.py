@@ -0,0 +1,65 @@
+"""Unit of work shared by all repositories using the same AsyncSession."""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
+
+_DEPTH_KEY = "shared.unit_of_work_depth"
+
+
+def is_unit_of_work_active(db: AsyncSession) -> bool:
+    """Check whether a unit of work is open on the session."""
+    return db.info.get(_DEPTH_KEY, 0) > 0
+
+
+class UnitOfWork:
+    """Defer repository commits and commit once at the end.
+
+    While a unit of work is open, repository writes on the same session
+    are only added to the session (or executed inside the transaction) and
+    are flushed together; the outermost unit of work commits on success and
+    rolls back on error. Nested units of work join the outer one.
+
+    Example:
+        async with UnitOfWork(db) as uow:
+            message = await messages.create(session_id=sid, role="user", content=text)
+            async with uow.savepoint():
+                await tool_executions.create(message_id=message.id, ...)
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._outermost = False
+
+    async def __aenter__(self) -> "UnitOfWork":
+        depth = self.db.info.get(_DEPTH_KEY, 0)
+        self._outermost = depth == 0
+        self.db.info[_DEPTH_KEY] = depth + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> Optional[bool]:
+        depth = self.db.info.get(_DEPTH_KEY, 1) - 1
+        if depth:
+            self.db.info[_DEPTH_KEY] = depth
+        else:
+            self.db.info.pop(_DEPTH_KEY, None)
+
+        if not self._outermost:
+            return None
+        if exc_type is None:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
+        return None
+
+    async def flush(self) -> None:
+        """Send pending changes to the database without committing."""
+        await self.db.flush()
+
+    def savepoint(self) -> AsyncSessionTransaction:
+        """Open a SAVEPOINT; an error inside it only rolls back its changes.
+
+        Use as ``async with uow.savepoint():`` and catch the exception
+        outside the block to continue with the rest of the unit of work.
+        """
+        return self.db.begin_nested()
@@ -1,13 +1,44 @@
 """User repository for database operations."""
 
+from functools import cache
 from typing import Optional
 
-from sqlalchemy import exists, select
+from sqlalchemy import Select, bindparam, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import load_only
 
 from shared.models.user import User
 from shared.repositories.base_repository import BaseRepository
+from shared.repositories.entity_cache import invalidate_entities
+from shared.repositories.routing import PRIMARY, route
+
+
+@cache
+def _by_email() -> Select:
+    """Lookup by email, built once.
+
+    The ``load_only`` option makes this statement costly to rebuild per
+    call. It is built on first use, because the option configures the
+    mappers, which imports every model.
+    """
+    return (
+        select(User)
+        .options(
+            load_only(
+                User.id,
+                User.name,
+                User.email,
+                User.phone,
+                User.role,
+                User.is_active,
+                User.last_active,
+                User.created_at,
+                User.updated_at,
+                User.password,
+            ),
+        )
+        .where(User.email == bindparam("email"))
+    )
 
 
 class UserRepository(BaseRepository[User]):
@@ -16,26 +47,10 @@ class UserRepository(BaseRepository[User]):
     def __init__(self, db: AsyncSession):
         super().__init__(User, db)
 
+    @route(PRIMARY)
     async def get_user_by_email(self, email: str) -> Optional[User]:
-        """Fetch a user by email."""
-        result = await self.db.execute(
-            select(User)
-            .options(
-                load_only(
-                    User.id,
-                    User.name,
-                    User.email,
-                    User.phone,
-                    User.role,
-                    User.is_active,
-                    User.last_active,
-                    User.created_at,
-                    User.updated_at,
-                    User.password,
-                ),
-            )
-            .filter(User.email == email),
-        )
+        """Fetch a user by email (from the primary, for sign-in checks)."""
+        result = await self.db.execute(_by_email(), {"email": email})
         return result.scalar_one_or_none()
 
     async def is_email_taken(self, email: str) -> bool:
@@ -54,14 +69,13 @@ class UserRepository(BaseRepository[User]):
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        await self.db.commit()
-        await self.db.refresh(user)
+        invalidate_entities(self.db, User, [user_id])
+        await self._persist(user)
         return user
 
     async def create_user(self, user_data: dict) -> User:
         """Create a new user."""
         user = User(**user_data)
         self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        await self._persist(user)
         return user